@@ -1,19 +1,32 @@
 # accounts/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import Company, User
+
+from ncalendar.admin import CompanyScopedAdmin
+from .models import Company, User, RevokedToken
 
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug', 'active', 'created_at']
+    search_fields = ['name', 'slug']
     prepopulated_fields = {'slug': ('name',)}
 
+    def get_queryset(self, request):
+        # Staff enxerga (e encontra no autocomplete) só a própria empresa
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        return qs.filter(pk=request.user.company_id)
+
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(CompanyScopedAdmin, BaseUserAdmin):
     list_display = ['username', 'email', 'company', 'professional', 'is_staff']
-    list_filter = ['company', 'is_staff', 'is_superuser']
+    list_filter = ['is_staff', 'is_superuser']
+    # user.__str__ usa a empresa
+    list_select_related = ['company', 'professional']
+    autocomplete_fields = ['company', 'professional']
     
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Informações Adicionais', {
@@ -25,4 +38,13 @@ class UserAdmin(BaseUserAdmin):
         ('Informações Adicionais', {
             'fields': ('company', 'phone', 'professional')
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(CompanyScopedAdmin):
+    company_field = 'user__company'
+    list_display = ['jti', 'user', 'expires_at', 'revoked_at']
+    list_select_related = ['user__company']
+    search_fields = ['jti', 'user__username']
+    autocomplete_fields = ['user']
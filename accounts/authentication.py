@@ -0,0 +1,38 @@
+# accounts/authentication.py
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from ncalendar import tenancy
+from . import tokens
+
+KEYWORD = 'Bearer'
+
+
+def bearer_token(request):
+    """Token do cabeçalho 'Authorization: Bearer <token>', ou None"""
+    parts = get_authorization_header(request).split()
+    if len(parts) != 2 or parts[0].lower() != KEYWORD.lower().encode():
+        return None
+    try:
+        return parts[1].decode()
+    except UnicodeError:
+        return None
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Autenticação do DRF por token assinado (accounts.tokens), sem consulta ao banco"""
+
+    def authenticate(self, request):
+        token = bearer_token(request)
+        if token is None:
+            return None
+        try:
+            user, _ = tokens.authenticate(token)
+        except tokens.InvalidToken as e:
+            raise AuthenticationFailed(str(e))
+        # O token do CompanyMiddleware restaura o contexto anterior ao fim da requisição
+        tenancy.activate(user)
+        return user, token
+
+    def authenticate_header(self, request):
+        return KEYWORD
@@ -0,0 +1,61 @@
+# accounts/backends.py
+"""
+Backend de autenticação com o usuário carregado numa única consulta.
+
+O usuário vem com empresa e profissional vinculado (select_related) e fica
+em cache por ACCOUNTS_USER_CACHE_TIMEOUT segundos: requisições autenticadas
+por sessão (ou token) não consultam accounts_user nem accounts_company. As
+gravações de User, Company e Professional invalidam a entrada (signals.py),
+na hora e após o commit, inclusive troca de senha, que também invalida o hash
+da sessão.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import User
+
+
+def get_cache():
+    return caches[getattr(settings, 'ACCOUNTS_USER_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id):
+    return f'accounts:user:{user_id}'
+
+
+def load_user(user_id):
+    """Usuário com company e professional já carregados (cache ou uma consulta)"""
+    cache = get_cache()
+    key = _key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.select_related('company', 'professional').filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, getattr(settings, 'ACCOUNTS_USER_CACHE_TIMEOUT', 300))
+    return user
+
+
+def invalidate_users(user_ids):
+    get_cache().delete_many([_key(pk) for pk in user_ids])
+
+
+def invalidate_users_on_commit(user_ids):
+    """
+    Invalida agora (a própria transação lê o novo estado) e de novo após o
+    commit: uma requisição concorrente pode ter cacheado a linha pré-commit,
+    com a senha ou o is_active antigos (como em ncalendar.cache).
+    """
+    user_ids = list(user_ids)
+    invalidate_users(user_ids)
+    transaction.on_commit(lambda: invalidate_users(user_ids))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend cujo get_user() usa load_user()"""
+
+    def get_user(self, user_id):
+        user = load_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -51,4 +51,19 @@ class User(AbstractUser):
     @property
     def is_professional(self):
         """Verifica se o usuário está vinculado a um profissional"""
-        return self.professional is not None
\ No newline at end of file
+        return self.professional is not None
+
+
+class RevokedToken(models.Model):
+    """Token de API revogado antes de expirar (lista consultada via cache)"""
+    jti = models.CharField("Identificador", max_length=32, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='revoked_tokens', verbose_name="Usuário")
+    expires_at = models.DateTimeField("Expira em", db_index=True)
+    revoked_at = models.DateTimeField("Revogado em", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Token revogado"
+        verbose_name_plural = "Tokens revogados"
+
+    def __str__(self):
+        return f"{self.jti} ({self.user})"
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from ncalendar.models import Professional
+from .backends import invalidate_users_on_commit
+from .models import Company, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_users_on_commit([instance.pk])
+
+
+# pre_delete: depois da exclusão o vínculo dos usuários já foi anulado (SET_NULL)
+@receiver(post_save, sender=Company)
+@receiver(pre_delete, sender=Company)
+def invalidate_company_users(sender, instance, **kwargs):
+    invalidate_users_on_commit(instance.users.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Professional)
+@receiver(pre_delete, sender=Professional)
+def invalidate_professional_user(sender, instance, **kwargs):
+    invalidate_users_on_commit(User.objects.filter(professional_id=instance.pk).values_list('pk', flat=True))
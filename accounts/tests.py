@@ -1,3 +1,157 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from .backends import CachedModelBackend, get_cache, load_user
+from .models import Company, RevokedToken, User
+from . import tokens
+
+
+class TokenTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Salão', slug='salao')
+        cls.user = User.objects.create_user('ana', password='senha-forte-123', company=cls.company)
+
+    def setUp(self):
+        # Usuários e lista de revogados ficam no cache em memória entre testes
+        for cache in caches.all():
+            cache.clear()
+
+    def bearer(self, token):
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def assertRejected(self, token, message):
+        # 403: a primeira autenticação do DRF (sessão) não envia WWW-Authenticate
+        response = self.client.get('/api/bootstrap/', **self.bearer(token))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['detail'], message)
+
+
+class SignedTokenTests(TokenTestMixin, TestCase):
+    def test_issued_token_authenticates(self):
+        token, _ = tokens.issue(self.user)
+        user, payload = tokens.authenticate(token)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(self.client.get('/api/bootstrap/', **self.bearer(token)).status_code, 200)
+
+    def test_obtain_token_with_password(self):
+        response = self.client.post('/api/auth/token/', {'username': 'ana', 'password': 'senha-forte-123'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(tokens.authenticate(response.json()['token'])[0].pk, self.user.pk)
+
+    def test_expired_token(self):
+        token, _ = tokens.issue(self.user)
+        later = time.time() + tokens._max_age() + 1
+        with mock.patch('accounts.tokens.time.time', return_value=later):
+            with self.assertRaisesMessage(tokens.InvalidToken, 'Token expirado.'):
+                tokens.authenticate(token)
+            self.assertRejected(token, 'Token expirado.')
+
+    def test_tampered_token(self):
+        token, _ = tokens.issue(self.user)
+        value, signature = token.rsplit(':', 1)
+        changed = 'A' if value[-1] != 'A' else 'B'
+        for tampered in (value[:-1] + changed + ':' + signature, token[:-1] + ('0' if token[-1] != '0' else '1'), 'lixo'):
+            with self.assertRaisesMessage(tokens.InvalidToken, 'Token inválido.'):
+                tokens.authenticate(tampered)
+        self.assertRejected('lixo', 'Token inválido.')
+
+    def test_token_signed_with_other_salt_is_rejected(self):
+        from django.core import signing
+        forged = signing.dumps({'u': self.user.pk, 'j': 'x' * 32, 'e': time.time() + 60, 'h': ''}, salt='outro')
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.authenticate(forged)
+
+    def test_revoked_token(self):
+        token, _ = tokens.issue(self.user)
+        # Lista de revogados já em cache antes da revogação
+        self.assertEqual(tokens.revoked_ids(), frozenset())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/token/revoke/', **self.bearer(token))
+        self.assertEqual(response.status_code, 204)
+        with self.assertRaisesMessage(tokens.InvalidToken, 'Token revogado.'):
+            tokens.authenticate(token)
+        self.assertRejected(token, 'Token revogado.')
+
+    def test_cannot_revoke_other_users_token(self):
+        other = User.objects.create_user('bia', password='senha-forte-123', company=self.company)
+        token, _ = tokens.issue(other)
+        with self.assertRaisesMessage(tokens.InvalidToken, 'Token de outro usuário.'):
+            tokens.revoke(token, user=self.user)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_rotated_token(self):
+        old, _ = tokens.issue(self.user)
+        new, _ = tokens.issue(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            tokens.revoke(old, user=self.user)
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.authenticate(old)
+        self.assertEqual(tokens.authenticate(new)[0].pk, self.user.pk)
+
+    def test_secret_key_rotation(self):
+        token, _ = tokens.issue(self.user)
+        new_key = 'nova-chave-' + settings.SECRET_KEY
+        with override_settings(SECRET_KEY=new_key, SECRET_KEY_FALLBACKS=[settings.SECRET_KEY]):
+            self.assertEqual(tokens.authenticate(token)[0].pk, self.user.pk)
+        with override_settings(SECRET_KEY=new_key, SECRET_KEY_FALLBACKS=[]):
+            with self.assertRaises(tokens.InvalidToken):
+                tokens.authenticate(token)
+
+    def test_password_change_invalidates_token(self):
+        token, _ = tokens.issue(self.user)
+        tokens.authenticate(token)  # usuário em cache
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('outra-senha-456')
+        user.save()
+        with self.assertRaisesMessage(tokens.InvalidToken, 'Token invalidado pela troca de senha.'):
+            tokens.authenticate(token)
+
+    def test_inactive_user(self):
+        token, _ = tokens.issue(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaisesMessage(tokens.InvalidToken, 'Usuário inativo ou inexistente.'):
+            tokens.authenticate(token)
+
+
+class CachedUserBackendTests(TokenTestMixin, TestCase):
+    def test_load_user_is_cached(self):
+        with self.assertNumQueries(1):
+            user = load_user(self.user.pk)
+            load_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.company.name, 'Salão')
+        self.assertIsNone(load_user(0))
+
+    def test_saves_invalidate_cached_user(self):
+        load_user(self.user.pk)
+        self.user.first_name = 'Ana Paula'
+        self.user.save()
+        self.assertEqual(load_user(self.user.pk).first_name, 'Ana Paula')
+        self.company.name = 'Salão Novo'
+        self.company.save()
+        self.assertEqual(load_user(self.user.pk).company.name, 'Salão Novo')
+
+    def test_get_user_skips_inactive(self):
+        backend = CachedModelBackend()
+        self.assertEqual(backend.get_user(self.user.pk).pk, self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(backend.get_user(self.user.pk))
+
+    def test_deactivation_ends_cached_authentication(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/api/bootstrap/').status_code, 200)
+        stale = load_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            user.is_active = False
+            user.save()
+            # Requisição concorrente recoloca no cache a linha anterior ao commit
+            get_cache().set(f'accounts:user:{self.user.pk}', stale)
+        self.assertIsNone(CachedModelBackend().get_user(self.user.pk))
+        self.assertEqual(self.client.get('/api/bootstrap/').status_code, 403)
@@ -0,0 +1,107 @@
+# accounts/tokens.py
+"""
+Tokens de API assinados (sem estado) para apps móveis e integrações.
+
+O token carrega o usuário, um identificador (jti), a expiração e um trecho
+do hash de sessão do usuário, assinados com a SECRET_KEY (django.core.signing).
+A validação não consulta o banco: o usuário vem de load_user() (cache) e a
+lista de revogados fica em cache por ACCOUNTS_TOKEN_REVOCATION_CACHE_TIMEOUT
+segundos. Trocar a senha invalida todos os tokens do usuário.
+"""
+import secrets
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.utils import timezone
+
+from .backends import get_cache, load_user
+from .models import RevokedToken
+
+SALT = 'accounts.tokens'
+REVOKED_KEY = 'accounts:revoked-tokens'
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _max_age():
+    return getattr(settings, 'ACCOUNTS_TOKEN_MAX_AGE', 7 * 24 * 3600)
+
+
+def _fingerprint(user):
+    return user.get_session_auth_hash()[:16]
+
+
+def _fingerprint_matches(user, fingerprint):
+    """Compara com o hash atual e com os das SECRET_KEY_FALLBACKS (rotação da chave)"""
+    if secrets.compare_digest(fingerprint, _fingerprint(user)):
+        return True
+    return any(
+        secrets.compare_digest(fingerprint, user._get_session_auth_hash(secret=secret)[:16])
+        for secret in settings.SECRET_KEY_FALLBACKS
+    )
+
+
+def issue(user):
+    """(token, expira_em) para o usuário"""
+    expires = int(time.time()) + _max_age()
+    token = signing.dumps(
+        {'u': user.pk, 'j': secrets.token_hex(16), 'e': expires, 'h': _fingerprint(user)},
+        salt=SALT, compress=True,
+    )
+    return token, datetime.fromtimestamp(expires, dt_timezone.utc)
+
+
+def _payload(token):
+    try:
+        payload = signing.loads(token, salt=SALT)
+    except signing.BadSignature:
+        raise InvalidToken("Token inválido.")
+    if not isinstance(payload, dict) or payload.get('e', 0) <= time.time():
+        raise InvalidToken("Token expirado.")
+    return payload
+
+
+def revoked_ids():
+    """jti dos tokens revogados e ainda não expirados (cache ou uma consulta)"""
+    cache = get_cache()
+    revoked = cache.get(REVOKED_KEY)
+    if revoked is None:
+        revoked = frozenset(
+            RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list('jti', flat=True)
+        )
+        cache.set(REVOKED_KEY, revoked, getattr(settings, 'ACCOUNTS_TOKEN_REVOCATION_CACHE_TIMEOUT', 60))
+    return revoked
+
+
+def authenticate(token):
+    """(usuário, payload) do token; InvalidToken se não for aceito"""
+    payload = _payload(token)
+    user = load_user(payload['u'])
+    if user is None or not user.is_active:
+        raise InvalidToken("Usuário inativo ou inexistente.")
+    if not _fingerprint_matches(user, payload['h']):
+        raise InvalidToken("Token invalidado pela troca de senha.")
+    if payload['j'] in revoked_ids():
+        raise InvalidToken("Token revogado.")
+    return user, payload
+
+
+def revoke(token, user=None):
+    """Revoga o token (válido e, se `user` for dado, dele); devolve o RevokedToken"""
+    payload = _payload(token)
+    if user is not None and payload['u'] != user.pk:
+        raise InvalidToken("Token de outro usuário.")
+    with transaction.atomic():
+        # Expirados não precisam mais constar da lista
+        RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        revoked, _ = RevokedToken.objects.get_or_create(jti=payload['j'], defaults={
+            'user_id': payload['u'],
+            'expires_at': datetime.fromtimestamp(payload['e'], dt_timezone.utc),
+        })
+        transaction.on_commit(lambda: get_cache().delete(REVOKED_KEY))
+    return revoked
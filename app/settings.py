@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista: o tempo medido cobre todos os outros middlewares
+    'ncalendar.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,15 +57,28 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # Company middleware to set current company from logged user
     'ncalendar.middleware.CompanyMiddleware',
+    # Leituras da API em réplicas, presas ao primário logo após uma gravação
+    'ncalendar.middleware.ReplicaRoutingMiddleware',
+    # Último da lista: mede só a view
+    'ncalendar.middleware.ViewTimingMiddleware',
 ]
 
 # Custom user model
 AUTH_USER_MODEL = 'accounts.User'
 
+# Usuário carregado com empresa e profissional numa consulta e mantido em cache
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+ACCOUNTS_USER_CACHE_TIMEOUT = 300
+# Validade dos tokens de API e cache da lista de revogados (segundos)
+ACCOUNTS_TOKEN_MAX_AGE = 7 * 24 * 3600
+ACCOUNTS_TOKEN_REVOCATION_CACHE_TIMEOUT = 60
+
 # Django REST Framework defaults
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
+        # Apps móveis e integrações: Authorization: Bearer <token de /api/auth/token/>
+        'accounts.authentication.SignedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -99,6 +115,74 @@ DATABASES = {
     }
 }
 
+# Réplicas de leitura: DATABASE_REPLICAS=réplica1.sqlite3,réplica2.sqlite3 cria os
+# aliases replica1, replica2... (SQLite local; atualize-os com sync_replicas).
+# Só as leituras da API (ncalendar.routing.ReplicaReadMixin) vão para elas; nos
+# testes elas espelham o 'default'.
+DATABASES.update({
+    f'replica{index}': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    for index, name in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1)
+})
+DATABASE_ROUTERS = ['ncalendar.routing.ReplicaRouter']
+NCALENDAR_READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+# Após gravar, usuário e empresa leem do primário por este tempo (atraso máximo esperado da réplica)
+NCALENDAR_REPLICA_STICKY_SECONDS = 10
+
+
+# Cache
+# Memória local para um único processo; defina REDIS_URL para compartilhar
+# o cache (e as versões por empresa) entre vários workers
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+NCALENDAR_CACHE_ALIAS = 'default'
+# Tempo de vida das respostas do feed do calendário (segundos)
+NCALENDAR_EVENTS_CACHE_TIMEOUT = 300
+# Barramento das mudanças em tempo real (SSE em /api/events/stream/, requer ASGI)
+NCALENDAR_REALTIME_BUS = 'ncalendar.realtime.RedisBus' if REDIS_URL else 'ncalendar.realtime.InProcessBus'
+# Embute /api/bootstrap/ em calendar.html (json_script) e tempo de vida do cache dele
+NCALENDAR_INLINE_BOOTSTRAP = True
+NCALENDAR_BOOTSTRAP_CACHE_TIMEOUT = 3600
+# Linhas por lote lidas do cursor nas exportações CSV/ICS por streaming
+NCALENDAR_EXPORT_CHUNK_SIZE = 2000
+# Assinatura .ics por profissional: janela móvel (dias) e cache do conteúdo/token (segundos)
+NCALENDAR_FEED_PAST_DAYS = 30
+NCALENDAR_FEED_FUTURE_DAYS = 180
+NCALENDAR_FEED_CACHE_TIMEOUT = 24 * 3600
+NCALENDAR_FEED_TOKEN_CACHE_TIMEOUT = 3600
+# Linhas por lote (consultas + bulk_create com upsert) na importação de clientes por CSV
+NCALENDAR_IMPORT_BATCH_SIZE = 2000
+# Janela relida atrás do cursor de /api/events/changes/ (gravações confirmadas com atraso)
+NCALENDAR_SYNC_LAG_SECONDS = 60
+# Dias que os tombstones de exclusão ficam guardados (prune_tombstones); cursores
+# mais antigos recebem 410 e o cliente refaz a sincronização completa
+NCALENDAR_SYNC_TOMBSTONE_RETENTION_DAYS = 30
+# Stream SSE de mudanças; mesmo ligado só é servido sob ASGI (no WSGI responde 204)
+NCALENDAR_REALTIME_ENABLED = True
+# Intervalo do heartbeat das conexões SSE (segundos)
+NCALENDAR_STREAM_HEARTBEAT = 15
+# Consultas acima deste tempo (ms) vão para o logger ncalendar.sql.slow com o SQL normalizado
+NCALENDAR_SLOW_QUERY_MS = 200
+# Orçamento de tempo da busca de clientes; etapas sem índice são puladas após ele
+NCALENDAR_CLIENT_SEARCH_BUDGET_MS = 50
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
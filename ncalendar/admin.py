@@ -1,33 +1,205 @@
 # ncalendar/admin.py
+"""
+Admin preparado para tabelas grandes e para várias empresas.
+
+- listas com list_select_related (uma consulta por página, sem N+1 no __str__);
+- chaves estrangeiras por autocomplete, nunca um <select> com a tabela inteira;
+- EstimatedCountPaginator no lugar do COUNT(*) exato;
+- CompanyScopedAdmin: staff vê, filtra e escolhe só dados da própria empresa
+  (superusuário vê tudo e filtra por empresa).
+"""
 from django.contrib import admin
-from .models import Professional, Client, Service, Event
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .models import (
+    Professional, Client, Service, Event, WorkingHours, Break,
+    RecurringSeries, SeriesException
+)
+from .search import COUNTRY_CODE, normalize_phone, normalize_text
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador sem COUNT(*) sobre a tabela inteira.
+
+    Lista sem filtro no PostgreSQL usa a estimativa do planejador
+    (pg_class.reltuples); nos demais casos a contagem para em
+    ESTIMATE_THRESHOLD + 1 linhas, e as páginas além disso ficam acessíveis
+    pelos filtros e pela hierarquia de datas.
+    """
+    ESTIMATE_THRESHOLD = 50000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.ESTIMATE_THRESHOLD:
+                return row[0]
+        return queryset.order_by()[:self.ESTIMATE_THRESHOLD + 1].count()
+
+
+def scoped_company_id(request):
+    """Empresa à qual o usuário do admin está restrito; None para superusuário"""
+    if request.user.is_superuser:
+        return None
+    return request.user.company_id
+
+
+class CompanyRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    Filtro por relação (ex.: profissional) com as opções de uma única empresa:
+    a do staff ou, para o superusuário, a escolhida no filtro de empresa.
+    Sem empresa definida o filtro não aparece.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        company_id = scoped_company_id(request)
+        if request.user.is_superuser:
+            company_id = request.GET.get(f'{model_admin.company_field}__id__exact')
+        if not company_id:
+            return []
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        return field.get_choices(
+            include_blank=False, ordering=ordering, limit_choices_to={'company_id': company_id}
+        )
+
+
+class CompanyScopedAdmin(admin.ModelAdmin):
+    """
+    Restringe listas, formulários, autocomplete e filtros à empresa do staff.
+    `company_field` é o caminho até a empresa (ex.: 'user__company').
+    """
+    company_field = 'company'
+    paginator = EstimatedCountPaginator
+    # Sem o segundo COUNT(*) do "(N no total)" ao filtrar
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        if not request.user.company_id:
+            return qs.none()
+        return qs.filter(**{self.company_field: request.user.company_id})
+
+    def get_list_filter(self, request):
+        # Filtro de empresa só faz sentido para quem vê mais de uma
+        list_filter = super().get_list_filter(request)
+        if request.user.is_superuser:
+            return [self.company_field, *list_filter]
+        return list_filter
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        company_id = scoped_company_id(request)
+        if company_id is not None:
+            related = db_field.related_model
+            if related._meta.label == 'accounts.Company':
+                kwargs['queryset'] = related._default_manager.filter(pk=company_id)
+                kwargs.setdefault('initial', company_id)
+            elif any(f.name == 'company' for f in related._meta.fields):
+                kwargs['queryset'] = related._default_manager.filter(company_id=company_id)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+class WorkingHoursInline(admin.TabularInline):
+    model = WorkingHours
+    extra = 0
+
+
+class BreakInline(admin.TabularInline):
+    model = Break
+    extra = 0
 
 
 @admin.register(Professional)
-class ProfessionalAdmin(admin.ModelAdmin):
+class ProfessionalAdmin(CompanyScopedAdmin):
     list_display = ['name', 'company', 'active', 'has_user_account', 'created_at']
-    list_filter = ['company', 'active']
+    list_filter = ['active']
+    list_select_related = ['company', 'user_account']
     search_fields = ['name']
     readonly_fields = ['created_at', 'updated_at']
+    inlines = [WorkingHoursInline, BreakInline]
+
+
+@admin.register(Client)
+class ClientAdmin(CompanyScopedAdmin):
+    list_display = ['name', 'phone', 'company', 'created_at']
+    list_select_related = ['company']
+    search_fields = ['name', 'phone']
+    readonly_fields = ['created_at', 'updated_at']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Campos normalizados da busca da API (ver ncalendar.search): telefone
+        # por prefixo (com ou sem DDI) e nome por início de palavra
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        digits = normalize_phone(term)
+        if digits and not any(char.isalpha() for char in term):
+            return queryset.filter(
+                Q(phone_digits__startswith=digits) | Q(phone_digits__startswith=COUNTRY_CODE + digits)
+            ), False
+        name = normalize_text(term)
+        return queryset.filter(
+            Q(name_normalized__startswith=name) | Q(name_normalized__contains=f' {name}')
+        ), False
 
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(CompanyScopedAdmin):
     list_display = ['name', 'professional', 'company', 'value', 'duration', 'active']
-    list_filter = ['company', 'professional', 'active']
+    list_filter = [('professional', CompanyRelatedFieldListFilter), 'active']
+    list_select_related = ['professional', 'company']
     search_fields = ['name', 'professional__name']
+    autocomplete_fields = ['professional']
     readonly_fields = ['created_at', 'updated_at']
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(CompanyScopedAdmin):
     list_display = ['client', 'service', 'professional', 'start', 'status', 'created_by']
-    list_filter = ['status', 'professional', 'created_at']
+    list_filter = ['status', ('professional', CompanyRelatedFieldListFilter), 'created_at']
+    # service.__str__ usa o profissional e user.__str__ a empresa
+    list_select_related = ['client', 'service__professional', 'professional', 'created_by__company']
     search_fields = ['client__name', 'service__name']
+    autocomplete_fields = ['client', 'service', 'professional']
+    date_hierarchy = 'start'
     readonly_fields = ['created_at', 'updated_at', 'created_by', 'updated_by']
-    
+
     def save_model(self, request, obj, form, change):
         if not change:  # Criando novo
             obj.created_by = request.user
         obj.updated_by = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+
+class SeriesExceptionInline(admin.TabularInline):
+    model = SeriesException
+    extra = 0
+    readonly_fields = ['created_at']
+
+
+@admin.register(RecurringSeries)
+class RecurringSeriesAdmin(CompanyScopedAdmin):
+    list_display = ['client', 'service', 'professional', 'start', 'frequency', 'until', 'active']
+    list_filter = ['frequency', 'active']
+    list_select_related = ['client', 'service__professional', 'professional']
+    search_fields = ['client__name', 'service__name']
+    autocomplete_fields = ['client', 'service', 'professional']
+    readonly_fields = ['created_at', 'updated_at', 'created_by']
+    inlines = [SeriesExceptionInline]
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
@@ -0,0 +1,195 @@
+# ncalendar/analytics.py
+"""
+Indicadores de agenda calculados com NumPy.
+
+As colunas de Event (profissional, início, duração, status, valor) são lidas
+numa única consulta em streaming direto para arrays; heatmap de ocupação
+(dia da semana × hora), taxa de faltas e ticket médio saem de operações
+vetorizadas (bincount, cumsum), sem laços Python por agendamento.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db import connections
+from django.db.models import BigIntegerField, F, FloatField, Func
+from django.db.models.functions import Cast
+
+from .models import Event
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Vendas efetivas (ticket médio) e comparecimentos (taxa de faltas)
+TICKET_STATUSES = (2, 7)
+NO_SHOW_STATUS = 4
+CANCELLED_STATUS = 3
+
+COLUMNS = np.dtype([
+    ('professional', np.int64),
+    ('start', np.int64),
+    ('duration', np.int64),
+    ('status', np.int16),
+    ('value', np.float64),
+])
+
+
+class EpochSeconds(Func):
+    """Segundos Unix de um DateTimeField (UTC), calculados no banco"""
+    output_field = BigIntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="CAST(strftime('%%%%s', %(expressions)s) AS INTEGER)", **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="EXTRACT(EPOCH FROM %(expressions)s)::bigint", **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="TIMESTAMPDIFF(SECOND, '1970-01-01', %(expressions)s)", **extra_context)
+
+
+class DurationSeconds(Func):
+    """Segundos inteiros de um DurationField (microssegundos fora do PostgreSQL)"""
+    output_field = BigIntegerField()
+    template = '(%(expressions)s / 1000000)'
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="EXTRACT(EPOCH FROM %(expressions)s)::bigint", **extra_context)
+
+
+def load_columns(queryset):
+    """
+    Uma consulta em streaming → array estruturado (início em segundos Unix).
+
+    As conversões ficam no SQL e as linhas vão do cursor direto para o NumPy,
+    sem os conversores do ORM (datetime, Decimal, timedelta) por linha.
+    """
+    rows = queryset.annotate(
+        col_professional=F('professional_id'),
+        col_start=EpochSeconds('start'),
+        col_duration=DurationSeconds('duration'),
+        col_status=F('status'),
+        col_value=Cast('value', FloatField()),
+    ).values_list(*(f'col_{name}' for name in COLUMNS.names)).order_by()
+    sql, params = rows.query.sql_with_params()
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        chunks = iter(lambda: cursor.fetchmany(5000), [])
+        return np.fromiter((row for chunk in chunks for row in chunk), dtype=COLUMNS)
+
+
+def local_offsets(starts, tz):
+    """
+    Deslocamento UTC→local (segundos) de cada instante, respeitando horário de verão.
+
+    Fusos mudam em fronteiras de 15 minutos: o offset é calculado uma vez por
+    quarto de hora distinto e espalhado de volta com o índice inverso.
+    """
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64)
+    quarters, inverse = np.unique(starts // 900, return_inverse=True)
+    offsets = np.fromiter(
+        (
+            datetime.fromtimestamp(q * 900, dt_timezone.utc).astimezone(tz).utcoffset().total_seconds()
+            for q in quarters.tolist()
+        ),
+        dtype=np.int64, count=len(quarters),
+    )
+    return offsets[inverse]
+
+
+def weekday_counts(start_day, end_day):
+    """Quantas vezes cada dia da semana (0=segunda) ocorre em [start_day, end_day]"""
+    days = (end_day - start_day).days + 1
+    counts = np.full(7, days // 7, dtype=np.int64)
+    for i in range(days % 7):
+        counts[(start_day + timedelta(days=days // 7 * 7 + i)).weekday()] += 1
+    return counts
+
+
+def occupancy_heatmap(professional_index, n_professionals, local_starts, durations):
+    """
+    Minutos ocupados por profissional × dia da semana × hora (soma no período).
+
+    Cada agendamento marca +1 no minuto inicial e -1 no final numa semana
+    estendida em um dia (nenhum passa de 24h); a soma acumulada dá quantos
+    agendamentos ocupam cada minuto e o excesso volta para o começo da semana.
+    """
+    span = MINUTES_PER_WEEK + MINUTES_PER_DAY + 1
+    # 1970-01-01 foi quinta-feira: +3 dias alinha o minuto 0 à segunda-feira
+    begin = ((local_starts // 60) + 3 * MINUTES_PER_DAY) % MINUTES_PER_WEEK
+    end = begin + np.minimum(durations // 60, MINUTES_PER_DAY)
+
+    marks = np.zeros(n_professionals * span, dtype=np.int64)
+    np.add.at(marks, professional_index * span + begin, 1)
+    np.add.at(marks, professional_index * span + end, -1)
+    busy = np.cumsum(marks.reshape(n_professionals, span), axis=1)[:, :-1]
+
+    week = busy[:, :MINUTES_PER_WEEK].copy()
+    week[:, :MINUTES_PER_DAY] += busy[:, MINUTES_PER_WEEK:]
+    return week.reshape(n_professionals, 7, 24, 60).sum(axis=3)
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+
+def _clean(values, digits):
+    """Array → listas aninhadas com None no lugar de NaN"""
+    values = np.round(np.asarray(values, dtype=np.float64), digits)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def compute(queryset, tz, start_day, end_day):
+    """Heatmap de ocupação, taxa de faltas e ticket médio por profissional e no total"""
+    data = load_columns(queryset)
+    professionals, index = np.unique(data['professional'], return_inverse=True)
+    n = len(professionals)
+    status = data['status']
+
+    blocking = (status != CANCELLED_STATUS) & (status != NO_SHOW_STATUS)
+    local_starts = data['start'] + local_offsets(data['start'], tz)
+    minutes = occupancy_heatmap(index[blocking], n, local_starts[blocking], data['duration'][blocking])
+    # Fração de cada hora ocupada, na média das semanas do período
+    hours_available = weekday_counts(start_day, end_day)[None, :, None] * 60
+    occupancy = _ratio(minutes, hours_available)
+
+    events = np.bincount(index, minlength=n)
+    appointments = np.bincount(index, weights=status != CANCELLED_STATUS, minlength=n)
+    no_shows = np.bincount(index, weights=status == NO_SHOW_STATUS, minlength=n)
+    sold = np.isin(status, TICKET_STATUSES)
+    tickets = np.bincount(index, weights=sold, minlength=n)
+    revenue = np.bincount(index, weights=np.where(sold, data['value'], 0), minlength=n)
+
+    return {
+        'total': {
+            'events': int(len(data)),
+            'no_show_rate': _clean(_ratio(no_shows.sum(), appointments.sum()), 4),
+            'average_ticket': _clean(_ratio(revenue.sum(), tickets.sum()), 2),
+            'heatmap': _clean(_ratio(minutes.sum(axis=0), hours_available[0] * n), 4),
+        },
+        'professionals': [
+            {
+                'professional': professional_id,
+                'events': count,
+                'no_show_rate': no_show_rate,
+                'average_ticket': average_ticket,
+                'heatmap': heatmap,
+            }
+            for professional_id, count, no_show_rate, average_ticket, heatmap in zip(
+                professionals.tolist(),
+                events.tolist(),
+                _clean(_ratio(no_shows, appointments), 4),
+                _clean(_ratio(revenue, tickets), 2),
+                _clean(occupancy, 4),
+            )
+        ],
+    }
+
+
+def event_queryset(company, start, end, professional_ids=None):
+    """Agendamentos da empresa que começam em [start, end)"""
+    qs = Event.objects.filter(company=company, start__gte=start, start__lt=end)
+    if professional_ids:
+        qs = qs.filter(professional_id__in=professional_ids)
+    return qs
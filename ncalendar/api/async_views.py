@@ -0,0 +1,157 @@
+# ncalendar/api/async_views.py
+"""
+Leituras quentes da API com o ORM assíncrono (servidas por app/asgi.py).
+
+Mesmo JSON, ETags e cache de /api/events/, /api/professionals/,
+/api/services/ e /api/events/status_choices/, em views async do Django (o
+DRF não tem views async). Enquanto uma consulta aguarda, o worker segue
+atendendo outras requisições. Só leitura e só JSON; gravações continuam
+nos ViewSets síncronos.
+"""
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import parse_etags
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from accounts import tokens
+from accounts.authentication import bearer_token
+from accounts.models import User
+from ..cache import acompany_version, aversioned_key, get_cache
+from ..models import Professional, Service, Event, RecurringSeries
+from .mixins import fingerprint_aggregates, list_etag
+from .renderers import render_json
+from .serializers import EventCalendarSerializer, requested_fields
+from .views import parse_range, series_calendar_rows
+
+NOT_AUTHENTICATED = {'detail': 'As credenciais de autenticação não foram fornecidas.'}
+
+
+async def _company_user(request):
+    """Usuário autenticado (sessão ou token de API) com empresa, ou None"""
+    token = bearer_token(request)
+    if token is not None:
+        try:
+            user, _ = await sync_to_async(tokens.authenticate)(token)
+        except tokens.InvalidToken:
+            return None
+    else:
+        user = await request.auser()
+    if user.is_authenticated and user.company_id:
+        return user
+    return None
+
+
+def _json(content, etag=None):
+    response = HttpResponse(content, content_type='application/json')
+    if etag:
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+async def _conditional(request, basename, company_id, queryset):
+    """(etag, resposta 304 ou None) — mesma ETag do ConditionalListMixin"""
+    fingerprint = await queryset.order_by().aaggregate(**fingerprint_aggregates())
+    version = await acompany_version(company_id)
+    etag = list_etag(basename, 'json', version, fingerprint, request.GET)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return etag, response
+    return etag, None
+
+
+async def events(request):
+    """GET /api/async/events/?start=&end= — feed do calendário"""
+    user = await _company_user(request)
+    if user is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=403)
+    try:
+        bounds = parse_range(request.GET)
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=400)
+    if not bounds:
+        return JsonResponse({'start': 'Informe start e end.'}, status=400)
+
+    start, end = bounds
+    queryset = Event.objects.filter(
+        company_id=user.company_id,
+        start__gt=start - Event.MAX_DURATION, start__lt=end, end__gt=start,
+    )
+    etag, not_modified = await _conditional(request, 'event', user.company_id, queryset)
+    if not_modified:
+        return not_modified
+
+    # Mesma chave do EventViewSet: os dois caminhos compartilham o cache
+    fields = requested_fields(request)
+    cache = get_cache()
+    key = await aversioned_key(
+        'events', user.company_id,
+        *(bound.astimezone(dt_timezone.utc).isoformat() for bound in bounds),
+        ','.join(sorted(fields or ()))
+    )
+    content = await cache.aget(key)
+    if content is None:
+        rows = await EventCalendarSerializer.afast_rows(queryset)
+        if await RecurringSeries.objects.filter(company_id=user.company_id).overlapping(start, end).aexists():
+            rows.extend(await sync_to_async(series_calendar_rows)(user.company_id, start, end))
+        if fields:
+            rows = [{key: value for key, value in row.items() if key in fields} for row in rows]
+        content = render_json(rows)
+        await cache.aset(key, content, settings.NCALENDAR_EVENTS_CACHE_TIMEOUT)
+    return _json(content, etag)
+
+
+async def professionals(request):
+    """GET /api/async/professionals/ — recursos do calendário"""
+    user = await _company_user(request)
+    if user is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=403)
+    queryset = Professional.objects.filter(company_id=user.company_id, active=True)
+    etag, not_modified = await _conditional(request, 'professional', user.company_id, queryset)
+    if not_modified:
+        return not_modified
+
+    rows = queryset.annotate(
+        has_account=Exists(User.objects.filter(professional=OuterRef('pk')))
+    ).values_list('pk', 'name', 'has_account')
+    return _json(render_json([
+        {'id': pk, 'title': name, 'has_user_account': has_account}
+        async for pk, name, has_account in rows
+    ]), etag)
+
+
+async def services(request):
+    """GET /api/async/services/?professional= — serviços ativos"""
+    user = await _company_user(request)
+    if user is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=403)
+    queryset = Service.objects.filter(company_id=user.company_id, active=True)
+    professional_id = request.GET.get('professional')
+    if professional_id:
+        queryset = queryset.filter(professional_id=professional_id)
+    etag, not_modified = await _conditional(request, 'service', user.company_id, queryset)
+    if not_modified:
+        return not_modified
+
+    money = serializers.DecimalField(max_digits=10, decimal_places=2).to_representation
+    rows = queryset.values_list('pk', 'name', 'duration', 'value', 'professional_id', 'professional__name')
+    return _json(render_json([
+        {
+            'id': pk, 'name': name, 'duration_minutes': int(duration.total_seconds() // 60),
+            'value': money(value), 'professional': professional_id, 'professional_name': professional_name,
+        }
+        async for pk, name, duration, value, professional_id, professional_name in rows
+    ]), etag)
+
+
+async def status_choices(request):
+    """GET /api/async/events/status_choices/"""
+    if await _company_user(request) is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=403)
+    return JsonResponse([{'value': value, 'label': label} for value, label in Event.STATUS_CHOICES], safe=False)
@@ -0,0 +1,75 @@
+# ncalendar/api/mixins.py
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .. import routing
+from ..cache import company_version
+
+
+def fingerprint_aggregates():
+    """Impressão barata de uma listagem: max(updated_at) + contagem"""
+    return {'last': Max('updated_at'), 'count': Count('pk')}
+
+
+def list_etag(basename, format, version, fingerprint, params):
+    """ETag de uma listagem; o mesmo nas views síncronas e assíncronas"""
+    parts = [
+        basename,
+        format,
+        # Payload inclui dados relacionados (nomes, telefones), por isso a versão
+        version,
+        fingerprint['last'].isoformat() if fingerprint['last'] else '',
+        fingerprint['count'],
+        *sorted(f'{key}={value}' for key, value in params.items()),
+    ]
+    digest = hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+class ConditionalListMixin:
+    """
+    GET condicional no list: ETag forte a partir de uma impressão barata do
+    filtro (max(updated_at) + contagem) e da versão da empresa, sem serializar.
+    """
+
+    def get_list_fingerprint(self, queryset):
+        return queryset.order_by().aggregate(**fingerprint_aggregates())
+
+    def get_list_etag(self, request, queryset):
+        return list_etag(
+            self.basename, request.accepted_renderer.format,
+            company_version(request.user.company_id),
+            self.get_list_fingerprint(queryset), request.query_params,
+        )
+
+    def not_modified(self, request, etag):
+        """Resposta 304 se o cliente já tem a versão atual, senão None"""
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return None
+
+    def with_etag(self, response, etag):
+        response['ETag'] = etag
+        # Sempre revalidar com o servidor antes de reutilizar
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request, self.filter_queryset(self.get_queryset()))
+        return self.not_modified(request, etag) or self.with_etag(
+            super().list(request, *args, **kwargs), etag
+        )
+
+
+class ReplicaReadMixin:
+    """Requisições de leitura consultam uma réplica (ver ncalendar.routing)"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            routing.read_from_replica(request.user)
@@ -0,0 +1,18 @@
+# ncalendar/api/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Paginação por cursor (keyset): custo constante por página, sem OFFSET"""
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ClientCursorPagination(KeysetPagination):
+    # Coberto pelo índice único (company, name)
+    ordering = ('name', 'id')
+
+
+class EventCursorPagination(KeysetPagination):
+    ordering = ('start', 'id')
@@ -0,0 +1,26 @@
+# ncalendar/api/renderers.py
+"""
+Serialização JSON rápida com saída idêntica ao JSONRenderer do DRF.
+
+Usa orjson quando instalado; sem ele, json.dumps com as mesmas opções do
+DRF (compacto, UTF-8 sem escapes, NaN proibido).
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+
+def render_json(data):
+    """bytes JSON iguais aos que o JSONRenderer do DRF produziria para `data`"""
+    if orjson is not None:
+        content = orjson.dumps(data)
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+    content = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    # Mesmos escapes do DRF para uso seguro dentro de <script>
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode('utf-8')
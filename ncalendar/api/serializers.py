@@ -1,9 +1,54 @@
 # ncalendar/api/serializers.py
+from datetime import timedelta
+from django.contrib.auth import authenticate
+from django.utils import timezone
 from rest_framework import serializers
-from ..models import Professional, Client, Service, Event
+from ..metrics import serializer_timer
+from ..models import Professional, Client, Service, Event, RecurringSeries
+from ..tenancy import company_for
 
 
-class ProfessionalResourceSerializer(serializers.ModelSerializer):
+def requested_fields(request):
+    """Conjunto pedido em ?fields=a,b (None se ausente)"""
+    if request is None or request.method != 'GET':
+        return None
+    # Request do DRF ou HttpRequest das views assíncronas
+    raw = getattr(request, 'query_params', request.GET).get('fields')
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()} | {'id'}
+
+
+def is_root(serializer):
+    """Serializer raiz (ou filho direto do ListSerializer raiz), não aninhado"""
+    root = serializer.root
+    return root is serializer or getattr(root, 'child', None) is serializer
+
+
+class TimedRepresentationMixin:
+    """Tempo de to_representation do serializer raiz entra no Server-Timing"""
+
+    def to_representation(self, instance):
+        if not is_root(self):
+            return super().to_representation(instance)
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class SparseFieldsetMixin:
+    """?fields=a,b limita as colunas da resposta; só vale para o serializer raiz em GET"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not is_root(self):
+            return fields
+        requested = requested_fields(self.context.get('request'))
+        if requested:
+            fields = {name: field for name, field in fields.items() if name in requested}
+        return fields
+
+
+class ProfessionalResourceSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(source='pk')
     title = serializers.CharField(source='name')
     has_user_account = serializers.BooleanField(read_only=True)
@@ -13,13 +58,19 @@ class ProfessionalResourceSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'has_user_account']
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(TimedRepresentationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Client
         fields = ['id', 'name', 'phone']
 
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ClientImportSerializer(serializers.Serializer):
+    """Upload de /api/clients/import/ (CSV com colunas nome e telefone)"""
+    file = serializers.FileField()
+    dry_run = serializers.BooleanField(default=False)
+
+
+class ServiceSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     duration_minutes = serializers.SerializerMethodField()
     professional_name = serializers.CharField(source='professional.name', read_only=True)
 
@@ -34,7 +85,7 @@ class ServiceSerializer(serializers.ModelSerializer):
             return 0
 
 
-class EventCalendarSerializer(serializers.ModelSerializer):
+class EventCalendarSerializer(TimedRepresentationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     title = serializers.SerializerMethodField()
     resourceId = serializers.IntegerField(source='professional.id')
     clientPhone = serializers.SerializerMethodField()
@@ -69,8 +120,71 @@ class EventCalendarSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
+    # Colunas lidas pelo modo rápido, na ordem usada em `fast_rows`
+    FAST_COLUMNS = (
+        'id', 'start', 'end', 'professional_id', 'status',
+        'service__name', 'client_id', 'client__name', 'client__phone',
+    )
+
+    @classmethod
+    def fast_rows(cls, queryset):
+        """
+        Mesma saída de EventCalendarSerializer(queryset, many=True).data,
+        montada direto de tuplas de values_list, sem instanciar modelos nem
+        chamar SerializerMethodFields.
+        """
+        values = list(queryset.values_list(*cls.FAST_COLUMNS))
+        with serializer_timer():
+            return cls.rows_from_values(values)
+
+    @classmethod
+    async def afast_rows(cls, queryset):
+        """fast_rows com o ORM assíncrono"""
+        values = [row async for row in queryset.values_list(*cls.FAST_COLUMNS)]
+        with serializer_timer():
+            return cls.rows_from_values(values)
+
+    @classmethod
+    def rows_from_values(cls, values):
+        """Tuplas na ordem de FAST_COLUMNS → linhas do calendário"""
+        tz = timezone.get_current_timezone()
+        colors = Event.STATUS_COLORS
+        default_color = Event.DEFAULT_COLOR
+        dark = Event.DARK_STATUSES
+        labels = dict(Event.STATUS_CHOICES)
+
+        def iso(value):
+            # Igual a serializers.DateTimeField().to_representation
+            if value is None:
+                return None
+            value = value.astimezone(tz).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+
+        rows = []
+        append = rows.append
+        for (pk, start, end, professional_id, status,
+             service_name, client_id, client_name, client_phone) in values:
+            color = colors.get(status, default_color)
+            append({
+                'id': pk,
+                'title': f"{service_name} - {client_name}",
+                'start': iso(start),
+                'end': iso(end),
+                'resourceId': professional_id,
+                'backgroundColor': color,
+                'borderColor': color,
+                'textColor': "#ffffff" if status in dark else "#000000",
+                'clientPhone': client_phone,
+                'client': {'id': client_id, 'name': client_name, 'phone': client_phone},
+                'status': status,
+                'statusDisplay': labels.get(status, str(status)),
+            })
+        return rows
+
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(TimedRepresentationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     professional = serializers.PrimaryKeyRelatedField(queryset=Professional.objects.all())
     client = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all())
     service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all())
@@ -108,4 +222,156 @@ class EventSerializer(serializers.ModelSerializer):
 
         return attrs
 
-    # Mantemos apenas username; não precisamos de métodos auxiliares
\ No newline at end of file
+    # Mantemos apenas username; não precisamos de métodos auxiliares
+
+
+class RecurringSeriesSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    professional = serializers.PrimaryKeyRelatedField(queryset=Professional.objects.all())
+    client = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all())
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all())
+
+    duration_minutes = serializers.IntegerField(min_value=1, required=False)
+    client_data = ClientSerializer(source='client', read_only=True)
+
+    class Meta:
+        model = RecurringSeries
+        fields = [
+            'id', 'professional', 'client', 'client_data', 'service', 'start',
+            'duration_minutes', 'value', 'description', 'frequency', 'interval',
+            'weekdays', 'count', 'until', 'active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['created_at', 'updated_at']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['duration_minutes'] = int(instance.duration.total_seconds() // 60)
+        return data
+
+    def validate(self, attrs):
+        company = company_for(self.context['request'])
+        for field in ('professional', 'client', 'service'):
+            if field in attrs and attrs[field].company_id != company.pk:
+                raise serializers.ValidationError({field: 'Registro não encontrado.'})
+
+        if 'duration_minutes' in attrs:
+            attrs['duration'] = timedelta(minutes=attrs.pop('duration_minutes'))
+        elif not self.instance and 'service' in attrs:
+            attrs['duration'] = attrs['service'].duration
+        if not self.instance and 'service' in attrs:
+            attrs.setdefault('value', attrs['service'].value)
+        return attrs
+
+
+class EventBulkItemSerializer(serializers.Serializer):
+    """Item de /api/events/bulk/; só validações sem banco (o resto é feito em lote)"""
+    professional = serializers.IntegerField()
+    client = serializers.IntegerField()
+    service = serializers.IntegerField()
+    start = serializers.DateTimeField()
+    duration_minutes = serializers.IntegerField(min_value=1, required=False)
+    value = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    status = serializers.ChoiceField(choices=Event.STATUS_CHOICES, default=1)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class OccurrenceSerializer(serializers.Serializer):
+    original_start = serializers.DateTimeField()
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """Parâmetros de busca de horários livres"""
+    MAX_RANGE = timedelta(days=31)
+
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    service = serializers.IntegerField()
+    step = serializers.IntegerField(required=False, min_value=5, max_value=240, default=15)
+
+    def validate(self, attrs):
+        if attrs['end'] <= attrs['start']:
+            raise serializers.ValidationError({'end': 'O fim deve ser posterior ao início.'})
+        if attrs['end'] - attrs['start'] > self.MAX_RANGE:
+            raise serializers.ValidationError({'end': 'O período máximo de busca é de 31 dias.'})
+        attrs['step'] = timedelta(minutes=attrs['step'])
+        return attrs
+
+
+class SlotSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+
+class ReportQuerySerializer(serializers.Serializer):
+    """Parâmetros do relatório de faturamento e ocupação"""
+    MAX_DAYS = 731
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    period = serializers.ChoiceField(choices=['day', 'week', 'month'], default='day')
+    professional = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError({'end': 'O fim deve ser igual ou posterior ao início.'})
+        if (attrs['end'] - attrs['start']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'end': 'O período máximo do relatório é de 2 anos.'})
+        return attrs
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """Parâmetros dos indicadores (datas locais, fim incluso)"""
+    MAX_DAYS = 731
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    professional = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError({'end': 'O fim deve ser igual ou posterior ao início.'})
+        if (attrs['end'] - attrs['start']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'end': 'O período máximo do relatório é de 2 anos.'})
+        return attrs
+
+
+class ReportRowSerializer(serializers.Serializer):
+    period_start = serializers.DateField()
+    professional = serializers.IntegerField()
+    count = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    booked_hours = serializers.SerializerMethodField()
+    available_hours = serializers.SerializerMethodField()
+    utilization = serializers.FloatField(allow_null=True)
+
+    def get_booked_hours(self, row):
+        return round(row['booked_seconds'] / 3600, 2)
+
+    def get_available_hours(self, row):
+        return round(row['available_seconds'] / 3600, 2)
+
+
+class TokenObtainSerializer(serializers.Serializer):
+    """Credenciais para emitir token de API (opcionais com sessão ativa)"""
+    username = serializers.CharField(required=False)
+    password = serializers.CharField(required=False, style={'input_type': 'password'}, trim_whitespace=False)
+
+    def validate(self, attrs):
+        request = self.context['request']
+        if 'username' in attrs or 'password' in attrs:
+            user = authenticate(
+                request._request, username=attrs.get('username'), password=attrs.get('password')
+            )
+            if user is None:
+                raise serializers.ValidationError('Usuário ou senha inválidos.')
+        elif request.user.is_authenticated:
+            user = request.user
+        else:
+            raise serializers.ValidationError('Informe usuário e senha.')
+        attrs['user'] = user
+        return attrs
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Token a revogar; sem ele, o token da própria requisição"""
+    token = serializers.CharField(required=False)
@@ -0,0 +1,54 @@
+# ncalendar/api/streams.py
+"""
+Stream SSE das mudanças de agenda da empresa (requer ASGI: app/asgi.py).
+
+Views assíncronas do Django (o DRF não tem suporte a views async): uma
+conexão ociosa é só uma corrotina parada esperando a fila, sem thread.
+No WSGI o gerador infinito prenderia uma thread por aba aberta, então lá
+(ou com NCALENDAR_REALTIME_ENABLED desligado) a resposta é 204, que faz o
+EventSource parar de reconectar.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+from ..realtime import get_bus
+
+
+def realtime_enabled(request):
+    """O stream só é servido sob ASGI e com NCALENDAR_REALTIME_ENABLED"""
+    return getattr(settings, 'NCALENDAR_REALTIME_ENABLED', True) and isinstance(request, ASGIRequest)
+
+
+async def _event_stream(company_id):
+    heartbeat = getattr(settings, 'NCALENDAR_STREAM_HEARTBEAT', 15)
+    async with get_bus().subscribe(company_id) as queue:
+        # Reconexão automática do EventSource após 3s
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Comentário SSE: mantém proxies e balanceadores com a conexão aberta
+                yield ': ping\n\n'
+                continue
+            yield f'data: {json.dumps(message)}\n\n'
+
+
+async def event_stream(request):
+    """GET /api/events/stream/ — created/updated/deleted/refetch da empresa do usuário"""
+    user = await request.auser()
+    if not user.is_authenticated or not user.company_id:
+        return JsonResponse(
+            {'detail': 'As credenciais de autenticação não foram fornecidas.'}, status=403
+        )
+    if not realtime_enabled(request):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(_event_stream(user.company_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Desliga o buffer do nginx para a resposta chegar em tempo real
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,11 +1,33 @@
 # ncalendar/api/urls.py
+from django.urls import path, re_path
 from rest_framework.routers import DefaultRouter
-from .views import ProfessionalViewSet, ClientViewSet, ServiceViewSet, EventViewSet
+from .views import (
+    ProfessionalViewSet, ClientViewSet, ServiceViewSet, EventViewSet, RecurringSeriesViewSet,
+    ReportViewSet, AnalyticsViewSet, MetricsViewSet, AuthTokenViewSet,
+    BootstrapViewSet, EventExportView
+)
+from . import async_views
+from .streams import event_stream
 
 router = DefaultRouter()
 router.register('professionals', ProfessionalViewSet, basename='professional')
 router.register('clients', ClientViewSet)
 router.register('services', ServiceViewSet)
 router.register('events', EventViewSet, basename='event')
+router.register('series', RecurringSeriesViewSet)
+router.register('reports', ReportViewSet, basename='report')
+router.register('analytics', AnalyticsViewSet, basename='analytics')
+router.register('bootstrap', BootstrapViewSet, basename='bootstrap')
+router.register('metrics', MetricsViewSet, basename='metrics')
+router.register('auth/token', AuthTokenViewSet, basename='auth-token')
 
-urlpatterns = router.urls
\ No newline at end of file
+# Antes do router: events/<pk>/ capturaria "stream" e "export.<formato>"
+urlpatterns = [
+    path('events/stream/', event_stream, name='event-stream'),
+    re_path(r'^events/export\.(?P<fmt>csv|ics)$', EventExportView.as_view(), name='event-export'),
+    # Leituras com o ORM assíncrono (ASGI)
+    path('async/events/', async_views.events, name='async-event-list'),
+    path('async/events/status_choices/', async_views.status_choices, name='async-event-status-choices'),
+    path('async/professionals/', async_views.professionals, name='async-professional-list'),
+    path('async/services/', async_views.services, name='async-service-list'),
+] + router.urls
\ No newline at end of file
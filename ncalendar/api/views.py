@@ -1,53 +1,244 @@
 # ncalendar/api/views.py
-from rest_framework import viewsets
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
-from rest_framework.exceptions import ValidationError
-from ..models import Professional, Client, Service, Event
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError, APIException
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags
+from accounts import tokens
+from ..models import (
+    Professional, Client, Service, Event, EventConflictError,
+    RecurringSeries, SeriesException
+)
+from .. import analytics, availability, bootstrap, bulk, exports, feeds, imports, metrics, rollups, sync
+from ..cache import get_cache, versioned_key
+from ..recurrence import expand_occurrences, is_occurrence
+from ..search import search_clients
+from ..tenancy import company_for
+from .mixins import ConditionalListMixin, ReplicaReadMixin
+from .pagination import ClientCursorPagination, EventCursorPagination
+from .renderers import render_json
 from .serializers import (
-    ProfessionalResourceSerializer, ClientSerializer,
-    ServiceSerializer, EventSerializer, EventCalendarSerializer
+    ProfessionalResourceSerializer, ClientSerializer, ClientImportSerializer,
+    ServiceSerializer, EventSerializer, EventCalendarSerializer,
+    AvailabilityQuerySerializer, SlotSerializer, EventBulkItemSerializer,
+    RecurringSeriesSerializer, OccurrenceSerializer, requested_fields,
+    ReportQuerySerializer, ReportRowSerializer, AnalyticsQuerySerializer,
+    TokenObtainSerializer, TokenRevokeSerializer
 )
 
 
+def parse_range(params):
+    """Lê start/end (data ou data-hora ISO 8601) como datetimes aware; None se ausentes"""
+    bounds = []
+    for key in ('start', 'end'):
+        raw = params.get(key)
+        if not raw:
+            return None
+        value = parse_datetime(raw.replace(' ', '+'))
+        if value is None:
+            day = parse_date(raw)
+            if day is None:
+                raise ValidationError({key: 'Data inválida.'})
+            value = datetime.combine(day, time.min)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        bounds.append(value)
+    return tuple(bounds)
+
+
+def django_validation_error(e):
+    """Converte ValidationError do Django para DRF"""
+    return ValidationError(e.message_dict if hasattr(e, 'message_dict') else {'detail': str(e)})
+
+
+def series_calendar_rows(company_id, start, end):
+    """Ocorrências virtuais das séries na janela, no mesmo formato do calendário"""
+    series = RecurringSeries.objects.filter(
+        company_id=company_id
+    ).overlapping(start, end).select_related('company', 'professional', 'client', 'service')
+    occurrences = expand_occurrences(series, start, end)
+    events = [occurrence_series.as_event(moment) for occurrence_series, moment in occurrences]
+    data = EventCalendarSerializer(events, many=True).data
+    to_iso = serializers.DateTimeField().to_representation
+    for item, (occurrence_series, moment) in zip(data, occurrences):
+        item['id'] = f"series-{occurrence_series.pk}-{int(moment.timestamp())}"
+        item['seriesId'] = occurrence_series.pk
+        item['originalStart'] = to_iso(moment)
+    return data
+
+
+class SyncCursorExpired(APIException):
+    """410: o cliente deve descartar o cache local e sincronizar do zero"""
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Cursor expirado; faça uma sincronização completa.'
+    default_code = 'cursor_expired'
+
+
+class EventConflict(APIException):
+    """409 com os agendamentos conflitantes"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'O profissional já possui agendamento neste horário.'
+    default_code = 'conflict'
+
+    def __init__(self, conflicts):
+        super().__init__()
+        to_iso = serializers.DateTimeField().to_representation
+        # Atribuído direto para não converter os ids em strings
+        self.detail = {
+            'detail': self.default_detail,
+            'code': self.default_code,
+            'conflicts': [
+                {
+                    'id': e.pk, 'series': e.series_id,
+                    'start': to_iso(e.start), 'end': to_iso(e.end), 'status': e.status,
+                }
+                for e in conflicts
+            ],
+        }
+
+
 class CompanyFilteredViewSet(viewsets.ModelViewSet):
     """ViewSet base que filtra automaticamente por company"""
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return super().get_queryset().filter(company=self.request.user.company)
+        return super().get_queryset().filter(company=company_for(self.request))
     
     def perform_create(self, serializer):
-        serializer.save(company=self.request.user.company)
+        serializer.save(company=company_for(self.request))
 
 
-class ProfessionalViewSet(CompanyFilteredViewSet):
-    queryset = Professional.objects.filter(active=True)
+class ProfessionalViewSet(ReplicaReadMixin, ConditionalListMixin, CompanyFilteredViewSet):
+    # user_account junto: has_user_account sem uma consulta por profissional
+    queryset = Professional.objects.filter(active=True).select_related('user_account')
     serializer_class = ProfessionalResourceSerializer
 
+    def _availability_params(self, request):
+        params = AvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data
+
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        """Horários livres do profissional para a duração do serviço"""
+        professional = self.get_object()
+        params = self._availability_params(request)
+        service = Service.objects.filter(
+            pk=params['service'], professional=professional, active=True
+        ).first()
+        if service is None:
+            raise ValidationError({'service': 'Serviço não encontrado para este profissional.'})
+
+        slots = availability.available_slots(
+            professional, params['start'], params['end'], service.duration, params['step']
+        )
+        return Response({
+            'professional': professional.pk,
+            'service': service.pk,
+            'duration_minutes': service.duration_minutes,
+            'slots': SlotSerializer(
+                [{'start': start, 'end': end} for start, end in slots], many=True
+            ).data,
+        })
+
+    @action(detail=True, methods=['get', 'post'])
+    def feed(self, request, pk=None):
+        """URL de assinatura .ics do profissional; POST gera um novo token (invalida o anterior)"""
+        professional = self.get_object()
+        token = feeds.ensure_token(professional, rotate=request.method == 'POST')
+        return Response({'url': request.build_absolute_uri(reverse('professional-feed', args=[token]))})
+
+    @action(detail=False, methods=['get'])
+    def first_available(self, request):
+        """Primeiro horário livre entre os profissionais que oferecem o serviço"""
+        params = self._availability_params(request)
+        company = company_for(request)
+        reference = Service.objects.filter(pk=params['service'], company=company).first()
+        if reference is None:
+            raise ValidationError({'service': 'Serviço não encontrado.'})
+
+        # Serviços equivalentes (mesmo nome) de outros profissionais ativos
+        services = Service.objects.filter(
+            company=company,
+            name__iexact=reference.name,
+            active=True,
+            professional__active=True,
+        ).select_related('professional', 'company')
+        best = availability.first_available_slot(
+            services, params['start'], params['end'], params['step']
+        )
+        if best is None:
+            return Response(
+                {'detail': 'Nenhum horário livre no período.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        service, start, end = best
+        slot = SlotSerializer({'start': start, 'end': end}).data
+        return Response({
+            'professional': service.professional_id,
+            'professional_name': service.professional.name,
+            'service': service.pk,
+            'duration_minutes': service.duration_minutes,
+            **slot,
+        })
 
-class ClientViewSet(CompanyFilteredViewSet):
+
+class ClientViewSet(ReplicaReadMixin, CompanyFilteredViewSet):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
+    # Sem ?q= a lista é paginada por cursor (memória constante por requisição)
+    pagination_class = ClientCursorPagination
+    SEARCH_LIMIT = 50
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        q = self.request.query_params.get('q')
-        if q:
-            qs = qs.filter(name__icontains=q)[:50]
-        return qs
+    def list(self, request, *args, **kwargs):
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return super().list(request, *args, **kwargs)
+        # Busca indexada por nome normalizado/telefone, ordenada por relevância;
+        # mesmo envelope da lista paginada, numa única página de até SEARCH_LIMIT
+        clients = search_clients(self.get_queryset(), q, limit=self.SEARCH_LIMIT)
+        return Response({
+            'next': None, 'previous': None,
+            'results': self.get_serializer(clients, many=True).data,
+        })
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_csv(self, request):
+        """Importa clientes de um CSV (upsert por telefone/nome); relatório com erros por linha"""
+        params = ClientImportSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            result = imports.import_clients(
+                company_for(request), params.validated_data['file'],
+                dry_run=params.validated_data['dry_run'],
+            )
+        except ValueError as e:
+            # Inclui UnicodeDecodeError (arquivo fora de UTF-8)
+            raise ValidationError({'file': str(e)})
+        return Response(result.as_dict())
 
 
-class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
+class ServiceViewSet(ReplicaReadMixin, ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     """Serviços filtrados por company e opcionalmente por profissional"""
     permission_classes = [IsAuthenticated]
     queryset = Service.objects.filter(active=True)
     serializer_class = ServiceSerializer
     
     def get_queryset(self):
-        qs = super().get_queryset().filter(company=self.request.user.company)
+        qs = super().get_queryset().filter(
+            company=company_for(self.request)
+        ).select_related('professional')
         
         # Filtrar por profissional se especificado
         professional_id = self.request.query_params.get('professional')
@@ -57,42 +248,341 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
         return qs
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ReplicaReadMixin, ConditionalListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    # Usada apenas sem start/end; o feed do calendário é limitado pelo período
+    pagination_class = EventCursorPagination
     
     def get_queryset(self):
         qs = Event.objects.filter(
-            professional__company=self.request.user.company
+            company=company_for(self.request)
         ).select_related('client', 'service', 'professional', 'created_by', 'updated_by')
         
-        start = self.request.query_params.get('start')
-        end = self.request.query_params.get('end')
-        if start and end:
-            qs = qs.filter(end__gt=start, start__lt=end)
+        bounds = parse_range(self.request.query_params)
+        if bounds:
+            start, end = bounds
+            # Limite inferior em start: faixa fechada no índice (company, start, end)
+            qs = qs.filter(start__gt=start - Event.MAX_DURATION, start__lt=end, end__gt=start)
         return qs
     
     def get_serializer_class(self):
         return EventCalendarSerializer if self.action == 'list' else EventSerializer
-    
+
+    def list(self, request, *args, **kwargs):
+        bounds = parse_range(request.query_params)
+        if not bounds:
+            return super().list(request, *args, **kwargs)
+
+        etag = self.get_list_etag(request, self.filter_queryset(self.get_queryset()))
+        not_modified = self.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        if request.accepted_renderer.format != 'json':
+            # API navegável: mesmo conteúdo, sem o atalho de bytes em cache
+            return self.with_etag(Response(self._calendar_rows(bounds)), etag)
+
+        # Feed do calendário: JSON já renderizado, cacheado por empresa +
+        # período normalizado (UTC); a versão da empresa na chave muda a cada gravação
+        cache = get_cache()
+        key = versioned_key(
+            'events', request.user.company_id,
+            *(bound.astimezone(dt_timezone.utc).isoformat() for bound in bounds),
+            ','.join(sorted(requested_fields(request) or ()))
+        )
+        content = cache.get(key)
+        if content is None:
+            content = render_json(self._calendar_rows(bounds))
+            cache.set(key, content, settings.NCALENDAR_EVENTS_CACHE_TIMEOUT)
+        return self.with_etag(HttpResponse(content, content_type='application/json'), etag)
+
+    def _calendar_rows(self, bounds):
+        rows = EventCalendarSerializer.fast_rows(self.filter_queryset(self.get_queryset()))
+        rows.extend(series_calendar_rows(self.request.user.company_id, *bounds))
+        fields = requested_fields(self.request)
+        if fields:
+            rows = [{key: value for key, value in row.items() if key in fields} for row in rows]
+        return rows
+
     def perform_create(self, serializer):
         """Adiciona created_by automaticamente ao criar"""
         try:
             serializer.save(created_by=self.request.user, updated_by=self.request.user)
+        except EventConflictError as e:
+            raise EventConflict(e.conflicts)
         except DjangoValidationError as e:
-            # Converte ValidationError do Django para DRF
-            raise ValidationError(e.message_dict if hasattr(e, 'message_dict') else {'detail': str(e)})
+            raise django_validation_error(e)
     
     def perform_update(self, serializer):
         """Adiciona updated_by automaticamente ao atualizar"""
         try:
             serializer.save(updated_by=self.request.user)
+        except EventConflictError as e:
+            raise EventConflict(e.conflicts)
         except DjangoValidationError as e:
-            # Converte ValidationError do Django para DRF
-            raise ValidationError(e.message_dict if hasattr(e, 'message_dict') else {'detail': str(e)})
+            raise django_validation_error(e)
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Cria vários agendamentos de uma vez (tudo ou nada); erros por índice"""
+        if not isinstance(request.data, list) or not request.data:
+            raise ValidationError({'detail': 'Envie uma lista de agendamentos.'})
+        if len(request.data) > bulk.MAX_BATCH_SIZE:
+            raise ValidationError({'detail': f'Máximo de {bulk.MAX_BATCH_SIZE} agendamentos por lote.'})
+
+        items = EventBulkItemSerializer(data=request.data, many=True)
+        if not items.is_valid():
+            errors = [{'index': i, 'errors': e} for i, e in enumerate(items.errors) if e]
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        events, errors = bulk.create_events(
+            company_for(request), request.user, [dict(item) for item in items.validated_data]
+        )
+        if errors:
+            return Response(
+                {'errors': [{'index': i, 'errors': errors[i]} for i in sorted(errors)]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            {'created': len(events), 'ids': [event.pk for event in events]},
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Agendamentos criados, alterados ou excluídos desde o cursor"""
+        company = company_for(request)
+        since = request.query_params.get('since')
+        if not since:
+            # Sem cursor: devolve apenas o ponto de partida
+            return Response({
+                'created': [], 'updated': [], 'deleted': [],
+                'cursor': sync.current_cursor(company), 'has_more': False,
+            })
+
+        try:
+            since_at = sync.decode_cursor(since)[0]
+            events, deleted, cursor, has_more = sync.changes_since(
+                self.get_queryset(), company, since
+            )
+        except sync.InvalidCursor as e:
+            raise ValidationError({'since': str(e)})
+        except sync.CursorExpired as e:
+            raise SyncCursorExpired(str(e))
+
+        created = [event for event in events if event.created_at > since_at]
+        updated = [event for event in events if event.created_at <= since_at]
+        return Response({
+            'created': EventCalendarSerializer(created, many=True).data,
+            'updated': EventCalendarSerializer(updated, many=True).data,
+            'deleted': deleted,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
+
     @action(detail=False, methods=['get'])
     def status_choices(self, request):
         return Response([
             {'value': status[0], 'label': status[1]} 
             for status in Event.STATUS_CHOICES
         ])
+
+
+class RecurringSeriesViewSet(CompanyFilteredViewSet):
+    """Séries recorrentes; ocorrências são expandidas no feed de /api/events/"""
+    queryset = RecurringSeries.objects.select_related('client')
+    serializer_class = RecurringSeriesSerializer
+
+    def perform_create(self, serializer):
+        try:
+            serializer.save(company=company_for(self.request), created_by=self.request.user)
+        except DjangoValidationError as e:
+            raise django_validation_error(e)
+
+    def perform_update(self, serializer):
+        try:
+            serializer.save()
+        except DjangoValidationError as e:
+            raise django_validation_error(e)
+
+    def _occurrence_start(self, request, series):
+        params = OccurrenceSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        original_start = params.validated_data['original_start']
+        if not is_occurrence(series, original_start):
+            raise ValidationError({'original_start': 'Não é uma ocorrência desta série.'})
+        if (SeriesException.objects.filter(series=series, original_start=original_start).exists()
+                or series.events.filter(original_start=original_start).exists()):
+            raise ValidationError({'original_start': 'Ocorrência já editada ou cancelada.'})
+        return original_start
+
+    @action(detail=True, methods=['post'])
+    def materialize(self, request, pk=None):
+        """Cria o Event de uma ocorrência para que ela possa ser editada"""
+        series = self.get_object()
+        event = series.as_event(self._occurrence_start(request, series))
+        event.created_by = event.updated_by = request.user
+        try:
+            event.save()
+        except EventConflictError as e:
+            raise EventConflict(e.conflicts)
+        except DjangoValidationError as e:
+            raise django_validation_error(e)
+        return Response(EventSerializer(event).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def cancel_occurrence(self, request, pk=None):
+        """Cancela uma ocorrência sem criar Event"""
+        series = self.get_object()
+        exception = SeriesException.objects.create(
+            series=series, original_start=self._occurrence_start(request, series)
+        )
+        return Response(
+            {'series': series.pk, 'original_start': OccurrenceSerializer(exception).data['original_start']},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ReportViewSet(viewsets.ViewSet):
+    """Faturamento, status e ocupação por profissional (lido dos resumos diários)"""
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        params = ReportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        rows = rollups.report(
+            company_for(request), params['start'], params['end'],
+            params['period'], params.get('professional'),
+        )
+        return Response({
+            'start': params['start'],
+            'end': params['end'],
+            'period': params['period'],
+            'results': ReportRowSerializer(rows, many=True).data,
+        })
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Heatmap de ocupação (dia da semana × hora, segunda = 0), taxa de faltas e ticket médio"""
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        params = AnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        company = company_for(request)
+        tz = availability.company_timezone(company)
+        queryset = analytics.event_queryset(
+            company,
+            datetime.combine(params['start'], time.min, tzinfo=tz),
+            datetime.combine(params['end'] + timedelta(days=1), time.min, tzinfo=tz),
+            params.get('professional'),
+        )
+        return Response({
+            'start': params['start'],
+            'end': params['end'],
+            **analytics.compute(queryset, tz, params['start'], params['end']),
+        })
+
+
+class EventExportView(APIView):
+    """
+    GET /api/events/export.csv|.ics — agendamentos da empresa por streaming.
+
+    Parâmetros opcionais: start/end (início do agendamento) e professional
+    (repetível ou separado por vírgula). Memória constante em qualquer período.
+    """
+    permission_classes = [IsAuthenticated]
+    FORMATS = {
+        'csv': ('text/csv; charset=utf-8', exports.csv_stream),
+        'ics': ('text/calendar; charset=utf-8', exports.ics_stream),
+    }
+
+    def perform_content_negotiation(self, request, force=False):
+        # O formato vem da extensão na URL; Accept: text/csv não deve dar 406
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, fmt):
+        company = company_for(request)
+        if company is None:
+            raise ValidationError({'detail': 'Usuário sem empresa.'})
+        bounds = parse_range(request.query_params) or (None, None)
+        try:
+            professional_ids = [
+                int(value)
+                for raw in request.query_params.getlist('professional')
+                for value in raw.split(',') if value.strip()
+            ]
+        except ValueError:
+            raise ValidationError({'professional': 'Informe IDs numéricos.'})
+
+        content_type, stream = self.FORMATS[fmt]
+        queryset = exports.export_queryset(company, *bounds, professional_ids=professional_ids)
+        response = StreamingHttpResponse(stream(queryset, company), content_type=content_type)
+        period = '-'.join(bound.date().isoformat() for bound in bounds if bound)
+        filename = '-'.join(filter(None, ['agendamentos', company.slug, period]))
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+        response['Cache-Control'] = 'private, no-store'
+        # Sem buffer no nginx: as linhas chegam conforme saem do banco
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class BootstrapViewSet(viewsets.ViewSet):
+    """Dados iniciais do calendário numa chamada; ETag pela versão da empresa"""
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        company = company_for(request)
+        if company is None:
+            raise ValidationError({'detail': 'Usuário sem empresa.'})
+        payload = bootstrap.get_payload(company)
+        etag = f'"bootstrap-{company.pk}-{payload["version"]}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = HttpResponse(render_json(payload), content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """Histogramas por endpoint deste processo (consultas, SQL, serializer, tempo total)"""
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(metrics.registry.snapshot())
+
+    @action(detail=False, methods=['post'])
+    def reset(self, request):
+        metrics.registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AuthTokenViewSet(viewsets.ViewSet):
+    """Tokens de API assinados (Authorization: Bearer) para apps móveis e integrações"""
+
+    def get_permissions(self):
+        if self.action == 'create':
+            return [AllowAny()]
+        return [IsAuthenticated()]
+
+    def create(self, request):
+        serializer = TokenObtainSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        token, expires_at = tokens.issue(serializer.validated_data['user'])
+        return Response({'token': token, 'expires_at': expires_at}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def revoke(self, request):
+        serializer = TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = serializer.validated_data.get('token') or (request.auth if isinstance(request.auth, str) else None)
+        if not token:
+            raise ValidationError({'token': 'Informe o token a revogar.'})
+        try:
+            tokens.revoke(token, user=request.user)
+        except tokens.InvalidToken as e:
+            raise ValidationError({'token': str(e)})
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,195 @@
+# ncalendar/availability.py
+"""
+Motor de disponibilidade dos profissionais.
+
+Todos os intervalos são tuplas (início, fim) semiabertas em datetimes aware.
+A agenda livre é o expediente (menos intervalos) subtraído dos agendamentos,
+calculada com varreduras ordenadas por (início, fim) sobre poucos registros
+carregados em lote, sem consultas por dia ou por profissional.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.utils import timezone
+
+from .models import Event, WorkingHours, Break, RecurringSeries
+
+DEFAULT_STEP = timedelta(minutes=15)
+
+
+def merge_intervals(intervals):
+    """Une intervalos sobrepostos ou adjacentes numa varredura ordenada"""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_intervals(base, busy):
+    """Remove de `base` os trechos ocupados; ambos devem estar mesclados e ordenados"""
+    result = []
+    i = 0
+    for start, end in base:
+        cursor = start
+        # Pula ocupações que terminam antes do intervalo atual
+        while i < len(busy) and busy[i][1] <= cursor:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < end:
+            busy_start, busy_end = busy[j]
+            if busy_start > cursor:
+                result.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            if cursor >= end:
+                break
+            j += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def company_timezone(company):
+    """Fuso horário da empresa, com fallback para o fuso padrão do projeto"""
+    try:
+        return ZoneInfo(company.timezone)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return timezone.get_default_timezone()
+
+
+def _weekly_intervals(rules, start, end, tz):
+    """Expande regras semanais (weekday, início, fim) nas datas locais do período"""
+    by_weekday = defaultdict(list)
+    for weekday, start_time, end_time in rules:
+        by_weekday[weekday].append((start_time, end_time))
+
+    intervals = []
+    day = start.astimezone(tz).date()
+    last_day = end.astimezone(tz).date()
+    while day <= last_day:
+        for start_time, end_time in by_weekday.get(day.weekday(), ()):
+            intervals.append((
+                datetime.combine(day, start_time, tzinfo=tz),
+                datetime.combine(day, end_time, tzinfo=tz),
+            ))
+        day += timedelta(days=1)
+    return merge_intervals(intervals)
+
+
+def clip_intervals(intervals, start, end):
+    """Recorta os intervalos à janela [start, end)"""
+    return [
+        (max(s, start), min(e, end))
+        for s, e in intervals
+        if e > start and s < end
+    ]
+
+
+def busy_intervals(professional_ids, start, end):
+    """Agendamentos e ocorrências de séries que ocupam a agenda, por profissional"""
+    rows = (
+        Event.objects
+        .filter(
+            professional_id__in=professional_ids,
+            start__gt=start - Event.MAX_DURATION,
+            start__lt=end,
+            end__gt=start,
+        )
+        .exclude(status__in=Event.NON_BLOCKING_STATUSES)
+        .values_list('professional_id', 'start', 'end')
+    )
+    busy = defaultdict(list)
+    for professional_id, event_start, event_end in rows:
+        busy[professional_id].append((event_start, event_end))
+
+    # Ocorrências virtuais de séries recorrentes
+    from .recurrence import expand_occurrences
+    series = RecurringSeries.objects.overlapping(start, end).filter(
+        professional_id__in=professional_ids
+    ).select_related('company')
+    for occurrence_series, occurrence_start in expand_occurrences(series, start, end):
+        busy[occurrence_series.professional_id].append(
+            (occurrence_start, occurrence_start + occurrence_series.duration)
+        )
+    return busy
+
+
+def free_intervals(professional_ids, start, end, tz):
+    """Janelas livres por profissional: expediente - intervalos - agendamentos"""
+    professional_ids = list(professional_ids)
+    hours = defaultdict(list)
+    for professional_id, *rule in WorkingHours.objects.filter(
+        professional_id__in=professional_ids
+    ).values_list('professional_id', 'weekday', 'start_time', 'end_time'):
+        hours[professional_id].append(rule)
+
+    breaks = defaultdict(list)
+    for professional_id, *rule in Break.objects.filter(
+        professional_id__in=professional_ids
+    ).values_list('professional_id', 'weekday', 'start_time', 'end_time'):
+        breaks[professional_id].append(rule)
+
+    busy = busy_intervals(professional_ids, start, end)
+
+    free = {}
+    for professional_id in professional_ids:
+        working = _weekly_intervals(hours[professional_id], start, end, tz)
+        working = clip_intervals(working, start, end)
+        blocked = _weekly_intervals(breaks[professional_id], start, end, tz)
+        blocked = merge_intervals(blocked + busy[professional_id])
+        free[professional_id] = subtract_intervals(working, blocked)
+    return free
+
+
+def _align(moment, step):
+    """Arredonda para cima até o próximo múltiplo de `step` (relativo à época)"""
+    step_seconds = int(step.total_seconds())
+    seconds = int(moment.timestamp())
+    remainder = seconds % step_seconds
+    aligned = moment.replace(microsecond=0)
+    if remainder or moment.microsecond:
+        aligned += timedelta(seconds=step_seconds - remainder)
+    return aligned
+
+
+def iter_slots(free, duration, step=DEFAULT_STEP):
+    """Gera horários de tamanho `duration` alinhados a `step` dentro das janelas livres"""
+    for start, end in free:
+        slot_start = _align(start, step)
+        while slot_start + duration <= end:
+            yield slot_start, slot_start + duration
+            slot_start += step
+
+
+def available_slots(professional, start, end, duration, step=DEFAULT_STEP):
+    """Horários livres de um profissional no período"""
+    tz = company_timezone(professional.company)
+    free = free_intervals([professional.pk], start, end, tz)[professional.pk]
+    return list(iter_slots(free, duration, step))
+
+
+def first_available_slot(services, start, end, step=DEFAULT_STEP):
+    """
+    Primeiro horário livre entre vários profissionais.
+
+    `services` são serviços equivalentes de profissionais diferentes; cada um
+    usa a duração do próprio serviço. Retorna (service, início, fim) ou None.
+    """
+    services = list(services)
+    if not services:
+        return None
+    tz = company_timezone(services[0].company)
+    free = free_intervals({s.professional_id for s in services}, start, end, tz)
+
+    best = None
+    for service in services:
+        slot = next(iter_slots(free[service.professional_id], service.duration, step), None)
+        if slot and (best is None or slot[0] < best[1]):
+            best = (service, *slot)
+    return best
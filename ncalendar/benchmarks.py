@@ -0,0 +1,206 @@
+# ncalendar/benchmarks.py
+"""Utilitários dos comandos de benchmark (dados sintéticos e medições)"""
+import itertools
+import random
+import statistics
+import time
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.models import Company
+from .availability import company_timezone
+from .models import Professional, Client, Service, Event, WorkingHours, Break
+
+FIRST_NAMES = ['Ana', 'João', 'Maria', 'José', 'Lúcia', 'Pedro', 'Beatriz', 'Márcio', 'Érica', 'Luís']
+LAST_NAMES = ['Silva', 'Souza', 'Oliveira', 'Conceição', 'Araújo', 'Gonçalves', 'Lima', 'Ribeiro']
+SERVICES = [('Corte', 30, '50.00'), ('Escova', 45, '60.00'), ('Coloração', 90, '180.00'), ('Manicure', 40, '35.00')]
+STATUS_WEIGHTS = [(1, 60), (2, 25), (3, 7), (4, 4), (6, 2), (7, 2)]
+# generate_company: passado já atendido, futuro ainda agendado
+PAST_STATUS_WEIGHTS = [(2, 82), (3, 8), (4, 5), (7, 5)]
+FUTURE_STATUS_WEIGHTS = [(1, 92), (3, 8)]
+
+# Expediente padrão (segunda a sábado) e almoço nos dias úteis
+OPENING_HOURS = {weekday: (dt_time(8), dt_time(19)) for weekday in range(5)}
+OPENING_HOURS[5] = (dt_time(8), dt_time(13))
+LUNCH = (dt_time(12), dt_time(13))
+
+
+def _create_catalog(company, professionals, clients, rng):
+    """Profissionais, serviços (4 por profissional) e clientes da empresa"""
+    professional_objs = Professional.objects.bulk_create([
+        Professional(company=company, name=f'Profissional {i + 1}') for i in range(professionals)
+    ])
+    service_objs = Service.objects.bulk_create([
+        Service(
+            company=company, professional=professional, name=service_name,
+            duration=timedelta(minutes=minutes), value=Decimal(value),
+        )
+        for professional in professional_objs
+        for service_name, minutes, value in SERVICES
+    ])
+    client_objs = [
+        Client(
+            company=company,
+            name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}',
+            phone=f'+55 (11) 9{company.pk:03d}{i:05d}' if i % 10 else None,
+        )
+        for i in range(clients)
+    ]
+    for client in client_objs:
+        client.update_search_fields()
+    client_objs = Client.objects.bulk_create(client_objs, batch_size=1000)
+    return professional_objs, service_objs, client_objs
+
+
+def create_sample_company(name, professionals=10, clients=500, events=2000, start=None, seed=0):
+    """Empresa com dados realistas inseridos em lote; retorna a Company"""
+    rng = random.Random(seed)
+    company = Company.objects.create(name=name, slug=slugify(name))
+    start = start or timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    professional_objs, service_objs, client_objs = _create_catalog(company, professionals, clients, rng)
+
+    # Agenda sem sobreposição: cada profissional anda para frente no tempo
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    cursors = {professional.pk: start for professional in professional_objs}
+    services_by_professional = {}
+    for service in service_objs:
+        services_by_professional.setdefault(service.professional_id, []).append(service)
+
+    event_objs = []
+    for i in range(events):
+        professional = professional_objs[i % professionals]
+        service = rng.choice(services_by_professional[professional.pk])
+        event_start = cursors[professional.pk]
+        if event_start.hour >= 19:
+            event_start = (event_start + timedelta(days=1)).replace(hour=8, minute=0)
+        cursors[professional.pk] = event_start + service.duration + timedelta(minutes=rng.choice([0, 15, 30]))
+        event_objs.append(Event(
+            company=company, professional=professional, client=rng.choice(client_objs), service=service,
+            start=event_start, end=event_start + service.duration, duration=service.duration,
+            value=service.value, status=rng.choices(statuses, weights)[0],
+        ))
+    Event.objects.bulk_create(event_objs, batch_size=1000)
+    return company
+
+
+def generate_company(name, slug, start_day, end_day, professionals=10, clients=2000,
+                     occupancy=0.7, seed=0, password=None, batch_size=5000):
+    """
+    Empresa com anos de agenda realista: expediente, almoço, ocupação parcial.
+
+    Cada profissional percorre os dias úteis de [start_day, end_day] no fuso
+    da empresa e, a cada horário livre, recebe um agendamento com
+    probabilidade `occupancy` (senão pula 15–30 min). Agendamentos passados
+    ficam concluídos/cancelados/faltas; os futuros, agendados. Os eventos vão
+    ao banco em lotes (memória constante) e os resumos diários são
+    reconstruídos no final. Retorna (Company, usuário gestor, nº de eventos).
+    """
+    from . import rollups
+
+    rng = random.Random(seed)
+    company = Company.objects.create(name=name, slug=slug)
+    tz = company_timezone(company)
+    manager = get_user_model().objects.create_user(slug, password=password, company=company)
+    professional_objs, service_objs, client_objs = _create_catalog(company, professionals, clients, rng)
+
+    WorkingHours.objects.bulk_create([
+        WorkingHours(professional=professional, weekday=weekday, start_time=opens, end_time=closes)
+        for professional in professional_objs
+        for weekday, (opens, closes) in OPENING_HOURS.items()
+    ])
+    Break.objects.bulk_create([
+        Break(professional=professional, weekday=weekday, start_time=LUNCH[0], end_time=LUNCH[1])
+        for professional in professional_objs
+        for weekday in range(5)
+    ])
+
+    services_by_professional = {}
+    for service in service_objs:
+        services_by_professional.setdefault(service.professional_id, []).append(service)
+    past_statuses, past_weights = zip(*PAST_STATUS_WEIGHTS)
+    future_statuses, future_weights = zip(*FUTURE_STATUS_WEIGHTS)
+    now = timezone.now()
+    # Clientes fiéis concentram a maior parte dos atendimentos
+    client_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(client_objs))))
+
+    def events():
+        day = start_day
+        while day <= end_day:
+            hours = OPENING_HOURS.get(day.weekday())
+            if hours:
+                opens, closes = (datetime.combine(day, t, tzinfo=tz) for t in hours)
+                lunch = tuple(datetime.combine(day, t, tzinfo=tz) for t in LUNCH) if day.weekday() < 5 else None
+                for professional in professional_objs:
+                    cursor = opens
+                    while cursor < closes:
+                        if lunch and lunch[0] <= cursor < lunch[1]:
+                            cursor = lunch[1]
+                            continue
+                        if rng.random() >= occupancy:
+                            cursor += timedelta(minutes=rng.choice([15, 30]))
+                            continue
+                        service = rng.choice(services_by_professional[professional.pk])
+                        end = cursor + service.duration
+                        if end > closes or (lunch and cursor < lunch[0] < end):
+                            cursor += timedelta(minutes=15)
+                            continue
+                        if end <= now:
+                            status = rng.choices(past_statuses, past_weights)[0]
+                        else:
+                            status = rng.choices(future_statuses, future_weights)[0]
+                        yield Event(
+                            company=company, professional=professional, service=service,
+                            client=rng.choices(client_objs, cum_weights=client_weights)[0],
+                            start=cursor, end=end, duration=service.duration,
+                            value=service.value, status=status,
+                            created_by=manager, updated_by=manager,
+                        )
+                        cursor = end
+            day += timedelta(days=1)
+
+    total = 0
+    batch = []
+    for event in events():
+        batch.append(event)
+        if len(batch) >= batch_size:
+            total += len(Event.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        total += len(Event.objects.bulk_create(batch))
+
+    rollups.rebuild(company)
+    return company, manager, total
+
+
+def measure(fn, repeat=10, warmup=1):
+    """Executa `fn` e devolve as durações em segundos"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Resumo em milissegundos"""
+    return {
+        'n': len(samples),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
@@ -0,0 +1,55 @@
+# ncalendar/bootstrap.py
+"""
+Dados iniciais da tela de agenda numa única carga (/api/bootstrap/).
+
+Profissionais ativos, serviços ativos agrupados por profissional, status com
+cores e configurações da empresa. São sempre duas consultas, e o resultado
+fica em cache pela versão da empresa (qualquer gravação gera uma nova chave).
+calendar.html embute o mesmo payload com json_script, sem ida ao servidor
+antes do primeiro desenho.
+"""
+from django.conf import settings
+
+from .api.serializers import ProfessionalResourceSerializer, ServiceSerializer
+from .availability import company_timezone
+from .cache import company_version, get_cache, versioned_key
+from .models import Professional, Service, Event
+
+
+def build(company):
+    professionals = Professional.objects.filter(company=company, active=True).select_related('user_account')
+    services = (
+        Service.objects.filter(company=company, active=True, professional__active=True)
+        .select_related('professional')
+        .order_by('professional_id', 'name')
+    )
+    services_by_professional = {}
+    for service in ServiceSerializer(services, many=True).data:
+        services_by_professional.setdefault(str(service['professional']), []).append(service)
+
+    return {
+        'version': company_version(company.pk),
+        'company': {
+            'id': company.pk,
+            'name': company.name,
+            'slug': company.slug,
+            'timezone': str(company_timezone(company)),
+        },
+        'professionals': ProfessionalResourceSerializer(professionals, many=True).data,
+        'services': services_by_professional,
+        'status_choices': [
+            {'value': value, 'label': label, 'color': Event.STATUS_COLORS.get(value, Event.DEFAULT_COLOR)}
+            for value, label in Event.STATUS_CHOICES
+        ],
+    }
+
+
+def get_payload(company):
+    """Payload do bootstrap, do cache quando a versão da empresa não mudou"""
+    cache = get_cache()
+    key = versioned_key('bootstrap', company.pk)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build(company)
+        cache.set(key, payload, getattr(settings, 'NCALENDAR_BOOTSTRAP_CACHE_TIMEOUT', 3600))
+    return payload
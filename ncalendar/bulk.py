@@ -0,0 +1,149 @@
+# ncalendar/bulk.py
+"""
+Criação de agendamentos em lote.
+
+Event.save() chama full_clean() e carrega service.professional por linha;
+aqui a validação do lote inteiro usa poucas consultas por conjunto
+(propriedade dos registros, empresa e conflitos) e a inserção é um único
+bulk_create dentro de uma transação (com o sinal events_bulk_created).
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import busy_intervals, merge_intervals
+from .models import Professional, Client, Service, Event
+from .signals import events_bulk_created
+
+MAX_BATCH_SIZE = 1000
+
+
+def _add_error(errors, index, field, message):
+    errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+
+def _check_references(company, items, errors):
+    """Empresa e vínculo serviço→profissional de todo o lote (3 consultas)"""
+    professional_ids = set(Professional.objects.filter(
+        company=company, pk__in={item['professional'] for item in items}
+    ).values_list('pk', flat=True))
+    client_ids = set(Client.objects.filter(
+        company=company, pk__in={item['client'] for item in items}
+    ).values_list('pk', flat=True))
+    services = {
+        pk: (professional_id, duration, value)
+        for pk, professional_id, duration, value in Service.objects.filter(
+            company=company, pk__in={item['service'] for item in items}
+        ).values_list('pk', 'professional_id', 'duration', 'value')
+    }
+
+    for index, item in enumerate(items):
+        if item['professional'] not in professional_ids:
+            _add_error(errors, index, 'professional', 'Profissional não encontrado.')
+        if item['client'] not in client_ids:
+            _add_error(errors, index, 'client', 'Cliente não encontrado.')
+        service = services.get(item['service'])
+        if service is None:
+            _add_error(errors, index, 'service', 'Serviço não encontrado.')
+            continue
+        professional_id, duration, value = service
+        # Profissional inexistente já tem o erro dele; não repete no serviço
+        if professional_id != item['professional'] and item['professional'] in professional_ids:
+            _add_error(errors, index, 'service', 'O serviço não pertence ao profissional.')
+        item.setdefault('duration', duration)
+        item.setdefault('value', value)
+
+
+def _check_conflicts(items, errors):
+    """Sobreposições com a agenda existente e dentro do próprio lote (1 consulta + séries)"""
+    blocking = [
+        (index, item) for index, item in enumerate(items)
+        if item['status'] not in Event.NON_BLOCKING_STATUSES and index not in errors
+    ]
+    if not blocking:
+        return
+
+    window_start = min(item['start'] for _, item in blocking)
+    window_end = max(item['end'] for _, item in blocking)
+    busy = busy_intervals({item['professional'] for _, item in blocking}, window_start, window_end)
+
+    by_professional = defaultdict(list)
+    for index, item in blocking:
+        by_professional[item['professional']].append((item['start'], item['end'], index))
+
+    for professional_id, batch in by_professional.items():
+        existing = merge_intervals(busy.get(professional_id, []))
+        existing_starts = [start for start, _ in existing]
+
+        # Varredura ordenada: conflito com o lote se começa antes do maior fim visto
+        latest_end, latest_index = None, None
+        for start, end, index in sorted(batch):
+            position = bisect_right(existing_starts, start) - 1
+            overlaps_existing = (
+                (position >= 0 and existing[position][1] > start)
+                or (position + 1 < len(existing) and existing[position + 1][0] < end)
+            )
+            if overlaps_existing:
+                _add_error(errors, index, 'start', 'O profissional já possui agendamento neste horário.')
+            if latest_end is not None and start < latest_end:
+                _add_error(errors, index, 'start', f'Conflita com o item {latest_index} do lote.')
+            if latest_end is None or end > latest_end:
+                latest_end, latest_index = end, index
+
+
+def create_events(company, user, items):
+    """
+    Valida e insere o lote inteiro ou nada.
+
+    `items` são dicts já validados por EventBulkItemSerializer. Retorna
+    (eventos criados, erros por índice).
+    """
+    errors = {}
+    _check_references(company, items, errors)
+
+    for index, item in enumerate(items):
+        if 'duration_minutes' in item:
+            item['duration'] = timedelta(minutes=item.pop('duration_minutes'))
+        if index in errors:
+            continue
+        if item['duration'] > Event.MAX_DURATION:
+            _add_error(errors, index, 'duration', 'A duração máxima de um agendamento é de 24 horas.')
+            continue
+        if timezone.is_naive(item['start']):
+            item['start'] = timezone.make_aware(item['start'])
+        item['end'] = item['start'] + item['duration']
+
+    with transaction.atomic():
+        # Trava os profissionais envolvidos, como Event.save()
+        list(Professional.objects.select_for_update().filter(
+            pk__in={item['professional'] for item in items}
+        ).order_by('pk').values_list('pk', flat=True))
+
+        _check_conflicts(items, errors)
+        if errors:
+            return [], errors
+
+        events = Event.objects.bulk_create([
+            Event(
+                company=company,
+                professional_id=item['professional'],
+                client_id=item['client'],
+                service_id=item['service'],
+                start=item['start'],
+                end=item['end'],
+                duration=item['duration'],
+                value=item['value'],
+                status=item['status'],
+                description=item.get('description'),
+                created_by=user,
+                updated_by=user,
+            )
+            for item in items
+        ])
+        # Resumos na mesma transação e sob a trava; cache, feeds e tempo real
+        # ficam para o on_commit nos receptores
+        events_bulk_created.send(sender=Event, company_id=company.pk, events=events)
+    return events, {}
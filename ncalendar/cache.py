@@ -0,0 +1,78 @@
+# ncalendar/cache.py
+"""
+Cache versionado por empresa.
+
+Cada empresa tem um contador de versão que é incrementado (após o commit) em
+qualquer gravação de Event, Client, Service, Professional e afins. As chaves
+de cache incluem a versão, então dados antigos nunca são servidos: apenas
+deixam de ser lidos e expiram. O backend é o cache do Django configurado em
+NCALENDAR_CACHE_ALIAS (memória local ou Redis, ver settings.CACHES).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_cache():
+    return caches[getattr(settings, 'NCALENDAR_CACHE_ALIAS', 'default')]
+
+
+def _version_key(company_id):
+    return f'ncalendar:version:{company_id}'
+
+
+def _initial_version():
+    # Baseado no relógio: se a chave for descartada pelo backend, a nova
+    # versão nunca coincide com uma versão antiga ainda em cache
+    return int(time.time() * 1000)
+
+
+def company_version(company_id):
+    """Versão atual dos dados da empresa"""
+    cache = get_cache()
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def acompany_version(company_id):
+    """company_version para views assíncronas"""
+    cache = get_cache()
+    key = _version_key(company_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _initial_version(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_company_version(company_id):
+    """Invalida tudo que foi cacheado para a empresa"""
+    cache = get_cache()
+    key = _version_key(company_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def bump_company_version_on_commit(company_id):
+    """Incrementa só após o commit, para que leitores não cacheiem dados pré-commit na versão nova"""
+    if company_id is not None:
+        transaction.on_commit(lambda: bump_company_version(company_id))
+
+
+def versioned_key(prefix, company_id, *parts):
+    """Chave com a versão atual da empresa"""
+    version = company_version(company_id)
+    return ':'.join(['ncalendar', prefix, str(company_id), str(version), *map(str, parts)])
+
+
+async def aversioned_key(prefix, company_id, *parts):
+    version = await acompany_version(company_id)
+    return ':'.join(['ncalendar', prefix, str(company_id), str(version), *map(str, parts)])
@@ -0,0 +1,156 @@
+# ncalendar/exports.py
+"""
+Exportação de agendamentos em CSV e iCalendar (RFC 5545) por streaming.
+
+As linhas saem de values_list(...).iterator(chunk_size): cursor do lado do
+servidor (PostgreSQL) ou leitura em blocos (demais bancos), sem instanciar
+modelos nem montar a lista inteira. Os geradores emitem um bloco de texto por
+lote, então a memória fica constante qualquer que seja o período.
+
+Só agendamentos gravados; ocorrências virtuais de séries ficam de fora.
+"""
+import csv
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+
+from .availability import company_timezone
+from .models import Event
+
+COLUMNS = (
+    'id', 'start', 'end', 'professional_id', 'professional__name', 'client_id', 'client__name',
+    'client__phone', 'service_id', 'service__name', 'status', 'value', 'duration',
+    'description', 'created_at', 'updated_at',
+)
+CSV_HEADER = (
+    'id', 'inicio', 'fim', 'profissional_id', 'profissional', 'cliente_id', 'cliente',
+    'telefone', 'servico_id', 'servico', 'status', 'status_nome', 'valor', 'duracao_minutos',
+    'observacoes', 'criado_em', 'atualizado_em',
+)
+STATUS_LABELS = dict(Event.STATUS_CHOICES)
+# Cancelado/faltou não ocupam a agenda de quem assina o calendário
+ICS_STATUS = {3: 'CANCELLED', 4: 'CANCELLED'}
+
+
+def _chunk_size():
+    return getattr(settings, 'NCALENDAR_EXPORT_CHUNK_SIZE', 2000)
+
+
+def export_queryset(company, start=None, end=None, professional_ids=None):
+    """Agendamentos da empresa que começam em [start, end), em ordem cronológica"""
+    qs = Event.objects.filter(company=company)
+    if start is not None:
+        qs = qs.filter(start__gte=start)
+    if end is not None:
+        qs = qs.filter(start__lt=end)
+    if professional_ids:
+        qs = qs.filter(professional_id__in=professional_ids)
+    return qs.order_by('start', 'id')
+
+
+def _rows(queryset):
+    return queryset.values_list(*COLUMNS).iterator(chunk_size=_chunk_size())
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Echo:
+    """Buffer do csv.writer que só devolve a linha formatada"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(queryset, company):
+    """Gerador de CSV (UTF-8 com BOM, para abrir direto em planilhas) no fuso da empresa"""
+    tz = company_timezone(company)
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(CSV_HEADER)
+    for batch in _batched(_rows(queryset), _chunk_size()):
+        yield ''.join(
+            writer.writerow((
+                pk, start.astimezone(tz).isoformat(), end.astimezone(tz).isoformat(),
+                professional_id, professional_name, client_id, client_name, client_phone or '',
+                service_id, service_name, status, STATUS_LABELS.get(status, status), value,
+                int(duration.total_seconds() // 60), description or '',
+                created_at.astimezone(tz).isoformat(), updated_at.astimezone(tz).isoformat(),
+            ))
+            for (pk, start, end, professional_id, professional_name, client_id, client_name,
+                 client_phone, service_id, service_name, status, value, duration, description,
+                 created_at, updated_at) in batch
+        )
+
+
+def ics_escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def ics_fold(line):
+    """Quebra linhas acima de 75 octetos (continuação começa com espaço)"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > (75 if not parts else 74):
+            parts.append(''.join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ics_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_stream(queryset, company, name=None):
+    """Gerador de VCALENDAR com um VEVENT por agendamento (horários em UTC)"""
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//ncalendar//Agenda//PT-BR',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{ics_escape(name or company.name)}',
+        f'X-WR-TIMEZONE:{company_timezone(company)}',
+    ]
+    yield ''.join(ics_fold(line) for line in header)
+    for batch in _batched(_rows(queryset), _chunk_size()):
+        lines = []
+        for (pk, start, end, professional_id, professional_name, client_id, client_name,
+             client_phone, service_id, service_name, status, value, duration, description,
+             created_at, updated_at) in batch:
+            details = [f'Profissional: {professional_name}', f'Status: {STATUS_LABELS.get(status, status)}']
+            if client_phone:
+                details.append(f'Telefone: {client_phone}')
+            if description:
+                details.append(description)
+            lines += [
+                'BEGIN:VEVENT',
+                f'UID:event-{pk}@{company.slug}',
+                f'DTSTAMP:{ics_datetime(updated_at)}',
+                f'CREATED:{ics_datetime(created_at)}',
+                f'LAST-MODIFIED:{ics_datetime(updated_at)}',
+                f'DTSTART:{ics_datetime(start)}',
+                f'DTEND:{ics_datetime(end)}',
+                f'SUMMARY:{ics_escape(f"{service_name} - {client_name}")}',
+                f'DESCRIPTION:{ics_escape(chr(10).join(details))}',
+                f'STATUS:{ICS_STATUS.get(status, "CONFIRMED")}',
+                'END:VEVENT',
+            ]
+        yield ''.join(ics_fold(line) for line in lines)
+    yield 'END:VCALENDAR\r\n'
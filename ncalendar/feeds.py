@@ -0,0 +1,126 @@
+# ncalendar/feeds.py
+"""
+Assinatura iCalendar da agenda de cada profissional (/feeds/professionals/<token>.ics).
+
+Apps de calendário consultam a URL a cada poucos minutos. O feed é renderizado
+uma vez por versão do profissional e por dia (a janela é móvel) e guardado no
+cache; a versão muda só quando agendamentos daquele profissional (ou o próprio
+profissional) mudam. Token → profissional também fica em cache, então uma
+consulta repetida não toca o banco e, com ETag/Last-Modified, costuma terminar
+em 304 sem corpo.
+
+Nomes de cliente e serviço alterados aparecem na próxima regeneração.
+"""
+import hashlib
+import secrets
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import exports
+from .availability import company_timezone
+from .cache import get_cache
+from .models import Professional
+
+
+def _version_key(professional_id):
+    return f'ncalendar:feed-version:{professional_id}'
+
+
+def _token_key(token):
+    return f'ncalendar:feed-token:{hashlib.sha256(token.encode()).hexdigest()}'
+
+
+def feed_version(professional_id):
+    cache = get_cache()
+    key = _version_key(professional_id)
+    version = cache.get(key)
+    if version is None:
+        # Baseado no relógio, como a versão da empresa (ver cache.py)
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_feed(professional_id):
+    get_cache().set(_version_key(professional_id), int(time.time() * 1000), timeout=None)
+
+
+def bump_feed_on_commit(professional_id):
+    if professional_id is not None:
+        transaction.on_commit(lambda: bump_feed(professional_id))
+
+
+def ensure_token(professional, rotate=False):
+    """Token do feed do profissional, criado (ou trocado) quando necessário"""
+    if professional.feed_token and not rotate:
+        return professional.feed_token
+    old = professional.feed_token
+    professional.feed_token = secrets.token_urlsafe(32)
+    Professional.objects.filter(pk=professional.pk).update(feed_token=professional.feed_token)
+    if old:
+        get_cache().delete(_token_key(old))
+    return professional.feed_token
+
+
+def forget_token(professional):
+    """Descarta o token → profissional em cache (ex.: profissional desativado)"""
+    if professional.feed_token:
+        get_cache().delete(_token_key(professional.feed_token))
+
+
+def professional_for_token(token):
+    """(professional_id, fuso da empresa) do token, ou None; cacheado"""
+    cache = get_cache()
+    key = _token_key(token)
+    found = cache.get(key)
+    if found is None:
+        professional = Professional.objects.filter(
+            feed_token=token, active=True
+        ).select_related('company').first()
+        if professional is None:
+            return None
+        found = (professional.pk, company_timezone(professional.company))
+        cache.set(key, found, getattr(settings, 'NCALENDAR_FEED_TOKEN_CACHE_TIMEOUT', 3600))
+    return found
+
+
+def render(professional, today):
+    """Conteúdo .ics da janela [hoje - passado, hoje + futuro] no fuso da empresa"""
+    company = professional.company
+    tz = company_timezone(company)
+    past = timedelta(days=getattr(settings, 'NCALENDAR_FEED_PAST_DAYS', 30))
+    future = timedelta(days=getattr(settings, 'NCALENDAR_FEED_FUTURE_DAYS', 180))
+    start = datetime.combine(today - past, dt_time.min, tzinfo=tz)
+    end = datetime.combine(today + future, dt_time.min, tzinfo=tz)
+    queryset = exports.export_queryset(company, start, end, professional_ids=[professional.pk])
+    return ''.join(exports.ics_stream(queryset, company, name=f'{professional.name} - {company.name}'))
+
+
+def get_feed(professional_id, tz):
+    """
+    (etag, last_modified, conteúdo) do feed, do cache quando possível; None se
+    o profissional foi excluído ou desativado (token ainda em cache).
+
+    A chave tem a versão do profissional e o dia local: só mudanças dele ou a
+    virada do dia geram nova renderização.
+    """
+    cache = get_cache()
+    version = feed_version(professional_id)
+    today = timezone.localdate(timezone=tz)
+    key = f'ncalendar:feed:{professional_id}:{version}:{today.isoformat()}'
+    entry = cache.get(key)
+    if entry is None:
+        professional = Professional.objects.select_related('company').filter(
+            pk=professional_id, active=True
+        ).first()
+        if professional is None:
+            return None
+        content = render(professional, today)
+        etag = f'"{hashlib.sha1(content.encode()).hexdigest()}"'
+        entry = (etag, timezone.now(), content.encode('utf-8'))
+        cache.set(key, entry, getattr(settings, 'NCALENDAR_FEED_CACHE_TIMEOUT', 24 * 3600))
+    return entry
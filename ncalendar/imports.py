@@ -0,0 +1,275 @@
+# ncalendar/imports.py
+"""
+Importação de clientes em lote a partir de CSV (planilhas de migração).
+
+O arquivo é lido em streaming, linha a linha; telefones são normalizados
+para o formato do cadastro ('+55 (11) 91234-5678') e duplicados dentro do
+arquivo são descartados em memória. Cada lote faz duas consultas (clientes
+existentes por telefone e por nome) e até três bulk_create numa transação:
+upserts (update_conflicts) só de clientes já confirmados como da empresa e a
+inserção dos novos com ignore_conflicts, conferida por mais uma consulta.
+
+Regras de correspondência:
+- com telefone: o telefone identifica o cliente; se já existe na empresa, o
+  nome é atualizado; se existe em outra empresa, a linha é rejeitada;
+- sem telefone (ou telefone novo para um cliente de mesmo nome ainda sem
+  telefone): o nome identifica o cliente.
+"""
+import csv
+import io
+import itertools
+import re
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import bump_company_version_on_commit
+from .models import Client
+from .search import COUNTRY_CODE, normalize_phone
+
+NAME_COLUMNS = ('name', 'nome', 'cliente', 'nome do cliente')
+PHONE_COLUMNS = ('phone', 'telefone', 'celular', 'fone', 'whatsapp')
+NAME_MAX_LENGTH = Client._meta.get_field('name').max_length
+PHONE_MAX_LENGTH = Client._meta.get_field('phone').max_length
+
+_spaces = re.compile(r'\s+')
+
+
+def format_phone(raw):
+    """
+    Telefone no formato do cadastro; None se vazio, ValueError se inválido.
+
+    Números brasileiros (10/11 dígitos, com ou sem 0 de longa distância ou
+    +55) viram '+55 (DD) NNNNN-NNNN'; internacionais com '+' ficam '+<dígitos>'.
+    """
+    raw = (raw or '').strip()
+    digits = normalize_phone(raw)
+    if not digits:
+        return None
+    if not raw.startswith('+'):
+        digits = digits.lstrip('0')
+        if len(digits) in (10, 11):
+            digits = COUNTRY_CODE + digits
+    if digits.startswith(COUNTRY_CODE) and len(digits) in (12, 13):
+        area, number = digits[2:4], digits[4:]
+        return f'+{COUNTRY_CODE} ({area}) {number[:-4]}-{number[-4:]}'
+    if raw.startswith('+') and 8 <= len(digits) <= PHONE_MAX_LENGTH - 1:
+        return f'+{digits}'
+    raise ValueError('Telefone inválido.')
+
+
+def _column(fieldnames, aliases):
+    normalized = {(name or '').strip().casefold(): name for name in fieldnames or ()}
+    for alias in aliases:
+        if alias in normalized:
+            return normalized[alias]
+    return None
+
+
+def read_rows(stream):
+    """(nº da linha, nome, telefone) de um CSV binário ou texto, em streaming"""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    header = stream.readline()
+    try:
+        # Planilhas exportadas em pt-BR costumam usar ';'
+        dialect = csv.Sniffer().sniff(header, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(itertools.chain([header], stream), dialect=dialect)
+    name_column = _column(reader.fieldnames, NAME_COLUMNS)
+    phone_column = _column(reader.fieldnames, PHONE_COLUMNS)
+    if name_column is None:
+        raise ValueError(f"Coluna de nome não encontrada (use uma de: {', '.join(NAME_COLUMNS)}).")
+    for row in reader:
+        yield reader.line_num, row.get(name_column), row.get(phone_column) if phone_column else None
+
+
+class ImportResult:
+    """Contadores, erros por linha e vazão de uma importação"""
+    MAX_ERRORS = 1000
+
+    def __init__(self, max_errors=MAX_ERRORS):
+        self.max_errors = max_errors
+        self.rows = self.created = self.updated = self.unchanged = 0
+        self.errors = []
+        self.error_count = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def error(self, line, message, name=None, phone=None):
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'name': name, 'phone': phone, 'error': message})
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows / self.elapsed, 1) if self.elapsed else None,
+        }
+
+
+def _existing_by_phone(company, phones):
+    """
+    Clientes já cadastrados com os telefones do lote: {telefone: (empresa, pk, nome, telefone gravado)}.
+
+    Na própria empresa a comparação é pelos dígitos (com ou sem DDI), para casar
+    telefones gravados em outro formato; nas demais, pelo valor único da coluna.
+    """
+    digits = {normalize_phone(phone): phone for phone in phones}
+    variants = {**digits, **{d[len(COUNTRY_CODE):]: phone for d, phone in digits.items()
+                            if d.startswith(COUNTRY_CODE)}}
+    found = {}
+    rows = Client.objects.filter(
+        Q(phone__in=phones) | Q(company=company, phone_digits__in=variants)
+    ).values_list('phone', 'phone_digits', 'company_id', 'pk', 'name')
+    for stored, stored_digits, company_id, pk, name in rows:
+        phone = stored if stored in phones else variants.get(stored_digits)
+        # O formato exato tem prioridade sobre a equivalência por dígitos
+        if phone is not None and (phone not in found or stored == phone):
+            found[phone] = (company_id, pk, name, stored)
+    return found
+
+
+def _existing_by_name(company, names):
+    """Clientes da empresa com os nomes do lote: {nome: (pk, telefone)}"""
+    return {
+        name: (pk, phone)
+        for name, pk, phone in Client.objects.filter(company=company, name__in=names).values_list('name', 'pk', 'phone')
+    }
+
+
+def _upsert(company, batch, result, dry_run):
+    """Grava um lote de (linha, nome, telefone) já normalizados e sem duplicados"""
+    by_phone = _existing_by_phone(company, {phone for _, _, phone in batch if phone})
+    by_name = _existing_by_name(company, {name for _, name, _ in batch})
+
+    keyed_by_phone, keyed_by_name, new = [], [], []
+    for line, name, phone in batch:
+        existing = by_phone.get(phone) if phone else None
+        same_name = by_name.get(name)
+        if existing:
+            company_id, pk, current_name, stored = existing
+            if company_id != company.pk:
+                result.error(line, 'Telefone já cadastrado em outra empresa.', name, phone)
+            elif same_name and same_name[0] != pk:
+                result.error(line, 'Nome já usado por outro cliente da empresa.', name, phone)
+            elif current_name == name:
+                result.unchanged += 1
+            else:
+                # Mantém o telefone como está gravado: é ele a chave do upsert
+                keyed_by_phone.append(Client(company=company, name=name, phone=stored))
+                result.updated += 1
+        elif same_name:
+            current_phone = same_name[1]
+            if phone and current_phone is None:
+                keyed_by_name.append(Client(company=company, name=name, phone=phone))
+                result.updated += 1
+            elif phone:
+                result.error(line, f'Cliente já cadastrado com o telefone {current_phone}.', name, phone)
+            else:
+                result.unchanged += 1
+        else:
+            new.append((line, Client(company=company, name=name, phone=phone)))
+
+    if dry_run:
+        result.created += len(new)
+        return
+    for client in (*keyed_by_phone, *keyed_by_name, *(client for _, client in new)):
+        client.update_search_fields()
+    with transaction.atomic():
+        # Upsert só de clientes já confirmados como da empresa
+        if keyed_by_phone:
+            Client.objects.bulk_create(
+                keyed_by_phone, update_conflicts=True, unique_fields=['phone'],
+                update_fields=['name', 'name_normalized', 'updated_at'],
+            )
+        if keyed_by_name:
+            Client.objects.bulk_create(
+                keyed_by_name, update_conflicts=True, unique_fields=['company', 'name'],
+                update_fields=['phone', 'phone_digits', 'updated_at'],
+            )
+        if new:
+            _insert_new(company, new, result)
+        # bulk_create não dispara post_save: invalida o cache da empresa aqui
+        bump_company_version_on_commit(company.pk)
+
+
+def _insert_new(company, new, result):
+    """
+    Insere clientes novos sem sobrescrever nada: um telefone ou nome gravado
+    por outra importação depois da consulta do lote (inclusive de outra
+    empresa) descarta a linha em vez de renomear o cliente existente.
+    """
+    Client.objects.bulk_create([client for _, client in new], ignore_conflicts=True)
+    # ignore_conflicts não informa o que entrou: confere pelo par (nome, telefone),
+    # que a consulta do lote mostrou não existir antes na empresa
+    inserted = set(Client.objects.filter(
+        company=company, name__in=[client.name for _, client in new]
+    ).values_list('name', 'phone'))
+    for line, client in new:
+        if (client.name, client.phone) in inserted:
+            result.created += 1
+        else:
+            result.error(line, 'Cliente cadastrado por outra importação ao mesmo tempo.', client.name, client.phone)
+
+
+def import_clients(company, stream, batch_size=None, dry_run=False, progress=None,
+                   max_errors=ImportResult.MAX_ERRORS):
+    """
+    Importa clientes do CSV para a empresa; devolve ImportResult.
+
+    `progress(result)` é chamado após cada lote gravado; só os primeiros
+    `max_errors` erros são guardados (None guarda todos), mas todos são contados.
+    """
+    batch_size = batch_size or getattr(settings, 'NCALENDAR_IMPORT_BATCH_SIZE', 2000)
+    result = ImportResult(max_errors)
+    seen_phones, seen_names = {}, {}
+    batch = []
+    for line, raw_name, raw_phone in read_rows(stream):
+        result.rows += 1
+        name = _spaces.sub(' ', raw_name or '').strip()
+        if not name:
+            result.error(line, 'Nome obrigatório.', raw_name, raw_phone)
+            continue
+        if len(name) > NAME_MAX_LENGTH:
+            result.error(line, f'Nome com mais de {NAME_MAX_LENGTH} caracteres.', name, raw_phone)
+            continue
+        try:
+            phone = format_phone(raw_phone)
+        except ValueError as e:
+            result.error(line, str(e), name, raw_phone)
+            continue
+
+        duplicate_of = seen_phones.get(phone) if phone else None
+        duplicate_of = duplicate_of or seen_names.get(name)
+        if duplicate_of:
+            result.error(line, f'Duplicado da linha {duplicate_of}.', name, phone)
+            continue
+        if phone:
+            seen_phones[phone] = line
+        seen_names[name] = line
+
+        batch.append((line, name, phone))
+        if len(batch) >= batch_size:
+            _upsert(company, batch, result, dry_run)
+            batch = []
+            if progress:
+                progress(result)
+    if batch:
+        _upsert(company, batch, result, dry_run)
+        if progress:
+            progress(result)
+    return result.finish()
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ncalendar import analytics
+from ncalendar.availability import company_timezone
+from ncalendar.benchmarks import create_sample_company, measure, summarize
+
+
+class Command(BaseCommand):
+    help = "Mede os indicadores NumPy (heatmap, faltas, ticket médio) sobre um ano de agenda"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--professionals', type=int, default=50)
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--budget-ms', type=float, default=1000)
+
+    def handle(self, *args, **options):
+        days = options['days']
+        end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=days)
+
+        # Dados sintéticos descartados no final (rollback)
+        with transaction.atomic():
+            # ~11 atendimentos por profissional por dia útil da agenda sintética (8h-19h)
+            company = create_sample_company(
+                'Benchmark Analytics', professionals=options['professionals'], clients=2000,
+                events=options['professionals'] * days * 11, start=start.replace(hour=8),
+            )
+            tz = company_timezone(company)
+            queryset = analytics.event_queryset(company, start, end + timedelta(days=1))
+            total = queryset.count()
+            result = summarize(measure(
+                lambda: analytics.compute(queryset, tz, start.date(), end.date()), options['repeat']
+            ))
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{options['professionals']} profissionais, {days} dias, {total} agendamentos: "
+            f"p50={result['p50_ms']:.0f}ms max={result['max_ms']:.0f}ms (orçamento {options['budget_ms']:.0f}ms)"
+        )
+        if result['p50_ms'] > options['budget_ms']:
+            raise CommandError("Indicadores acima do orçamento de latência.")
+        self.stdout.write(self.style.SUCCESS("Dentro do orçamento."))
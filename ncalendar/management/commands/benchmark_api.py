@@ -0,0 +1,280 @@
+import json
+import random
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from accounts.models import Company
+from ncalendar.benchmarks import create_sample_company, summarize
+from ncalendar.models import Client as CalendarClient, Event, Professional, Service
+
+SCENARIOS = (
+    'events_day', 'events_week', 'events_month', 'client_search',
+    'event_create', 'event_update', 'calendar_page',
+)
+# Janelas do feed do calendário (visões dia, semana e mês com 6 semanas)
+RANGE_DAYS = {'events_day': 1, 'events_week': 7, 'events_month': 42}
+
+
+class QueryCounter:
+    """Wrapper de execução que conta as consultas de uma requisição"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def run_on_commit_callbacks():
+    """
+    Executa os on_commit registrados no bloco, como no commit real (o mesmo
+    que TestCase.captureOnCommitCallbacks(execute=True)); sem isso eles seriam
+    descartados pelo rollback do benchmark.
+    """
+    start = len(connection.run_on_commit)
+    try:
+        yield
+    finally:
+        # Callbacks podem registrar outros callbacks
+        while len(connection.run_on_commit) > start:
+            callbacks = connection.run_on_commit[start:]
+            del connection.run_on_commit[start:]
+            for _, callback, _ in callbacks:
+                callback()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede latência (percentis) e consultas por requisição dos principais endpoints; "
+        "grava JSON para comparar entre commits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help="Empresa existente (ex.: de generate_fake_data)")
+        parser.add_argument('--events', type=int, default=20000, help="Eventos da empresa sintética, sem --company")
+        parser.add_argument('--repeat', type=int, default=50, help="Requisições medidas por cenário")
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, help="Repetível; padrão: todos")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Arquivo JSON com os resultados")
+        parser.add_argument('--compare', help="JSON de uma execução anterior para comparar")
+        parser.add_argument('--threshold', type=float, default=10.0, help="Piora de p95 (%%) considerada regressão")
+        parser.add_argument('--fail-on-regression', action='store_true', help="Sai com erro se houver regressão")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+
+        self.rng = random.Random(options['seed'])
+        self.repeat = options['repeat']
+        scenarios = options['scenario'] or SCENARIOS
+
+        # Tudo dentro de uma transação desfeita no final: a empresa sintética,
+        # o usuário do benchmark e os agendamentos criados não ficam no banco.
+        # Os on_commit de cada requisição são executados logo após ela (ver
+        # measure), como numa transação confirmada
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            if options['company']:
+                try:
+                    company = Company.objects.get(pk=options['company'])
+                except Company.DoesNotExist:
+                    raise CommandError(f"Empresa {options['company']} não encontrada")
+            else:
+                company = create_sample_company(
+                    'Benchmark API', professionals=10, clients=2000, events=options['events'],
+                    start=timezone.now().replace(hour=8, minute=0, second=0, microsecond=0) - timedelta(days=180),
+                )
+            user = get_user_model().objects.create_user(f'benchmark-{int(time.time())}', company=company)
+            if not options['company']:
+                # Auditoria é obrigatória ao editar pela API
+                Event.objects.filter(company=company).update(created_by=user, updated_by=user)
+            self.client = Client()
+            self.client.force_login(user)
+            self.prepare(company)
+
+            results = {'meta': self.meta(company, options), 'scenarios': {}}
+            for name in scenarios:
+                # Cada cenário parte do mesmo estado: gravações desfeitas no savepoint
+                with transaction.atomic():
+                    results['scenarios'][name] = getattr(self, f'run_{name}')()
+                    transaction.set_rollback(True)
+                self.created_ids = []
+                self.report_line(name, results['scenarios'][name])
+            transaction.set_rollback(True)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultados gravados em {options['output']}")
+        if baseline is not None:
+            regressions = self.compare(baseline, results, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"Regressões: {', '.join(regressions)}")
+
+    # --- Preparação -------------------------------------------------------
+
+    def prepare(self, company):
+        self.company = company
+        bounds = Event.objects.filter(company=company).aggregate(first=Min('start'), last=Max('start'))
+        if bounds['first'] is None:
+            raise CommandError("A empresa não tem agendamentos")
+        self.first_day = timezone.localdate(bounds['first'])
+        self.last_day = timezone.localdate(bounds['last'])
+        self.events_count = Event.objects.filter(company=company).count()
+        self.client_names = list(
+            CalendarClient.objects.filter(company=company).values_list('name', flat=True)[:500]
+        )
+        self.services = list(
+            Service.objects.filter(company=company, active=True, professional__active=True)
+            .values_list('pk', 'professional_id')
+        )
+        self.client_ids = list(CalendarClient.objects.filter(company=company).values_list('pk', flat=True)[:500])
+        self.created_ids = []
+
+    def meta(self, company, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                cwd=settings.BASE_DIR, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'company': company.pk,
+            'events': self.events_count,
+            'professionals': Professional.objects.filter(company=company).count(),
+            'clients': CalendarClient.objects.filter(company=company).count(),
+            'repeat': self.repeat,
+            'seed': options['seed'],
+        }
+
+    # --- Medição ----------------------------------------------------------
+
+    def measure(self, make_request):
+        """Executa `make_request` (devolve a resposta) com aquecimento; latência e consultas"""
+        with run_on_commit_callbacks():
+            make_request()
+        samples, queries, statuses = [], [], {}
+        for _ in range(self.repeat):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                # Cache, feeds e tempo real rodam no commit, antes da resposta sair
+                with run_on_commit_callbacks():
+                    response = make_request()
+                samples.append(time.perf_counter() - started)
+            queries.append(counter.count)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        return {
+            **summarize(samples),
+            'queries': {'min': min(queries), 'max': max(queries), 'mean': round(sum(queries) / len(queries), 2)},
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        }
+
+    def random_range(self, days):
+        span = max(0, (self.last_day - self.first_day).days - days)
+        start = self.first_day + timedelta(days=self.rng.randint(0, span))
+        return {'start': start.isoformat(), 'end': (start + timedelta(days=days)).isoformat()}
+
+    def run_range(self, days):
+        return self.measure(lambda: self.client.get('/api/events/', self.random_range(days)))
+
+    def run_events_day(self):
+        return self.run_range(RANGE_DAYS['events_day'])
+
+    def run_events_week(self):
+        return self.run_range(RANGE_DAYS['events_week'])
+
+    def run_events_month(self):
+        return self.run_range(RANGE_DAYS['events_month'])
+
+    def run_client_search(self):
+        def search():
+            # Prefixo do sobrenome: vários resultados, como na digitação
+            name = self.rng.choice(self.client_names)
+            term = name.split()[1][:4] if ' ' in name else name[:4]
+            return self.client.get('/api/clients/', {'q': term})
+        return self.measure(search)
+
+    def run_event_create(self):
+        # Um dia livre por requisição, depois do fim da agenda: sem conflitos
+        day = iter(range(1, 10 ** 6))
+
+        def create():
+            service_id, professional_id = self.rng.choice(self.services)
+            start = timezone.make_aware(datetime.combine(self.last_day + timedelta(days=next(day)), dt_time(10)))
+            response = self.client.post('/api/events/', {
+                'start': start.isoformat(), 'professional': professional_id,
+                'client': self.rng.choice(self.client_ids), 'service': service_id,
+            }, content_type='application/json')
+            if response.status_code == 201:
+                self.created_ids.append(response.json()['id'])
+            return response
+        return self.measure(create)
+
+    def run_event_update(self):
+        ids = self.created_ids or list(
+            Event.objects.filter(company=self.company, status=1, created_by__isnull=False)
+            .values_list('pk', flat=True)[:self.repeat + 1]
+        )
+        if not ids:
+            raise CommandError("Nenhum agendamento para atualizar")
+
+        def update():
+            return self.client.patch(
+                f'/api/events/{self.rng.choice(ids)}/',
+                {'description': f'benchmark {self.rng.random():.6f}'},
+                content_type='application/json',
+            )
+        return self.measure(update)
+
+    def run_calendar_page(self):
+        return self.measure(lambda: self.client.get('/'))
+
+    # --- Saída ------------------------------------------------------------
+
+    def report_line(self, name, result):
+        self.stdout.write(
+            f"  {name:<15} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+            f"p99={result['p99_ms']:>8.2f}ms consultas={result['queries']['mean']:>5} "
+            f"status={result['statuses']}"
+        )
+
+    def compare(self, baseline, results, threshold):
+        """Tabela de diferenças; devolve os cenários que pioraram"""
+        self.stdout.write(f"Comparação com {baseline['meta'].get('commit') or 'execução anterior'}:")
+        regressions = []
+        for name, current in results['scenarios'].items():
+            previous = baseline['scenarios'].get(name)
+            if previous is None:
+                continue
+            change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+            more_queries = current['queries']['max'] > previous['queries']['max']
+            regressed = change > threshold or more_queries
+            if regressed:
+                regressions.append(name)
+            line = (
+                f"  {name:<15} p50 {previous['p50_ms']:.2f}→{current['p50_ms']:.2f}ms  "
+                f"p95 {previous['p95_ms']:.2f}→{current['p95_ms']:.2f}ms ({change:+.1f}%)  "
+                f"consultas {previous['queries']['max']}→{current['queries']['max']}"
+            )
+            self.stdout.write(self.style.ERROR(line) if regressed else line)
+        return regressions
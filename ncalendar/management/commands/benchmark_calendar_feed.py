@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from ncalendar.api.renderers import render_json
+from ncalendar.api.serializers import EventCalendarSerializer
+from ncalendar.benchmarks import create_sample_company, measure, summarize
+from ncalendar.models import Event
+
+
+class Command(BaseCommand):
+    help = "Compara o EventCalendarSerializer com o modo rápido (values_list + JSON rápido)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000)
+        parser.add_argument('--professionals', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        # Dados sintéticos descartados no final (rollback)
+        with transaction.atomic():
+            company = create_sample_company(
+                'Benchmark Feed', professionals=options['professionals'],
+                clients=max(50, options['events'] // 4), events=options['events'],
+            )
+            queryset = Event.objects.filter(company=company).select_related(
+                'client', 'service', 'professional', 'created_by', 'updated_by'
+            )
+            renderer = JSONRenderer()
+
+            def serializer_path():
+                return renderer.render(EventCalendarSerializer(queryset, many=True).data)
+
+            def fast_path():
+                return render_json(EventCalendarSerializer.fast_rows(queryset))
+
+            if serializer_path() != fast_path():
+                raise CommandError("O modo rápido não gerou bytes idênticos ao serializer.")
+
+            slow = summarize(measure(serializer_path, options['repeat']))
+            fast = summarize(measure(fast_path, options['repeat']))
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{options['events']} eventos, {options['repeat']} repetições (saída idêntica)")
+        for label, result in (('serializer', slow), ('modo rápido', fast)):
+            self.stdout.write(f"  {label:<12} p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms")
+        self.stdout.write(self.style.SUCCESS(f"  speedup p50: {slow['p50_ms'] / fast['p50_ms']:.1f}x"))
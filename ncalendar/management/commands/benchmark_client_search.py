@@ -0,0 +1,45 @@
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ncalendar.benchmarks import FIRST_NAMES, LAST_NAMES, create_sample_company, measure, summarize
+from ncalendar.models import Client
+from ncalendar.search import search_clients
+
+
+class Command(BaseCommand):
+    help = "Mede a latência da busca de clientes e falha se o p95 passar do orçamento"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--budget-ms', type=float, default=settings.NCALENDAR_CLIENT_SEARCH_BUDGET_MS)
+
+    def handle(self, *args, **options):
+        rng = random.Random(1)
+        terms = (
+            [name[:n].lower() for name in FIRST_NAMES + LAST_NAMES for n in (2, 3, 5)]
+            + ['jose', 'conceicao', 'GONÇ', 'silva 1', '11 9', '9001', '(11) 90']
+        )
+
+        with transaction.atomic():
+            company = create_sample_company(
+                'Benchmark Busca', professionals=1, clients=options['clients'], events=0
+            )
+            queryset = Client.objects.filter(company=company)
+            queries = [rng.choice(terms) for _ in range(options['queries'])]
+            iterator = iter(queries)
+            samples = measure(lambda: search_clients(queryset, next(iterator)), len(queries) - 1)
+            transaction.set_rollback(True)
+
+        result = summarize(samples)
+        self.stdout.write(
+            f"{options['clients']} clientes, {result['n']} buscas: "
+            f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+            f"(orçamento {options['budget_ms']}ms)"
+        )
+        if result['p95_ms'] > options['budget_ms']:
+            raise CommandError("p95 acima do orçamento de latência da busca.")
+        self.stdout.write(self.style.SUCCESS("Dentro do orçamento."))
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from ncalendar.benchmarks import create_sample_company, measure, summarize
+from ncalendar.models import Event
+
+
+class Command(BaseCommand):
+    help = "Mostra que a consulta de período de uma empresa não cresce com os dados das outras empresas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000, help="Eventos da empresa medida")
+        parser.add_argument('--tenants', type=int, default=4, help="Rodadas de empresas vizinhas")
+        parser.add_argument('--tenant-events', type=int, default=20000, help="Eventos por empresa vizinha")
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        start = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+        range_start, range_end = start + timedelta(days=7), start + timedelta(days=8)
+
+        def by_company(company):
+            return lambda: list(Event.objects.filter(
+                company=company, start__gt=range_start - Event.MAX_DURATION,
+                start__lt=range_end, end__gt=range_start
+            ).values_list('id', 'start', 'end'))
+
+        def by_join(company):
+            return lambda: list(Event.objects.filter(
+                professional__company=company, start__gt=range_start - Event.MAX_DURATION,
+                start__lt=range_end, end__gt=range_start
+            ).values_list('id', 'start', 'end'))
+
+        # Dados sintéticos descartados no final (rollback)
+        with transaction.atomic():
+            company = create_sample_company(
+                'Benchmark Tenant', professionals=10, clients=200, events=options['events'], start=start
+            )
+            self.stdout.write(f"{options['events']} eventos na empresa medida, {options['repeat']} repetições")
+            self.stdout.write(f"  {'total de eventos':>18} {'company (p50)':>14} {'join (p50)':>12}")
+
+            for round_ in range(options['tenants'] + 1):
+                if round_:
+                    create_sample_company(
+                        f'Benchmark Vizinha {round_}', professionals=10, clients=200,
+                        events=options['tenant_events'], start=start, seed=round_,
+                    )
+                direct = summarize(measure(by_company(company), options['repeat']))
+                joined = summarize(measure(by_join(company), options['repeat']))
+                self.stdout.write(
+                    f"  {Event.objects.count():>18} {direct['p50_ms']:>12.2f}ms {joined['p50_ms']:>10.2f}ms"
+                )
+            transaction.set_rollback(True)
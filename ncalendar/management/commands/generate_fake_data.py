@@ -0,0 +1,78 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Company
+from ncalendar.benchmarks import generate_company
+from ncalendar.models import Event, RecurringSeries
+
+DELETE_BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Gera empresas sintéticas com profissionais, serviços, clientes e anos de agenda"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=3)
+        parser.add_argument('--professionals', type=int, default=10, help="Profissionais por empresa")
+        parser.add_argument('--clients', type=int, default=2000, help="Clientes por empresa")
+        parser.add_argument('--years', type=float, default=2, help="Anos de histórico até hoje")
+        parser.add_argument('--future-days', type=int, default=90, help="Dias de agenda futura")
+        parser.add_argument('--occupancy', type=float, default=0.7, help="Fração dos horários livres ocupada (0–1)")
+        parser.add_argument('--prefix', default='fake', help="Prefixo do slug das empresas (e do usuário gestor)")
+        parser.add_argument('--password', default='fake', help="Senha do usuário gestor de cada empresa")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--replace', action='store_true', help="Remove antes as empresas com o mesmo prefixo")
+
+    def handle(self, *args, **options):
+        if not 0 < options['occupancy'] <= 1:
+            raise CommandError("--occupancy deve estar entre 0 e 1")
+        prefix = options['prefix']
+        existing = Company.objects.filter(slug__startswith=f'{prefix}-')
+        if existing.exists():
+            if not options['replace']:
+                raise CommandError(f"Já existem empresas '{prefix}-*'; use --replace ou outro --prefix")
+            self.remove(existing)
+
+        today = timezone.localdate()
+        start_day = today - timedelta(days=round(options['years'] * 365))
+        end_day = today + timedelta(days=options['future_days'])
+        self.stdout.write(f"Agenda de {start_day} a {end_day}")
+
+        for i in range(options['companies']):
+            slug = f'{prefix}-{i + 1}'
+            started = time.perf_counter()
+            with transaction.atomic():
+                company, manager, events = generate_company(
+                    f'Empresa Fictícia {i + 1}', slug, start_day, end_day,
+                    professionals=options['professionals'], clients=options['clients'],
+                    occupancy=options['occupancy'], seed=options['seed'] + i,
+                    password=options['password'],
+                )
+            self.stdout.write(
+                f"  {company.name} (id={company.pk}, usuário {manager.username}): "
+                f"{events} eventos em {time.perf_counter() - started:.1f}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Dados fictícios gerados."))
+
+    def remove(self, companies):
+        # Serviço é PROTECT: agendamentos e séries saem antes da empresa. O
+        # delete() normal, em lotes, dispara os sinais por agendamento
+        # (resumos, tombstones, exceções de série) sem uma transação gigante
+        for company in companies:
+            events = Event.objects.filter(company=company)
+            while True:
+                batch = list(events.order_by('pk').values_list('pk', flat=True)[:DELETE_BATCH_SIZE])
+                if not batch:
+                    break
+                with transaction.atomic():
+                    Event.objects.filter(pk__in=batch).delete()
+            with transaction.atomic():
+                RecurringSeries.objects.filter(company=company).delete()
+                get_user_model().objects.filter(company=company, username=company.slug).delete()
+                company.delete()
+            self.stdout.write(f"  removida: {company.slug}")
@@ -0,0 +1,56 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Company
+from ncalendar.imports import ImportResult, import_clients
+
+
+class Command(BaseCommand):
+    help = "Importa clientes de um CSV (colunas nome/telefone) para uma empresa, com upsert em lote"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Arquivo CSV (UTF-8, separado por ',' ou ';')")
+        parser.add_argument('--company', required=True, help="id ou slug da empresa")
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--dry-run', action='store_true', help="Só valida e conta, sem gravar")
+        parser.add_argument('--errors', help="Grava as linhas rejeitadas neste CSV")
+
+    def handle(self, *args, **options):
+        company_ref = options['company']
+        lookup = {'pk': company_ref} if company_ref.isdigit() else {'slug': company_ref}
+        company = Company.objects.filter(**lookup).first()
+        if company is None:
+            raise CommandError(f"Empresa '{company_ref}' não encontrada")
+
+        def progress(result):
+            self.stdout.write(
+                f"  {result.rows} linhas: {result.created} novos, {result.updated} atualizados, "
+                f"{result.error_count} erros"
+            )
+
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_clients(
+                    company, f, batch_size=options['batch_size'],
+                    dry_run=options['dry_run'], progress=progress,
+                    max_errors=None if options['errors'] else ImportResult.MAX_ERRORS,
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        report = result.as_dict()
+        if options['errors'] and result.errors:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['line', 'name', 'phone', 'error'])
+                writer.writeheader()
+                writer.writerows(result.errors)
+        for error in result.errors[:20]:
+            self.stdout.write(f"  linha {error['line']}: {error['error']} ({error['name']}, {error['phone']})")
+        if result.error_count > 20:
+            self.stdout.write(f"  ... e mais {result.error_count - 20} erros")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Simulação: ' if options['dry_run'] else ''}{company.name}: {report['rows']} linhas, "
+            f"{report['created']} novos, {report['updated']} atualizados, {report['unchanged']} sem mudança, "
+            f"{report['error_count']} erros em {report['seconds']}s ({report['rows_per_second']} linhas/s)"
+        ))
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.utils import timezone
+
+from accounts.models import Company
+from ncalendar.benchmarks import create_sample_company, percentile
+from ncalendar.models import Event
+
+ENDPOINTS = {
+    'events': ('/api/events/', '/api/async/events/'),
+    'professionals': ('/api/professionals/', '/api/async/professionals/'),
+    'services': ('/api/services/', '/api/async/services/'),
+}
+
+
+class Command(BaseCommand):
+    help = "Compara a vazão com requisições concorrentes: caminho WSGI (DRF) x ASGI (views async)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='events')
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--company', type=int, help="Usa uma empresa existente em vez de dados sintéticos")
+
+    def handle(self, *args, **options):
+        # Os dados precisam estar gravados: as threads do WSGI usam outras conexões
+        company = Company.objects.get(pk=options['company']) if options['company'] else None
+        created = company is None
+        if created:
+            company = create_sample_company('Loadtest API', professionals=10, clients=500, events=3000)
+        user = get_user_model().objects.create_user(
+            f'loadtest-{int(time.time())}', password=None, company=company
+        )
+
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        query = {'start': start.isoformat(), 'end': (start + timedelta(days=7)).isoformat()}
+        wsgi_path, asgi_path = ENDPOINTS[options['endpoint']]
+        try:
+            # Como no test runner: os clientes de teste usam o host "testserver"
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                results = [
+                    ('WSGI', self.run_wsgi(user, wsgi_path, query, options)),
+                    ('ASGI', asyncio.run(self.run_asgi(user, asgi_path, query, options))),
+                ]
+        finally:
+            user.delete()
+            if created:
+                Event.objects.filter(company=company).delete()
+                company.delete()
+
+        self.stdout.write(
+            f"{options['requests']} requisições em {options['endpoint']}, concorrência {options['concurrency']}"
+        )
+        for label, (elapsed, latencies, statuses) in results:
+            self.stdout.write(
+                f"  {label}: {len(latencies) / elapsed:7.1f} req/s  "
+                f"p50={percentile(latencies, 50) * 1000:.1f}ms p95={percentile(latencies, 95) * 1000:.1f}ms  "
+                f"status={sorted(statuses)}"
+            )
+
+    def run_wsgi(self, user, path, query, options):
+        local = threading.local()
+
+        def request(_):
+            # Um Client por thread (sessão e conexão próprias)
+            if not hasattr(local, 'client'):
+                local.client = Client()
+                local.client.force_login(user)
+            started = time.perf_counter()
+            status = local.client.get(path, query).status_code
+            return time.perf_counter() - started, status
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            # Aquecimento: login das threads fora da medição
+            list(pool.map(request, range(options['concurrency'])))
+            started = time.perf_counter()
+            outcomes = list(pool.map(request, range(options['requests'])))
+        return self._summary(started, outcomes)
+
+    async def run_asgi(self, user, path, query, options):
+        client = AsyncClient()
+        await client.aforce_login(user)
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path, query)
+                return time.perf_counter() - started, response.status_code
+
+        await request()
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(request() for _ in range(options['requests'])))
+        return self._summary(started, outcomes)
+
+    def _summary(self, started, outcomes):
+        """(segundos, latências, status distintos)"""
+        elapsed = time.perf_counter() - started
+        return elapsed, [latency for latency, _ in outcomes], {status for _, status in outcomes}
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ncalendar import sync
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga os registros de exclusão (EventTombstone) mais antigos que "
+        "NCALENDAR_SYNC_TOMBSTONE_RETENTION_DAYS; rodar periodicamente (cron)"
+    )
+
+    def handle(self, *args, **options):
+        deleted = sync.prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} registros de exclusão apagados."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounts.models import Company
+from ncalendar import rollups
+
+
+class Command(BaseCommand):
+    help = "Recalcula os resumos diários (DailyRollup) a partir dos agendamentos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, action='append', help="ID da empresa (repetível; padrão: todas)")
+        parser.add_argument('--start', help="Primeiro dia (AAAA-MM-DD)")
+        parser.add_argument('--end', help="Último dia (AAAA-MM-DD)")
+
+    def handle(self, *args, **options):
+        days = []
+        for key in ('start', 'end'):
+            day = parse_date(options[key]) if options[key] else None
+            if options[key] and day is None:
+                raise CommandError(f"Data inválida em --{key}: {options[key]}")
+            days.append(day)
+
+        companies = Company.objects.order_by('pk')
+        if options['company']:
+            companies = companies.filter(pk__in=options['company'])
+        for company in companies:
+            rows = rollups.rebuild(company, *days)
+            self.stdout.write(f"{company.name}: {rows} linhas de resumo")
+        self.stdout.write(self.style.SUCCESS("Resumos recalculados."))
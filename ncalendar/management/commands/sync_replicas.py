@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ncalendar.routing import replicas
+
+
+class Command(BaseCommand):
+    help = "Copia o banco primário para as réplicas SQLite locais (DATABASE_REPLICAS)"
+
+    def handle(self, *args, **options):
+        aliases = replicas()
+        if not aliases:
+            raise CommandError("Nenhuma réplica configurada (defina DATABASE_REPLICAS)")
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError("sync_replicas só copia bancos SQLite; use a replicação do servidor")
+        primary.ensure_connection()
+        for alias in aliases:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f"Réplica '{alias}' não é SQLite")
+            replica.ensure_connection()
+            # API de backup do SQLite: cópia consistente mesmo com o primário em uso
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f"  {alias}: {replica.settings_dict['NAME']}")
+        self.stdout.write(self.style.SUCCESS(f"{len(aliases)} réplica(s) atualizada(s)."))
@@ -0,0 +1,247 @@
+# ncalendar/metrics.py
+"""
+Instrumentação por requisição: consultas SQL, tempo de banco, de serializer,
+da view e total da requisição.
+
+RequestMetricsMiddleware abre um RequestMetrics no contextvar; o wrapper de
+execução instalado em toda conexão (connection_created) soma as consultas e
+registra as lentas com o SQL normalizado; ViewTimingMiddleware, o último da
+lista, mede só a chamada da view. Ao final, toda requisição entra
+nos histogramas por endpoint do processo, expostos em /api/metrics/ (só
+administradores); o cabeçalho Server-Timing só sai em DEBUG ou para staff.
+"""
+import bisect
+import contextvars
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+slow_query_logger = logging.getLogger('ncalendar.sql.slow')
+
+# Limites superiores dos baldes dos histogramas (ms); o último é infinito
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = contextvars.ContextVar('ncalendar_request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'queries', 'sql_seconds', 'serializer_seconds', 'view_started', 'view_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.view_started = None
+        self.view_seconds = 0.0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        return (
+            f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f'serializer;dur={self.serializer_seconds * 1000:.1f}, '
+            f'view;dur={self.view_seconds * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+
+def start_request():
+    """Abre as métricas da requisição; devolve o token para finish_request()"""
+    return _current.set(RequestMetrics())
+
+
+def finish_request(token):
+    metrics = _current.get()
+    _current.reset(token)
+    return metrics
+
+
+def start_view():
+    """Marca o início da view (process_view do ViewTimingMiddleware)"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.view_started = time.perf_counter()
+
+
+def finish_view():
+    """Tempo desde start_view(); sem view resolvida (ex.: 404 de rota) fica 0"""
+    metrics = _current.get()
+    if metrics is not None and metrics.view_started is not None:
+        metrics.view_seconds = time.perf_counter() - metrics.view_started
+
+
+@contextmanager
+def serializer_timer():
+    """Soma o tempo do bloco como tempo de serializer da requisição"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_seconds += time.perf_counter() - started
+
+
+# --- SQL -------------------------------------------------------------------
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL sem literais e com listas IN colapsadas: agrupa consultas iguais"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def record_query(execute, sql, params, many, context):
+    """Wrapper de execução (connection.execute_wrappers) de todas as conexões"""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.sql_seconds += duration
+        threshold = getattr(settings, 'NCALENDAR_SLOW_QUERY_MS', None)
+        if threshold is not None and duration * 1000 >= threshold:
+            slow_query_logger.warning(
+                "Consulta lenta (%.1fms, %s): %s", duration * 1000,
+                context['connection'].alias, normalize_sql(sql),
+            )
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """Receiver de connection_created"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# --- Histogramas por endpoint ----------------------------------------------
+
+class EndpointStats:
+    __slots__ = (
+        'count', 'buckets', 'total_ms', 'max_ms', 'queries', 'max_queries', 'sql_ms', 'serializer_ms', 'view_ms',
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = self.max_ms = 0.0
+        self.queries = self.max_queries = 0
+        self.sql_ms = self.serializer_ms = self.view_ms = 0.0
+
+    def add(self, total_ms, metrics):
+        self.count += 1
+        self.buckets[bisect.bisect_left(BUCKETS_MS, total_ms)] += 1
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, total_ms)
+        self.queries += metrics.queries
+        self.max_queries = max(self.max_queries, metrics.queries)
+        self.sql_ms += metrics.sql_seconds * 1000
+        self.serializer_ms += metrics.serializer_seconds * 1000
+        self.view_ms += metrics.view_seconds * 1000
+
+    def percentile(self, pct):
+        """Limite superior do balde que contém o percentil (None = acima do último)"""
+        target = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip((*BUCKETS_MS, None), self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def as_dict(self):
+        n = self.count or 1
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / n, 2),
+            'max_ms': round(self.max_ms, 2),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'avg_queries': round(self.queries / n, 2),
+            'max_queries': self.max_queries,
+            'avg_sql_ms': round(self.sql_ms / n, 2),
+            'avg_serializer_ms': round(self.serializer_ms / n, 2),
+            'avg_view_ms': round(self.view_ms / n, 2),
+            'histogram': {
+                (f'le_{bound}' if bound else 'inf'): count
+                for bound, count in zip((*BUCKETS_MS, None), self.buckets)
+            },
+        }
+
+
+class MetricsRegistry:
+    """Agregado em memória do processo (cada worker tem o seu)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.since = time.time()
+            self._endpoints = {}
+
+    def record(self, endpoint, total_ms, metrics):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.add(total_ms, metrics)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'since': self.since,
+                'buckets_ms': list(BUCKETS_MS),
+                'endpoints': {
+                    endpoint: stats.as_dict()
+                    for endpoint, stats in sorted(self._endpoints.items())
+                },
+            }
+
+
+registry = MetricsRegistry()
+
+
+def endpoint_name(request):
+    """'GET event-detail' — nome da rota resolvida, sem valores da URL"""
+    match = getattr(request, 'resolver_match', None)
+    name = (match.view_name or match.route) if match else 'unresolved'
+    return f'{request.method} {name}'
+
+
+def exposes_timing(request):
+    """Server-Timing só em DEBUG ou para staff: tempos internos não são públicos"""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+
+def finalize(request, response, metrics):
+    """Registro no histograma do endpoint e, para quem pode ver, Server-Timing"""
+    total = metrics.elapsed
+    if exposes_timing(request):
+        response['Server-Timing'] = metrics.server_timing(total)
+    registry.record(endpoint_name(request), total * 1000, metrics)
+    return response
@@ -1,24 +1,128 @@
-from threading import local
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 
-_thread_locals = local()
+from . import metrics, routing, tenancy
+from .tenancy import get_current_company  # noqa: F401
 
 
-def get_current_company():
-    """Retorna a company do usuário logado"""
-    return getattr(_thread_locals, 'company', None)
+class CompanyMiddleware:
+    """Ativa o contexto da empresa do usuário durante a requisição (WSGI ou ASGI)"""
+    sync_capable = True
+    async_capable = True
 
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = tenancy.activate(request.user)
+        try:
+            return self.get_response(request)
+        finally:
+            tenancy.deactivate(token)
+
+    async def __acall__(self, request):
+        # request.user faria consulta síncrona dentro do event loop
+        token = tenancy.activate(await request.auser())
+        try:
+            return await self.get_response(request)
+        finally:
+            tenancy.deactivate(token)
+
+
+class RequestMetricsMiddleware:
+    """Consultas, tempo de SQL/serializer/view/total por requisição (/api/metrics/ e Server-Timing)"""
+    sync_capable = True
+    async_capable = True
 
-class CompanyMiddleware:
-    """Middleware que armazena a company do usuário na thread"""
-    
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
-        if request.user.is_authenticated:
-            _thread_locals.company = request.user.company
-        else:
-            _thread_locals.company = None
-        
-        response = self.get_response(request)
-        return response
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics = metrics.finish_request(token)
+        return metrics.finalize(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics = metrics.finish_request(token)
+        return metrics.finalize(request, response, request_metrics)
+
+
+class ViewTimingMiddleware:
+    """Tempo só da view (Server-Timing 'view'); fica por último em MIDDLEWARE"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        try:
+            return self.get_response(request)
+        finally:
+            metrics.finish_view()
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            metrics.finish_view()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Chamado logo antes da view, depois do process_view dos demais
+        metrics.start_view()
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Estado do roteamento de leituras (ncalendar.routing) e fixação no primário após gravações"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = routing.start_request()
+        try:
+            return self.get_response(request)
+        finally:
+            self.finish(request, routing.finish_request(token))
+
+    async def __acall__(self, request):
+        token = routing.start_request()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.finish(request, routing.finish_request(token))
+
+    def finish(self, request, state):
+        # request.user já é o da autenticação do DRF (sessão ou token), quando houve
+        user = getattr(request, 'user', None)
+        if state.wrote and routing.replicas() and user is not None and user.is_authenticated:
+            routing.pin_to_primary(user)
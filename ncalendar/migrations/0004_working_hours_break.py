@@ -0,0 +1,48 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncalendar', '0003_alter_client_phone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Break',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Segunda-feira'), (1, 'Terça-feira'), (2, 'Quarta-feira'), (3, 'Quinta-feira'), (4, 'Sexta-feira'), (5, 'Sábado'), (6, 'Domingo')], verbose_name='Dia da semana')),
+                ('start_time', models.TimeField(verbose_name='Início')),
+                ('end_time', models.TimeField(verbose_name='Fim')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='breaks', to='ncalendar.professional', verbose_name='Profissional')),
+            ],
+            options={
+                'verbose_name': 'Intervalo',
+                'verbose_name_plural': 'Intervalos',
+                'ordering': ['professional', 'weekday', 'start_time'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['professional', 'weekday'], name='ncalendar_b_profess_7cb1f9_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkingHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Segunda-feira'), (1, 'Terça-feira'), (2, 'Quarta-feira'), (3, 'Quinta-feira'), (4, 'Sexta-feira'), (5, 'Sábado'), (6, 'Domingo')], verbose_name='Dia da semana')),
+                ('start_time', models.TimeField(verbose_name='Início')),
+                ('end_time', models.TimeField(verbose_name='Fim')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='working_hours', to='ncalendar.professional', verbose_name='Profissional')),
+            ],
+            options={
+                'verbose_name': 'Expediente',
+                'verbose_name_plural': 'Expedientes',
+                'ordering': ['professional', 'weekday', 'start_time'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['professional', 'weekday'], name='ncalendar_w_profess_60efb9_idx')],
+            },
+        ),
+    ]
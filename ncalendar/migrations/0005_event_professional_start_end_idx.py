@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncalendar', '0004_working_hours_break'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['professional', 'start', 'end'], name='ncalendar_e_profess_9a90a1_idx'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:36
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_company'),
+        ('ncalendar', '0005_event_professional_start_end_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeriesException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField(verbose_name='Início original')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Exceção de série',
+                'verbose_name_plural': 'Exceções de série',
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='original_start',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Início original na série'),
+        ),
+        migrations.CreateModel(
+            name='RecurringSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField(verbose_name='Primeira ocorrência')),
+                ('duration', models.DurationField(default=datetime.timedelta(seconds=3600), verbose_name='Duração')),
+                ('value', models.DecimalField(decimal_places=2, default=0.0, max_digits=10, verbose_name='Valor')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Observações')),
+                ('frequency', models.CharField(choices=[('daily', 'Diária'), ('weekly', 'Semanal'), ('monthly', 'Mensal')], default='weekly', max_length=10, verbose_name='Frequência')),
+                ('interval', models.PositiveSmallIntegerField(default=1, verbose_name='Intervalo')),
+                ('weekdays', models.CharField(blank=True, help_text='Somente semanal: dias separados por vírgula (0=segunda ... 6=domingo)', max_length=20, verbose_name='Dias da semana')),
+                ('count', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Quantidade de ocorrências')),
+                ('until', models.DateTimeField(blank=True, null=True, verbose_name='Repetir até')),
+                ('active', models.BooleanField(default=True, verbose_name='Ativa')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='ncalendar.client', verbose_name='Cliente')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='accounts.company')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='series_created', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='ncalendar.professional', verbose_name='Profissional')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='series', to='ncalendar.service', verbose_name='Serviço')),
+            ],
+            options={
+                'verbose_name': 'Série recorrente',
+                'verbose_name_plural': 'Séries recorrentes',
+                'ordering': ['start'],
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='ncalendar.recurringseries', verbose_name='Série'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['series', 'original_start'], name='ncalendar_e_series__de0734_idx'),
+        ),
+        migrations.AddField(
+            model_name='seriesexception',
+            name='series',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='ncalendar.recurringseries'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringseries',
+            index=models.Index(fields=['professional', 'start'], name='ncalendar_r_profess_19e5a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringseries',
+            index=models.Index(fields=['company', 'start'], name='ncalendar_r_company_5c9354_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seriesexception',
+            unique_together={('series', 'original_start')},
+        ),
+    ]
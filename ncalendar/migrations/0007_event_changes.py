@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_company'),
+        ('ncalendar', '0006_recurring_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.BigIntegerField(verbose_name='Agendamento')),
+                ('professional_id', models.BigIntegerField(verbose_name='Profissional')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Excluído em')),
+            ],
+            options={
+                'verbose_name': 'Agendamento excluído',
+                'verbose_name_plural': 'Agendamentos excluídos',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['updated_at', 'id'], name='ncalendar_e_updated_d7103e_idx'),
+        ),
+        migrations.AddField(
+            model_name='eventtombstone',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_tombstones', to='accounts.company'),
+        ),
+        migrations.AddIndex(
+            model_name='eventtombstone',
+            index=models.Index(fields=['company', 'id'], name='ncalendar_e_company_c6aa36_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventtombstone',
+            index=models.Index(fields=['deleted_at'], name='ncalendar_e_deleted_4f6f4d_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:41
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Cópia das funções de ncalendar.search na época desta migração: mudanças
+# futuras naquele módulo não alteram o preenchimento feito aqui
+NAME_NORMALIZED_MAX_LENGTH = 255
+
+_spaces = re.compile(r'\s+')
+_non_digits = re.compile(r'\D+')
+
+
+def normalize_text(value):
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _spaces.sub(' ', stripped.casefold()).strip()
+
+
+def normalize_phone(value):
+    return _non_digits.sub('', value or '')
+
+
+def fill_search_fields(apps, schema_editor):
+    Client = apps.get_model('ncalendar', 'Client')
+    batch = []
+    for client in Client.objects.only('id', 'name', 'phone').iterator(chunk_size=2000):
+        client.name_normalized = normalize_text(client.name)[:NAME_NORMALIZED_MAX_LENGTH]
+        client.phone_digits = normalize_phone(client.phone)
+        batch.append(client)
+        if len(batch) >= 2000:
+            Client.objects.bulk_update(batch, ['name_normalized', 'phone_digits'])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, ['name_normalized', 'phone_digits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_company'),
+        ('ncalendar', '0007_event_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='name_normalized',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['company', 'name_normalized'], name='ncalendar_c_company_a73195_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['company', 'phone_digits'], name='ncalendar_c_company_762450_idx'),
+        ),
+        migrations.RunPython(fill_search_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_event_company(apps, schema_editor):
+    Event = apps.get_model('ncalendar', 'Event')
+    Professional = apps.get_model('ncalendar', 'Professional')
+    Event.objects.filter(company__isnull=True).update(company_id=Subquery(
+        Professional.objects.filter(pk=OuterRef('professional_id')).values('company_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_company'),
+        ('ncalendar', '0008_client_search_fields'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='ncalendar_e_start_37d50f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='ncalendar_e_updated_d7103e_idx',
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='company',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='accounts.company', verbose_name='Empresa'),
+        ),
+        migrations.RunPython(fill_event_company, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='company',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='accounts.company', verbose_name='Empresa'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['company', 'start', 'end'], name='ncalendar_e_company_09ce6c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['company', 'professional', 'start'], name='ncalendar_e_company_7e0925_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='ncalendar_e_company_e5b060_idx'),
+        ),
+    ]
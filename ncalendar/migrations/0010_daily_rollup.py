@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_company'),
+        ('ncalendar', '0009_event_company'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Agendado'), (2, 'Concluído'), (3, 'Cancelado'), (4, 'Não compareceu'), (6, 'Em andamento'), (7, 'Pendente pagamento')], verbose_name='Status')),
+                ('count', models.IntegerField(default=0, verbose_name='Agendamentos')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Faturamento')),
+                ('booked_seconds', models.BigIntegerField(default=0, verbose_name='Tempo agendado (s)')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='accounts.company')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='ncalendar.professional')),
+            ],
+            options={
+                'verbose_name': 'Resumo diário',
+                'verbose_name_plural': 'Resumos diários',
+                'indexes': [models.Index(fields=['company', 'day'], name='ncalendar_d_company_4a3fae_idx')],
+                'unique_together': {('company', 'professional', 'day', 'status')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-17 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncalendar', '0010_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='professional',
+            name='feed_token',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True, verbose_name='Token do calendário'),
+        ),
+    ]
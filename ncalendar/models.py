@@ -1,5 +1,6 @@
 # ncalendar/models.py
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.utils import timezone
 from django.conf import settings
 from datetime import timedelta
@@ -9,6 +10,10 @@ class Professional(models.Model):
     company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='professionals')
     name = models.CharField("Nome", max_length=100)
     active = models.BooleanField("Ativo", default=True)
+    # Segredo da URL de assinatura da agenda (/feeds/professionals/<token>.ics)
+    feed_token = models.CharField(
+        "Token do calendário", max_length=64, unique=True, null=True, blank=True, editable=False
+    )
     
     # Campos de auditoria
     created_at = models.DateTimeField(auto_now_add=True)
@@ -32,6 +37,11 @@ class Client(models.Model):
     company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='clients')
     name = models.CharField("Nome", max_length=100)
     phone = models.CharField("Telefone", max_length=20, unique=True, null=True, blank=True)
+
+    # Campos de busca (ver ncalendar.search); a decomposição NFKD pode alongar
+    # o nome (ex.: 'ß' -> 'ss', ligaduras), daí a folga e o corte no save
+    name_normalized = models.CharField(max_length=255, editable=False, default='')
+    phone_digits = models.CharField(max_length=20, editable=False, blank=True, default='')
     
     # Campos de auditoria
     created_at = models.DateTimeField(auto_now_add=True)
@@ -40,10 +50,28 @@ class Client(models.Model):
     class Meta:
         ordering = ['name']
         unique_together = (('company', 'name'),)
+        indexes = [
+            models.Index(fields=['company', 'name_normalized']),
+            models.Index(fields=['company', 'phone_digits']),
+        ]
 
     def __str__(self):
         return f'{self.name} ({self.phone})'
 
+    def update_search_fields(self):
+        """Recalcula os campos de busca; chamar antes de bulk_create/bulk_update"""
+        from .search import normalize_text, normalize_phone
+        max_length = self._meta.get_field('name_normalized').max_length
+        self.name_normalized = normalize_text(self.name)[:max_length]
+        self.phone_digits = normalize_phone(self.phone)
+
+    def save(self, *args, **kwargs):
+        self.update_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'name', 'phone'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'name_normalized', 'phone_digits'}
+        super().save(*args, **kwargs)
+
 
 class Service(models.Model):
     """Serviços vinculados a profissionais específicos"""
@@ -77,6 +105,77 @@ class Service(models.Model):
         return int(self.duration.total_seconds() // 60)
 
 
+class WeeklyInterval(models.Model):
+    """Intervalo semanal recorrente no horário local da empresa"""
+    WEEKDAY_CHOICES = [
+        (0, "Segunda-feira"),
+        (1, "Terça-feira"),
+        (2, "Quarta-feira"),
+        (3, "Quinta-feira"),
+        (4, "Sexta-feira"),
+        (5, "Sábado"),
+        (6, "Domingo"),
+    ]
+
+    weekday = models.PositiveSmallIntegerField("Dia da semana", choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField("Início")
+    end_time = models.TimeField("Fim")
+
+    class Meta:
+        abstract = True
+        ordering = ['professional', 'weekday', 'start_time']
+
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+    def clean(self):
+        """Valida se o fim é posterior ao início"""
+        if self.start_time and self.end_time and self.end_time <= self.start_time:
+            raise ValidationError({'end_time': 'O fim deve ser posterior ao início.'})
+
+
+class WorkingHours(WeeklyInterval):
+    """Expediente do profissional; vários registros no mesmo dia formam turnos"""
+    professional = models.ForeignKey(
+        Professional,
+        on_delete=models.CASCADE,
+        related_name='working_hours',
+        verbose_name="Profissional"
+    )
+
+    class Meta(WeeklyInterval.Meta):
+        verbose_name = "Expediente"
+        verbose_name_plural = "Expedientes"
+        indexes = [
+            models.Index(fields=['professional', 'weekday']),
+        ]
+
+
+class Break(WeeklyInterval):
+    """Intervalo (almoço, pausa) descontado do expediente"""
+    professional = models.ForeignKey(
+        Professional,
+        on_delete=models.CASCADE,
+        related_name='breaks',
+        verbose_name="Profissional"
+    )
+
+    class Meta(WeeklyInterval.Meta):
+        verbose_name = "Intervalo"
+        verbose_name_plural = "Intervalos"
+        indexes = [
+            models.Index(fields=['professional', 'weekday']),
+        ]
+
+
+class EventConflictError(ValidationError):
+    """Conflito de horário com outros agendamentos do profissional"""
+
+    def __init__(self, conflicts):
+        self.conflicts = list(conflicts)
+        super().__init__({'start': 'O profissional já possui agendamento neste horário.'})
+
+
 class Event(models.Model):
     STATUS_CHOICES = [
         (1, "Agendado"),
@@ -96,6 +195,25 @@ class Event(models.Model):
         7: "#6f42c1",
     }
 
+    # Status com fundo escuro (texto branco)
+    DARK_STATUSES = frozenset({3, 6, 7})
+    DEFAULT_COLOR = "#3788d8"
+
+    # Status que não ocupam a agenda do profissional
+    NON_BLOCKING_STATUSES = (3, 4)
+
+    # Limita a janela da busca de conflitos no índice (professional, start, end)
+    MAX_DURATION = timedelta(hours=24)
+
+    # Empresa copiada do profissional em save(): consultas filtram sem join
+    company = models.ForeignKey(
+        'accounts.Company',
+        on_delete=models.CASCADE,
+        related_name='events',
+        editable=False,
+        verbose_name="Empresa"
+    )
+
     start = models.DateTimeField("Início")
     end = models.DateTimeField("Fim", editable=False)
 
@@ -127,49 +245,315 @@ class Event(models.Model):
         verbose_name="Atualizado por"
     )
 
+    # Ocorrência de série materializada (editada individualmente)
+    series = models.ForeignKey(
+        'RecurringSeries',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='events',
+        verbose_name="Série"
+    )
+    original_start = models.DateTimeField("Início original na série", null=True, blank=True)
+
     class Meta:
         verbose_name = "Agendamento"
         ordering = ['-start']
         indexes = [
-            models.Index(fields=['start', 'professional']),
+            # Empresa primeiro: cada consulta percorre só a faixa do tenant
+            models.Index(fields=['company', 'start', 'end']),
+            models.Index(fields=['company', 'professional', 'start']),
+            # Sincronização incremental (/api/events/changes/)
+            models.Index(fields=['company', 'updated_at', 'id']),
             models.Index(fields=['status']),
+            # Checagem de conflitos
+            models.Index(fields=['professional', 'start', 'end']),
+            models.Index(fields=['series', 'original_start']),
         ]
 
     def __str__(self):
         return f"{self.client} - {self.service} ({self.get_status_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Valores lidos do banco: os resumos (rollups) aplicam só a diferença ao salvar
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def clean(self):
-        """Valida se o serviço pertence ao profissional"""
-        from django.core.exceptions import ValidationError
+        """Valida serviço e cliente da mesma empresa/profissional e a duração máxima"""
         if self.service and self.professional:
             if self.service.professional != self.professional:
                 raise ValidationError({
                     'service': f'O serviço "{self.service.name}" não pertence ao profissional "{self.professional.name}"'
                 })
+        if self.client_id and self.professional_id:
+            if self.client.company_id != self.professional.company_id:
+                raise ValidationError({'client': 'O cliente pertence a outra empresa.'})
+
+        if self.duration and self.duration > self.MAX_DURATION:
+            raise ValidationError({'duration': 'A duração máxima de um agendamento é de 24 horas.'})
+
+    def full_clean(self, *args, **kwargs):
+        # Conflitos são checados depois das demais validações e fora de clean()
+        # para que a exceção chegue intacta (full_clean reagrupa os erros de clean)
+        super().full_clean(*args, **kwargs)
+        conflicts = self.find_conflicts()
+        if conflicts:
+            raise EventConflictError(conflicts)
+
+    def find_conflicts(self):
+        """Agendamentos do profissional que se sobrepõem a este (uma consulta de faixa)"""
+        if self.status in self.NON_BLOCKING_STATUSES:
+            return []
+        if not (self.professional_id and self.start and self.duration):
+            return []
+
+        start = self.start
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        end = start + self.duration
+
+        # Nenhum agendamento passa de MAX_DURATION, então o início fica limitado
+        # dos dois lados e a busca percorre só uma faixa curta do índice
+        qs = Event.objects.filter(
+            professional_id=self.professional_id,
+            start__gt=start - self.MAX_DURATION,
+            start__lt=end,
+            end__gt=start,
+        ).exclude(status__in=self.NON_BLOCKING_STATUSES)
+        if self.pk:
+            qs = qs.exclude(pk=self.pk)
+        conflicts = list(qs.only('id', 'start', 'end', 'status')[:10])
+
+        # Ocorrências virtuais de séries também ocupam a agenda
+        from .recurrence import expand_occurrences
+        series = RecurringSeries.objects.overlapping(start, end).filter(
+            professional_id=self.professional_id
+        ).select_related('company')
+        for occurrence_series, occurrence_start in expand_occurrences(series, start, end):
+            if (occurrence_series.pk, occurrence_start) == (self.series_id, self.original_start):
+                continue
+            conflicts.append(occurrence_series.as_event(occurrence_start))
+        return conflicts
 
     def save(self, *args, **kwargs):
-        # Validação
-        self.full_clean()
-        
-        # Sempre recalcula o end com base na duração atual
-        try:
-            self.end = self.start + self.duration
-        except Exception:
-            pass
+        with transaction.atomic():
+            # Trava o profissional para serializar gravações concorrentes
+            # na mesma agenda até o commit (checagem de conflito segura)
+            if self.professional_id:
+                list(Professional.objects.select_for_update()
+                     .filter(pk=self.professional_id).values_list('pk', flat=True))
 
-        # Corrige timezone
-        if timezone.is_naive(self.start):
-            self.start = timezone.make_aware(self.start)
-        if self.end and timezone.is_naive(self.end):
-            self.end = timezone.make_aware(self.end)
+            # Empresa sempre derivada do profissional (consistência do tenant)
+            if self.professional_id:
+                self.company_id = self.professional.company_id
 
-        super().save(*args, **kwargs)
+            # Validação
+            self.full_clean()
+
+            # Sempre recalcula o end com base na duração atual
+            try:
+                self.end = self.start + self.duration
+            except Exception:
+                pass
+
+            # Corrige timezone
+            if timezone.is_naive(self.start):
+                self.start = timezone.make_aware(self.start)
+            if self.end and timezone.is_naive(self.end):
+                self.end = timezone.make_aware(self.end)
+
+            super().save(*args, **kwargs)
 
     @property
     def background_color(self):
-        return self.STATUS_COLORS.get(self.status, "#3788d8")
+        return self.STATUS_COLORS.get(self.status, self.DEFAULT_COLOR)
 
     @property
     def text_color(self):
-        dark = {3, 6, 7}
-        return "#ffffff" if self.status in dark else "#000000"
\ No newline at end of file
+        return "#ffffff" if self.status in self.DARK_STATUSES else "#000000"
+
+
+class EventTombstone(models.Model):
+    """Registro de exclusão de Event para a sincronização incremental"""
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='event_tombstones')
+    event_id = models.BigIntegerField("Agendamento")
+    professional_id = models.BigIntegerField("Profissional")
+    deleted_at = models.DateTimeField("Excluído em", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Agendamento excluído"
+        verbose_name_plural = "Agendamentos excluídos"
+        indexes = [
+            models.Index(fields=['company', 'id']),
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} ({self.deleted_at})"
+
+
+class DailyRollup(models.Model):
+    """
+    Resumo diário de agendamentos por profissional e status.
+
+    Atualizado incrementalmente pelos sinais de Event (ncalendar/rollups.py);
+    `day` é a data local no fuso da empresa. Relatórios leem só desta tabela.
+    """
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='daily_rollups')
+    professional = models.ForeignKey(Professional, on_delete=models.CASCADE, related_name='daily_rollups')
+    day = models.DateField("Dia")
+    status = models.PositiveSmallIntegerField("Status", choices=Event.STATUS_CHOICES)
+
+    count = models.IntegerField("Agendamentos", default=0)
+    revenue = models.DecimalField("Faturamento", max_digits=14, decimal_places=2, default=0)
+    booked_seconds = models.BigIntegerField("Tempo agendado (s)", default=0)
+
+    class Meta:
+        verbose_name = "Resumo diário"
+        verbose_name_plural = "Resumos diários"
+        unique_together = ['company', 'professional', 'day', 'status']
+        indexes = [
+            models.Index(fields=['company', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.professional_id} {self.day} [{self.status}]: {self.count}"
+
+
+class RecurringSeriesQuerySet(models.QuerySet):
+    def overlapping(self, start, end):
+        """Séries ativas que podem ter ocorrências em [start, end)"""
+        return self.filter(active=True, start__lt=end).filter(
+            models.Q(until__isnull=True) | models.Q(until__gt=start - Event.MAX_DURATION)
+        )
+
+
+class RecurringSeries(models.Model):
+    """
+    Agendamento recorrente (estilo RRULE).
+
+    As ocorrências não são gravadas em Event: são expandidas apenas para a
+    janela consultada. Uma ocorrência vira Event quando é editada
+    (Event.series/original_start) e é omitida quando cancelada (SeriesException).
+    """
+    FREQUENCY_CHOICES = [
+        ('daily', "Diária"),
+        ('weekly', "Semanal"),
+        ('monthly', "Mensal"),
+    ]
+    MAX_COUNT = 500
+
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='series')
+    professional = models.ForeignKey(Professional, on_delete=models.CASCADE, related_name='series', verbose_name="Profissional")
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name='series', verbose_name="Cliente")
+    service = models.ForeignKey(Service, on_delete=models.PROTECT, related_name='series', verbose_name="Serviço")
+
+    start = models.DateTimeField("Primeira ocorrência")
+    duration = models.DurationField("Duração", default=timedelta(minutes=60))
+    value = models.DecimalField("Valor", max_digits=10, decimal_places=2, default=0.00)
+    description = models.TextField("Observações", blank=True, null=True)
+
+    frequency = models.CharField("Frequência", max_length=10, choices=FREQUENCY_CHOICES, default='weekly')
+    interval = models.PositiveSmallIntegerField("Intervalo", default=1)
+    weekdays = models.CharField(
+        "Dias da semana", max_length=20, blank=True,
+        help_text="Somente semanal: dias separados por vírgula (0=segunda ... 6=domingo)"
+    )
+    count = models.PositiveSmallIntegerField("Quantidade de ocorrências", null=True, blank=True)
+    until = models.DateTimeField("Repetir até", null=True, blank=True)
+    active = models.BooleanField("Ativa", default=True)
+
+    # Campos de auditoria
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='series_created',
+        verbose_name="Criado por"
+    )
+
+    objects = RecurringSeriesQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Série recorrente"
+        verbose_name_plural = "Séries recorrentes"
+        ordering = ['start']
+        indexes = [
+            models.Index(fields=['professional', 'start']),
+            models.Index(fields=['company', 'start']),
+        ]
+
+    def __str__(self):
+        return f"{self.client} - {self.service} ({self.get_frequency_display()})"
+
+    @property
+    def weekday_list(self):
+        return [int(day) for day in self.weekdays.split(',') if day.strip()]
+
+    def clean(self):
+        """Valida serviço do profissional, dias da semana e limites da série"""
+        if self.service_id and self.professional_id and self.service.professional_id != self.professional_id:
+            raise ValidationError({
+                'service': f'O serviço "{self.service.name}" não pertence ao profissional "{self.professional.name}"'
+            })
+        try:
+            if any(day not in range(7) for day in self.weekday_list):
+                raise ValueError
+        except ValueError:
+            raise ValidationError({'weekdays': 'Use números de 0 (segunda) a 6 (domingo) separados por vírgula.'})
+        if self.count and self.count > self.MAX_COUNT:
+            raise ValidationError({'count': f'Máximo de {self.MAX_COUNT} ocorrências.'})
+        if self.duration and self.duration > Event.MAX_DURATION:
+            raise ValidationError({'duration': 'A duração máxima de um agendamento é de 24 horas.'})
+
+    def save(self, *args, **kwargs):
+        self.full_clean()
+        if self.count:
+            # Guarda a última ocorrência para que a busca por janela não
+            # precise expandir séries já encerradas
+            from .recurrence import last_occurrence
+            self.until = last_occurrence(self)
+        super().save(*args, **kwargs)
+
+    def as_event(self, occurrence_start):
+        """Event não salvo representando a ocorrência"""
+        event = Event(
+            company_id=self.company_id,
+            professional_id=self.professional_id,
+            client_id=self.client_id,
+            service_id=self.service_id,
+            start=occurrence_start,
+            end=occurrence_start + self.duration,
+            duration=self.duration,
+            value=self.value,
+            description=self.description,
+            status=1,
+            series=self,
+            original_start=occurrence_start,
+        )
+        # Reaproveita relações já carregadas (select_related) sem novas consultas
+        for name in ('professional', 'client', 'service'):
+            if self._meta.get_field(name).is_cached(self):
+                setattr(event, name, getattr(self, name))
+        return event
+
+
+class SeriesException(models.Model):
+    """Ocorrência cancelada de uma série"""
+    series = models.ForeignKey(RecurringSeries, on_delete=models.CASCADE, related_name='exceptions')
+    original_start = models.DateTimeField("Início original")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Exceção de série"
+        verbose_name_plural = "Exceções de série"
+        unique_together = (('series', 'original_start'),)
+
+    def __str__(self):
+        return f"{self.series} - {self.original_start}"
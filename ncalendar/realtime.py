@@ -0,0 +1,176 @@
+# ncalendar/realtime.py
+"""
+Distribuição em tempo real das mudanças de agenda (Server-Sent Events).
+
+Gravações publicam mensagens por empresa num barramento; cada calendário
+aberto é uma assinatura assíncrona (api/streams.py) que só acorda quando chega
+mensagem ou no heartbeat. Barramentos:
+
+- InProcessBus: filas asyncio no próprio processo (um único worker);
+- RedisBus: pub/sub do Redis entre workers; cada processo mantém uma única
+  conexão de escuta e redistribui localmente para as suas assinaturas.
+
+O barramento é escolhido em settings.NCALENDAR_REALTIME_BUS.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Mensagens pendentes por conexão; se o navegador não acompanhar, recebe
+# um único "refetch" no lugar das mensagens descartadas
+QUEUE_SIZE = 100
+REFETCH = {'type': 'refetch'}
+
+
+def _deliver(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(REFETCH)
+
+
+class InProcessBus:
+    """Fan-out em memória; publish() pode ser chamado de qualquer thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, company_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(company_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, message)
+            except RuntimeError:
+                # Loop já encerrado; a assinatura sai no finally de subscribe()
+                pass
+
+    def has_subscribers(self, company_id):
+        """Se vale montar a mensagem (evita a consulta quando ninguém escuta)"""
+        return self.subscriber_count(company_id) > 0
+
+    def subscriber_count(self, company_id=None):
+        with self._lock:
+            if company_id is not None:
+                return len(self._subscribers.get(company_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    @asynccontextmanager
+    async def subscribe(self, company_id):
+        """Fila asyncio com as mensagens da empresa enquanto o contexto estiver aberto"""
+        entry = (asyncio.get_running_loop(), asyncio.Queue(QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[company_id].add(entry)
+        try:
+            await self._on_subscribe()
+            yield entry[1]
+        finally:
+            with self._lock:
+                self._subscribers[company_id].discard(entry)
+                if not self._subscribers[company_id]:
+                    del self._subscribers[company_id]
+
+    async def _on_subscribe(self):
+        pass
+
+
+class RedisBus(InProcessBus):
+    """Pub/sub do Redis para vários workers (um canal por empresa)"""
+    CHANNEL_PREFIX = 'ncalendar:events:'
+
+    def __init__(self, url=None):
+        super().__init__()
+        self.url = url or settings.REDIS_URL
+        self._client = None
+        self._listeners = {}
+
+    def publish(self, company_id, message):
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(f'{self.CHANNEL_PREFIX}{company_id}', json.dumps(message))
+
+    def has_subscribers(self, company_id):
+        # Assinantes podem estar em outros workers
+        return True
+
+    async def _on_subscribe(self):
+        # Uma escuta por event loop (processo), iniciada na primeira assinatura
+        loop = asyncio.get_running_loop()
+        task = self._listeners.get(loop)
+        if task is None or task.done():
+            self._listeners[loop] = loop.create_task(self._listen())
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        while True:
+            try:
+                client = aioredis.Redis.from_url(self.url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(f'{self.CHANNEL_PREFIX}*')
+                    async for item in pubsub.listen():
+                        if item['type'] != 'pmessage':
+                            continue
+                        channel = item['channel']
+                        if isinstance(channel, bytes):
+                            channel = channel.decode()
+                        company_id = int(channel[len(self.CHANNEL_PREFIX):])
+                        super().publish(company_id, json.loads(item['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Conexão de tempo real com o Redis caiu; reconectando")
+                # Assinantes podem ter perdido mensagens
+                for company_id in list(self._subscribers):
+                    super().publish(company_id, REFETCH)
+                await asyncio.sleep(1)
+
+
+_bus = None
+
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        _bus = import_string(getattr(settings, 'NCALENDAR_REALTIME_BUS', 'ncalendar.realtime.InProcessBus'))()
+    return _bus
+
+
+def _publish(company_id, message):
+    try:
+        get_bus().publish(company_id, message)
+    except Exception:
+        # Tempo real é melhor esforço: a gravação já foi confirmada
+        logger.exception("Falha ao publicar mudança de agenda")
+
+
+def publish_event_on_commit(company_id, event_id, action):
+    """Após o commit, envia o evento já no formato do feed do calendário"""
+    def send():
+        from .api.serializers import EventCalendarSerializer
+        from .models import Event
+
+        if not get_bus().has_subscribers(company_id):
+            return
+        rows = EventCalendarSerializer.fast_rows(Event.objects.filter(pk=event_id))
+        if rows:
+            _publish(company_id, {'type': action, 'id': event_id, 'event': rows[0]})
+    transaction.on_commit(send)
+
+
+def publish_on_commit(company_id, message):
+    transaction.on_commit(lambda: _publish(company_id, message))
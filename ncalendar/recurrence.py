@@ -0,0 +1,80 @@
+# ncalendar/recurrence.py
+"""
+Expansão preguiçosa de séries recorrentes.
+
+As regras são avaliadas no horário local da empresa (o horário de parede
+se mantém em mudanças de fuso) e apenas para a janela pedida.
+"""
+from dateutil import rrule
+
+from .availability import company_timezone
+from .models import Event, SeriesException
+
+FREQUENCIES = {
+    'daily': rrule.DAILY,
+    'weekly': rrule.WEEKLY,
+    'monthly': rrule.MONTHLY,
+}
+
+
+def _local(moment, tz):
+    return moment.astimezone(tz).replace(tzinfo=None)
+
+
+def build_rule(series, tz):
+    """rrule da série com dtstart no horário local (naive)"""
+    kwargs = {'dtstart': _local(series.start, tz), 'interval': series.interval or 1}
+    if series.frequency == 'weekly' and series.weekday_list:
+        kwargs['byweekday'] = series.weekday_list
+    if series.count:
+        kwargs['count'] = series.count
+    elif series.until:
+        kwargs['until'] = _local(series.until, tz)
+    return rrule.rrule(FREQUENCIES[series.frequency], **kwargs)
+
+
+def last_occurrence(series):
+    """Início da última ocorrência de uma série com `count`"""
+    tz = company_timezone(series.company)
+    occurrences = list(build_rule(series, tz))
+    return occurrences[-1].replace(tzinfo=tz) if occurrences else series.start
+
+
+def is_occurrence(series, moment):
+    """Verifica se `moment` é um início de ocorrência da série"""
+    tz = company_timezone(series.company)
+    local = _local(moment, tz)
+    return build_rule(series, tz).between(local, local, inc=True) == [local]
+
+
+def occurrence_starts(series, start, end, tz):
+    """Inícios das ocorrências que se sobrepõem a [start, end)"""
+    rule = build_rule(series, tz)
+    # início em (start - duração, end) <=> ocorrência sobrepõe a janela
+    after = _local(start - series.duration, tz)
+    before = _local(end, tz)
+    return [local.replace(tzinfo=tz) for local in rule.between(after, before)]
+
+
+def expand_occurrences(series_list, start, end):
+    """
+    Ocorrências virtuais (série, início) na janela, sem as canceladas e
+    sem as já materializadas como Event (2 consultas no total).
+    """
+    candidates = []
+    for series in series_list:
+        tz = company_timezone(series.company)
+        candidates.extend((series, moment) for moment in occurrence_starts(series, start, end, tz))
+    if not candidates:
+        return []
+
+    series_ids = {series.pk for series, _ in candidates}
+    window = (min(moment for _, moment in candidates), max(moment for _, moment in candidates))
+    skip = set(SeriesException.objects.filter(
+        series_id__in=series_ids, original_start__range=window
+    ).values_list('series_id', 'original_start'))
+    skip.update(Event.objects.filter(
+        series_id__in=series_ids, original_start__range=window
+    ).values_list('series_id', 'original_start'))
+
+    return [(series, moment) for series, moment in candidates if (series.pk, moment) not in skip]
@@ -0,0 +1,245 @@
+# ncalendar/rollups.py
+"""
+Resumos diários de faturamento, status e ocupação (DailyRollup).
+
+Cada agendamento contribui para uma linha (empresa, profissional, dia local,
+status) com +1 agendamento, +valor e +duração. Ao salvar, a contribuição
+antiga (valores lidos do banco em Event.from_db) é subtraída e a nova somada;
+ao excluir, só subtraída. Event.save() e a criação em lote travam o
+profissional, então atualizações da mesma linha já ficam serializadas.
+
+Ocorrências virtuais de séries só entram quando materializadas em Event.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+from accounts.models import Company
+from .availability import company_timezone, merge_intervals, subtract_intervals
+from .models import Professional, Event, DailyRollup, WorkingHours, Break
+
+STATE_FIELDS = ('company_id', 'professional_id', 'start', 'status', 'value', 'duration')
+
+PERIODS = {
+    'day': lambda day: day,
+    'week': lambda day: day - timedelta(days=day.weekday()),
+    'month': lambda day: day.replace(day=1),
+}
+PERIOD_TRUNC = {'week': TruncWeek, 'month': TruncMonth}
+
+
+def _old_state(event):
+    """Valores do agendamento como estão no banco, se conhecidos"""
+    loaded = getattr(event, '_loaded_values', None)
+    if loaded and all(field in loaded for field in STATE_FIELDS):
+        return loaded
+    return None
+
+
+def _current_state(event):
+    return {field: getattr(event, field) for field in STATE_FIELDS}
+
+
+def _timezones(states):
+    company_ids = {state['company_id'] for state in states}
+    return {
+        pk: company_timezone(company)
+        for pk, company in Company.objects.in_bulk(company_ids).items()
+    }
+
+
+def _add_contribution(deltas, state, tz, sign):
+    key = (state['company_id'], state['professional_id'], state['start'].astimezone(tz).date(), state['status'])
+    delta = deltas[key]
+    delta[0] += sign
+    delta[1] += sign * Decimal(str(state['value']))
+    delta[2] += sign * int(state['duration'].total_seconds())
+
+
+def _collect(removed=(), added=()):
+    """Deltas por chave: [agendamentos, faturamento, segundos]"""
+    deltas = defaultdict(lambda: [0, Decimal('0'), 0])
+    tzs = _timezones([*removed, *added])
+    for state in removed:
+        _add_contribution(deltas, state, tzs[state['company_id']], -1)
+    for state in added:
+        _add_contribution(deltas, state, tzs[state['company_id']], 1)
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Soma os deltas nas linhas de resumo com UPDATE atômico (F)"""
+    for (company_id, professional_id, day, status), (count, revenue, seconds) in deltas.items():
+        if not (count or revenue or seconds):
+            continue
+        rows = DailyRollup.objects.filter(
+            company_id=company_id, professional_id=professional_id, day=day, status=status
+        )
+        updated = rows.update(
+            count=F('count') + count,
+            revenue=F('revenue') + revenue,
+            booked_seconds=F('booked_seconds') + seconds,
+        )
+        if updated and count < 0:
+            rows.filter(count__lte=0).delete()
+        # Delta negativo sem linha: o resumo já foi removido em cascata
+        if not updated and count > 0:
+            DailyRollup.objects.create(
+                company_id=company_id, professional_id=professional_id, day=day, status=status,
+                count=count, revenue=revenue, booked_seconds=seconds,
+            )
+
+
+def snapshot_before_save(event):
+    """Carrega os valores antigos quando o objeto não veio do banco (ou veio com campos adiados)"""
+    if event._state.adding or event.pk is None or _old_state(event) is not None:
+        return
+    event._loaded_values = Event.objects.filter(pk=event.pk).values(*STATE_FIELDS).first() or {}
+
+
+def event_saved(event, created):
+    old = None if created else _old_state(event)
+    new = _current_state(event)
+    if old == new:
+        return
+    apply_deltas(_collect(removed=[old] if old else [], added=[new]))
+    # Próximo save() do mesmo objeto parte do estado gravado agora
+    event._loaded_values = new
+
+
+def event_deleted(event):
+    apply_deltas(_collect(removed=[_old_state(event) or _current_state(event)]))
+
+
+def events_created(events):
+    apply_deltas(_collect(added=[_current_state(event) for event in events]))
+
+
+def rebuild(company, start_day=None, end_day=None):
+    """
+    Recalcula os resumos da empresa a partir de Event (backfill ou correção).
+
+    Sem datas, reconstrói tudo. Retorna o número de linhas gravadas.
+    """
+    tz = company_timezone(company)
+    events = Event.objects.filter(company=company)
+    rollups = DailyRollup.objects.filter(company=company)
+    if start_day:
+        events = events.filter(start__gte=datetime.combine(start_day, time.min, tzinfo=tz))
+        rollups = rollups.filter(day__gte=start_day)
+    if end_day:
+        events = events.filter(start__lt=datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=tz))
+        rollups = rollups.filter(day__lte=end_day)
+
+    rows = (
+        events
+        .annotate(day=TruncDate('start', tzinfo=tz))
+        .values('professional_id', 'day', 'status')
+        .annotate(n=Count('id'), revenue_sum=Sum('value'), booked=Sum('duration'))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        # Mesma trava de Event.save(): nenhuma gravação concorrente se perde
+        list(Professional.objects.select_for_update().filter(company=company)
+             .order_by('pk').values_list('pk', flat=True))
+        rollups.delete()
+        created = DailyRollup.objects.bulk_create([
+            DailyRollup(
+                company=company,
+                professional_id=row['professional_id'],
+                day=row['day'],
+                status=row['status'],
+                count=row['n'],
+                revenue=row['revenue_sum'] or 0,
+                booked_seconds=int(row['booked'].total_seconds()) if row['booked'] else 0,
+            )
+            for row in rows
+        ], batch_size=1000)
+    return len(created)
+
+
+def _weekday_seconds(professional_ids):
+    """Segundos de expediente (menos intervalos) por profissional e dia da semana"""
+    rules = defaultdict(lambda: defaultdict(lambda: ([], [])))
+    for model, slot in ((WorkingHours, 0), (Break, 1)):
+        for professional_id, weekday, start_time, end_time in model.objects.filter(
+            professional_id__in=professional_ids
+        ).values_list('professional_id', 'weekday', 'start_time', 'end_time'):
+            reference = datetime(2000, 1, 3)  # uma segunda-feira qualquer
+            rules[professional_id][weekday][slot].append((
+                datetime.combine(reference, start_time), datetime.combine(reference, end_time)
+            ))
+
+    seconds = defaultdict(dict)
+    for professional_id, weekdays in rules.items():
+        for weekday, (working, breaks) in weekdays.items():
+            free = subtract_intervals(merge_intervals(working), merge_intervals(breaks))
+            seconds[professional_id][weekday] = sum((end - start).total_seconds() for start, end in free)
+    return seconds
+
+
+def report(company, start_day, end_day, period='day', professional_ids=None):
+    """
+    Faturamento, status e ocupação por período e profissional, lidos de DailyRollup.
+
+    Faturamento e tempo agendado ignoram cancelados e faltas; a ocupação
+    compara o tempo agendado com o expediente cadastrado no período.
+    """
+    bucket_of = PERIODS[period]
+    rollups = DailyRollup.objects.filter(company=company, day__gte=start_day, day__lte=end_day)
+    if professional_ids:
+        rollups = rollups.filter(professional_id__in=professional_ids)
+    bucket = PERIOD_TRUNC[period]('day') if period in PERIOD_TRUNC else F('day')
+    aggregated = (
+        rollups
+        .annotate(bucket=bucket)
+        .values('bucket', 'professional_id', 'status')
+        .annotate(n=Sum('count'), revenue_sum=Sum('revenue'), booked=Sum('booked_seconds'))
+        .order_by()
+    )
+
+    results = {}
+
+    def row_for(key):
+        if key not in results:
+            results[key] = {
+                'period_start': key[0], 'professional': key[1], 'count': 0, 'by_status': {},
+                'revenue': Decimal('0'), 'booked_seconds': 0, 'available_seconds': 0,
+            }
+        return results[key]
+
+    for item in aggregated:
+        bucket_day = item['bucket']
+        if isinstance(bucket_day, datetime):
+            bucket_day = bucket_day.date()
+        row = row_for((bucket_day, item['professional_id']))
+        row['count'] += item['n']
+        row['by_status'][item['status']] = row['by_status'].get(item['status'], 0) + item['n']
+        if item['status'] not in Event.NON_BLOCKING_STATUSES:
+            row['revenue'] += item['revenue_sum']
+            row['booked_seconds'] += item['booked']
+
+    professionals = Professional.objects.filter(company=company, active=True)
+    if professional_ids:
+        professionals = professionals.filter(pk__in=professional_ids)
+    professional_ids = {pk for _, pk in results} | set(professionals.values_list('pk', flat=True))
+    weekday_seconds = _weekday_seconds(professional_ids)
+    day = start_day
+    while day <= end_day:
+        for professional_id, seconds in weekday_seconds.items():
+            available = seconds.get(day.weekday())
+            if available:
+                row_for((bucket_of(day), professional_id))['available_seconds'] += available
+        day += timedelta(days=1)
+
+    rows = sorted(results.values(), key=lambda row: (row['period_start'], row['professional']))
+    for row in rows:
+        row['utilization'] = (
+            round(row['booked_seconds'] / row['available_seconds'], 4) if row['available_seconds'] else None
+        )
+    return rows
@@ -0,0 +1,108 @@
+# ncalendar/routing.py
+"""
+Leituras da API em réplicas (settings.NCALENDAR_READ_REPLICAS), gravações no 'default'.
+
+Só as views que pedem (ReplicaReadMixin, em GET/HEAD/OPTIONS) leem de uma
+réplica; todo o resto continua no primário. Como a réplica pode estar
+atrasada, após uma gravação o usuário e a empresa dele ficam presos ao
+primário por NCALENDAR_REPLICA_STICKY_SECONDS: o próprio usuário lê o que
+acabou de gravar e ninguém da empresa guarda no cache versionado (ver
+cache.py) dados anteriores à versão nova. A marca fica no cache, então vale
+para sessão e token e entre workers (com Redis).
+
+Com DATABASE_REPLICAS apontando para arquivos SQLite locais, o comando
+sync_replicas copia o primário para eles.
+"""
+import contextvars
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .cache import get_cache
+
+_state = contextvars.ContextVar('ncalendar_routing', default=None)
+
+
+class RoutingState:
+    __slots__ = ('read_alias', 'wrote')
+
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False
+
+
+def replicas():
+    return getattr(settings, 'NCALENDAR_READ_REPLICAS', [])
+
+
+def _sticky_seconds():
+    return getattr(settings, 'NCALENDAR_REPLICA_STICKY_SECONDS', 10)
+
+
+def _pin_keys(user):
+    keys = [f'ncalendar:primary:user:{user.pk}']
+    if user.company_id:
+        keys.append(f'ncalendar:primary:company:{user.company_id}')
+    return keys
+
+
+def start_request():
+    """Novo estado de roteamento para a requisição; devolve o token para finish_request()"""
+    return _state.set(RoutingState())
+
+
+def finish_request(token):
+    state = _state.get()
+    _state.reset(token)
+    return state
+
+
+def pin_to_primary(user):
+    """Leituras do usuário e da empresa dele vão ao primário pela janela de consistência"""
+    seconds = _sticky_seconds()
+    until = time.time() + seconds
+    get_cache().set_many({key: until for key in _pin_keys(user)}, seconds)
+
+
+def is_pinned(user):
+    now = time.time()
+    return any(until > now for until in get_cache().get_many(_pin_keys(user)).values())
+
+
+def read_from_replica(user):
+    """
+    Passa as leituras do restante da requisição a uma réplica, se houver
+    alguma e o usuário não estiver preso ao primário; devolve o alias ou None.
+    """
+    state = _state.get()
+    aliases = replicas()
+    if state is None or not aliases or state.wrote or not user.is_authenticated or is_pinned(user):
+        return None
+    state.read_alias = random.choice(aliases)
+    return state.read_alias
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.read_alias is None or state.wrote:
+            return None
+        # Dentro de uma transação no primário, ler dele para enxergar as próprias gravações
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
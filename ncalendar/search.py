@@ -0,0 +1,91 @@
+# ncalendar/search.py
+"""
+Busca de clientes por nome e telefone.
+
+Os campos Client.name_normalized (sem acentos, minúsculo) e
+Client.phone_digits (só dígitos) são indexados junto com a empresa; as
+etapas de prefixo viram buscas por faixa no índice. Etapas sem índice
+(palavra do meio, trecho) só rodam se faltarem resultados e ainda houver
+orçamento de tempo.
+"""
+import re
+import time
+import unicodedata
+
+from django.conf import settings
+from django.db.models import Q
+
+_spaces = re.compile(r'\s+')
+_non_digits = re.compile(r'\D+')
+
+# Maior code point Unicode: limite superior de uma faixa de prefixo
+PREFIX_END = '\U0010ffff'
+
+COUNTRY_CODE = '55'
+
+RANK_EXACT, RANK_PREFIX, RANK_WORD, RANK_SUBSTRING = range(4)
+
+
+def normalize_text(value):
+    """'  José  da CONCEIÇÃO ' -> 'jose da conceicao'"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _spaces.sub(' ', stripped.casefold()).strip()
+
+
+def normalize_phone(value):
+    """'+55 (11) 99999-0000' -> '5511999990000'"""
+    return _non_digits.sub('', value or '')
+
+
+def _prefix(field, value):
+    return {f'{field}__gte': value, f'{field}__lt': value + PREFIX_END}
+
+
+def search_clients(queryset, q, limit=20, budget_ms=None):
+    """
+    Clientes do queryset (já filtrado pela empresa) que casam com `q`,
+    ordenados por relevância: exato, prefixo, início de palavra, trecho.
+    """
+    if budget_ms is None:
+        budget_ms = getattr(settings, 'NCALENDAR_CLIENT_SEARCH_BUDGET_MS', 50)
+    deadline = time.perf_counter() + budget_ms / 1000
+
+    name = normalize_text(q)
+    digits = normalize_phone(q)
+    queryset = queryset.order_by('name_normalized', 'id')
+    found = {}
+
+    def collect(rank, qs):
+        for client in qs.exclude(pk__in=list(found))[:limit - len(found)]:
+            exact = client.name_normalized == name or (
+                digits and client.phone_digits in (digits, COUNTRY_CODE + digits)
+            )
+            found[client.pk] = (RANK_EXACT if exact else rank, client)
+
+    # Telefone: basta o usuário digitar 3+ dígitos, com ou sem o DDI 55
+    if len(digits) >= 3 and len(digits) * 2 >= len(q.replace(' ', '')):
+        phone_filter = Q(**_prefix('phone_digits', digits))
+        if not digits.startswith(COUNTRY_CODE):
+            phone_filter |= Q(**_prefix('phone_digits', COUNTRY_CODE + digits))
+        collect(RANK_PREFIX, queryset.filter(phone_filter))
+
+    if name:
+        stages = [
+            (RANK_PREFIX, queryset.filter(**_prefix('name_normalized', name))),
+            (RANK_WORD, queryset.filter(name_normalized__contains=' ' + name)),
+        ]
+        if len(name) >= 3:
+            stages.append((RANK_SUBSTRING, queryset.filter(name_normalized__contains=name)))
+        for index, (rank, qs) in enumerate(stages):
+            if len(found) >= limit:
+                break
+            # A primeira etapa (índice) sempre roda; as demais respeitam o orçamento
+            if index and time.perf_counter() > deadline:
+                break
+            collect(rank, qs)
+
+    ranked = sorted(found.values(), key=lambda item: (item[0], item[1].name_normalized, item[1].pk))
+    return [client for _, client in ranked]
@@ -0,0 +1,160 @@
+# ncalendar/signals.py
+from django.conf import settings
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from . import feeds, realtime, rollups
+from .cache import bump_company_version_on_commit
+from .models import (
+    Professional, Client, Service, Event, WorkingHours, Break,
+    RecurringSeries, SeriesException, EventTombstone
+)
+
+# Enviado após inserções em lote (bulk_create não dispara post_save), ainda
+# dentro da transação: efeitos externos dos receptores vão para o on_commit.
+# Argumentos: company_id, events (lista de Event já salvos)
+events_bulk_created = Signal()
+
+
+def _company_id(instance):
+    """Empresa dona do registro, sem consultas quando a relação já está carregada"""
+    if isinstance(instance, SeriesException):
+        return instance.series.company_id
+    if isinstance(instance, (WorkingHours, Break)):
+        return instance.professional.company_id
+    return instance.company_id
+
+
+@receiver(post_save, sender=Professional)
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_save, sender=Break)
+@receiver(post_save, sender=RecurringSeries)
+@receiver(post_save, sender=SeriesException)
+@receiver(post_delete, sender=Professional)
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=WorkingHours)
+@receiver(post_delete, sender=Break)
+@receiver(post_delete, sender=RecurringSeries)
+@receiver(post_delete, sender=SeriesException)
+def invalidate_company_cache(sender, instance, **kwargs):
+    bump_company_version_on_commit(_company_id(instance))
+
+
+@receiver(post_delete, sender=Event)
+def record_event_tombstone(sender, instance, **kwargs):
+    # ModelViewSet.destroy não deixa rastro; a sincronização precisa saber da exclusão
+    EventTombstone.objects.create(
+        company_id=_company_id(instance),
+        event_id=instance.pk,
+        professional_id=instance.professional_id,
+    )
+
+
+@receiver(post_delete, sender=Event)
+def cancel_deleted_occurrence(sender, instance, origin=None, **kwargs):
+    # Ocorrência materializada excluída não pode voltar como ocorrência virtual.
+    # Só quando a exclusão partiu de agendamentos: em cascata (empresa,
+    # profissional...) a própria série está sendo apagada junto
+    from_events = isinstance(origin, Event) or getattr(origin, 'model', None) is Event
+    if from_events and instance.series_id and instance.original_start:
+        SeriesException.objects.get_or_create(
+            series_id=instance.series_id, original_start=instance.original_start
+        )
+
+
+@receiver(pre_save, sender=Event)
+def snapshot_event(sender, instance, raw=False, **kwargs):
+    if not raw:
+        rollups.snapshot_before_save(instance)
+
+
+@receiver(post_save, sender=Event)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    # Fixtures (raw) são resumidas depois com rebuild_rollups
+    if not raw:
+        rollups.event_saved(instance, created)
+
+
+@receiver(post_delete, sender=Event)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    rollups.event_deleted(instance)
+
+
+@receiver(post_save, sender=Event)
+def push_event_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        realtime.publish_event_on_commit(instance.company_id, instance.pk, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Event)
+def push_event_deleted(sender, instance, **kwargs):
+    realtime.publish_on_commit(instance.company_id, {'type': 'deleted', 'id': instance.pk})
+
+
+@receiver(pre_save, sender=Event)
+def invalidate_feed_before_save(sender, instance, raw=False, **kwargs):
+    # Agendamento trocado de profissional: o feed antigo também muda
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    old = loaded.get('professional_id')
+    if not raw and old and old != instance.professional_id:
+        feeds.bump_feed_on_commit(old)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_feed(sender, instance, **kwargs):
+    feeds.bump_feed_on_commit(instance.professional_id)
+
+
+@receiver(post_save, sender=Professional)
+@receiver(post_delete, sender=Professional)
+def invalidate_professional_feed(sender, instance, **kwargs):
+    feeds.forget_token(instance)
+    feeds.bump_feed_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=RecurringSeries)
+@receiver(post_save, sender=SeriesException)
+@receiver(post_delete, sender=RecurringSeries)
+@receiver(post_delete, sender=SeriesException)
+def push_series_changed(sender, instance, **kwargs):
+    # Ocorrências virtuais: o calendário recarrega a janela visível
+    realtime.publish_on_commit(_company_id(instance), realtime.REFETCH)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_company_cache_user(sender, instance, **kwargs):
+    # O vínculo usuário↔profissional aparece na lista de profissionais
+    bump_company_version_on_commit(instance.company_id)
+
+
+@receiver(post_save, sender='accounts.Company')
+def invalidate_company_cache_company(sender, instance, **kwargs):
+    # Nome e fuso da empresa vão no bootstrap do calendário
+    bump_company_version_on_commit(instance.pk)
+
+
+@receiver(events_bulk_created)
+def invalidate_company_cache_bulk(sender, company_id, **kwargs):
+    bump_company_version_on_commit(company_id)
+
+
+@receiver(events_bulk_created)
+def update_rollups_bulk(sender, events, **kwargs):
+    rollups.events_created(events)
+
+
+@receiver(events_bulk_created)
+def invalidate_feeds_bulk(sender, events, **kwargs):
+    for professional_id in {event.professional_id for event in events}:
+        feeds.bump_feed_on_commit(professional_id)
+
+
+@receiver(events_bulk_created)
+def push_events_bulk(sender, company_id, **kwargs):
+    realtime.publish_on_commit(company_id, realtime.REFETCH)
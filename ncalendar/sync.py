@@ -0,0 +1,141 @@
+# ncalendar/sync.py
+"""
+Sincronização incremental de agendamentos.
+
+O cursor é opaco para o cliente e guarda a posição (updated_at, id) do
+último Event entregue e (id, deleted_at) do último EventTombstone. O
+desempate por id garante que alterações no mesmo instante (mesmo segundo ou
+microssegundo) não se percam entre duas páginas.
+
+updated_at (auto_now) e o id do tombstone são atribuídos no save, não no
+commit: uma transação que confirma depois pode gravar atrás de um cursor já
+entregue. Por isso cada consulta relê uma janela de NCALENDAR_SYNC_LAG_SECONDS
+atrás do cursor e remove os repetidos por id; o cliente aplica as mudanças
+por id (idempotente) e pode recebê-las mais de uma vez. Transações mais
+longas que a janela ainda podem ser perdidas.
+
+Tombstones mais antigos que NCALENDAR_SYNC_TOMBSTONE_RETENTION_DAYS são
+apagados (prune_tombstones); um cursor emitido antes desse corte pode ter
+perdido exclusões e é recusado com CursorExpired (410: sincronização completa).
+"""
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import EventTombstone
+
+PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def _lag():
+    return timedelta(seconds=getattr(settings, 'NCALENDAR_SYNC_LAG_SECONDS', 60))
+
+
+def retention_cutoff():
+    """Tombstones excluídos antes deste instante podem já ter sido apagados"""
+    days = getattr(settings, 'NCALENDAR_SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+    return timezone.now() - timedelta(days=days)
+
+
+def prune_tombstones():
+    """Apaga os tombstones anteriores ao corte de retenção; devolve quantos"""
+    deleted, _ = EventTombstone.objects.filter(deleted_at__lt=retention_cutoff()).delete()
+    return deleted
+
+
+def encode_cursor(updated_at, event_id, tombstone_id, tombstone_at):
+    # 'i': emissão do cursor, comparada com o corte de retenção
+    payload = json.dumps({
+        'u': updated_at.isoformat(), 'e': event_id, 't': tombstone_id, 'd': tombstone_at.isoformat(),
+        'i': timezone.now().isoformat(),
+    })
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(updated_at, event_id, tombstone_id, tombstone_at, issued_at) do cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        moments = [parse_datetime(payload[key]) for key in ('u', 'd', 'i')]
+        if None in moments:
+            raise ValueError
+        updated_at, tombstone_at, issued_at = moments
+        return updated_at, int(payload['e']), int(payload['t']), tombstone_at, issued_at
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise InvalidCursor('Cursor inválido.')
+
+
+def current_cursor(company):
+    """Cursor apontando para agora (ponto de partida de um cliente novo)"""
+    now = timezone.now()
+    last_tombstone = (
+        EventTombstone.objects.filter(company=company)
+        .order_by('-id').values_list('id', 'deleted_at').first()
+    )
+    tombstone_id, tombstone_at = last_tombstone or (0, now)
+    return encode_cursor(now, 0, tombstone_id, tombstone_at)
+
+
+def changes_since(events, company, cursor, limit=PAGE_SIZE):
+    """
+    Eventos alterados e ids excluídos após o cursor (mais a janela de atraso).
+
+    `events` é o queryset de Event já filtrado pela empresa. Retorna
+    (eventos, ids excluídos, novo cursor, has_more); só as mudanças depois do
+    cursor contam para a paginação, então ela sempre avança. CursorExpired se
+    o cursor é anterior à retenção dos tombstones.
+    """
+    updated_at, event_id, tombstone_id, tombstone_at, issued_at = decode_cursor(cursor)
+    if issued_at < retention_cutoff():
+        raise CursorExpired('Cursor mais antigo que a retenção de exclusões; faça uma sincronização completa.')
+    lag = _lag()
+
+    changed = list(
+        events.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=event_id)
+        ).order_by('updated_at', 'id')[:limit + 1]
+    )
+    late = list(
+        events.filter(updated_at__gt=updated_at - lag).filter(
+            Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lte=event_id)
+        ).order_by('updated_at', 'id')[:limit]
+    )
+    tombstones = list(
+        EventTombstone.objects.filter(company=company, id__gt=tombstone_id)
+        .order_by('id').values_list('id', 'event_id', 'deleted_at')[:limit + 1]
+    )
+    late_tombstones = list(
+        EventTombstone.objects.filter(
+            company=company, id__lte=tombstone_id, deleted_at__gt=tombstone_at - lag
+        ).values_list('event_id', flat=True)[:limit]
+    )
+
+    has_more = len(changed) > limit or len(tombstones) > limit
+    changed, tombstones = changed[:limit], tombstones[:limit]
+
+    if changed:
+        updated_at, event_id = changed[-1].updated_at, changed[-1].pk
+    if tombstones:
+        tombstone_id, _, tombstone_at = tombstones[-1]
+
+    # Um evento excluído depois de alterado aparece só como excluído
+    deleted = list(dict.fromkeys([*late_tombstones, *(pk for _, pk, _ in tombstones)]))
+    deleted_set = set(deleted)
+    unique = {event.pk: event for event in (*late, *changed) if event.pk not in deleted_set}
+    changed = sorted(unique.values(), key=lambda event: (event.updated_at, event.pk))
+
+    return changed, deleted, encode_cursor(updated_at, event_id, tombstone_id, tombstone_at), has_more
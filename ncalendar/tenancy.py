@@ -0,0 +1,54 @@
+# ncalendar/tenancy.py
+"""
+Contexto da empresa (tenant) da requisição corrente, num contextvar.
+
+CompanyMiddleware ativa o contexto com o usuário autenticado (que já vem com
+empresa e profissional carregados, ver accounts.backends) e o desfaz ao fim
+da requisição, em WSGI ou ASGI; autenticações feitas pela própria view (DRF)
+podem reativá-lo. Nada aqui faz consulta ao banco.
+"""
+import contextvars
+
+_tenant = contextvars.ContextVar('ncalendar_tenant', default=None)
+
+
+class TenantContext:
+    __slots__ = ('user', 'company', 'professional')
+
+    def __init__(self, user):
+        self.user = user
+        # Relações já carregadas (select_related) não geram consulta
+        self.company = user.company if user.company_id else None
+        self.professional = user.professional if user.professional_id else None
+
+
+def activate(user):
+    """Ativa o contexto do usuário (ou vazio, se anônimo); devolve o token para deactivate()"""
+    context = TenantContext(user) if user is not None and user.is_authenticated else None
+    return _tenant.set(context)
+
+
+def deactivate(token):
+    _tenant.reset(token)
+
+
+def current():
+    return _tenant.get()
+
+
+def get_current_company():
+    context = _tenant.get()
+    return context.company if context else None
+
+
+def get_current_professional():
+    context = _tenant.get()
+    return context.professional if context else None
+
+
+def company_for(request):
+    """Empresa do usuário da requisição, lida do contexto quando é o mesmo usuário"""
+    context = _tenant.get()
+    if context is not None and context.user.pk == request.user.pk:
+        return context.company
+    return request.user.company
@@ -1,3 +1,700 @@
-from django.test import TestCase
+import io
+import os
+import signal
+import tempfile
+import time
+from unittest import mock
+from datetime import datetime, time as dt_time, timedelta
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import Company, User
+from . import availability, bulk, feeds, imports, metrics, rollups, routing, sync
+from .api.renderers import render_json
+from .api.serializers import EventCalendarSerializer
+from .api.streams import realtime_enabled
+from .cache import company_version
+from .models import (
+    Break, Client, DailyRollup, Event, EventConflictError, EventTombstone, Professional, RecurringSeries,
+    SeriesException, Service, WorkingHours,
+)
+
+TZ = ZoneInfo('America/Sao_Paulo')
+
+
+class CompanyFixtureMixin:
+    """Empresa com um profissional, um serviço de 30 min, um cliente e um gestor autenticado"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Salão', slug='salao')
+        cls.user = User.objects.create_user('ana', password='senha-forte-123', company=cls.company)
+        cls.professional = Professional.objects.create(company=cls.company, name='Bia')
+        cls.service = Service.objects.create(
+            company=cls.company, professional=cls.professional, name='Corte',
+            duration=timedelta(minutes=30), value=50,
+        )
+        cls.client_obj = Client.objects.create(company=cls.company, name='Joana', phone='(11) 99999-0000')
+
+    def setUp(self):
+        # Cache em memória compartilhado entre testes (versões por empresa, usuários)
+        for cache in caches.all():
+            cache.clear()
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def at(self, day, hour, minute=0):
+        return datetime(2030, 1, day, hour, minute, tzinfo=TZ)
+
+    def make_event(self, start, **fields):
+        fields = {
+            'company': self.company, 'professional': self.professional, 'service': self.service,
+            'client': self.client_obj, 'start': start, 'created_by': self.user,
+            'updated_by': self.user, **fields,
+        }
+        return Event.objects.create(**fields)
+
+
+class EventStreamTests(CompanyFixtureMixin, TestCase):
+    def test_wsgi_request_returns_204_without_holding_the_worker(self):
+        self.client.force_login(self.user)
+
+        def timeout(signum, frame):
+            raise AssertionError('stream SSE prendeu o worker no WSGI')
+
+        previous = signal.signal(signal.SIGALRM, timeout)
+        signal.alarm(5)
+        try:
+            started = time.monotonic()
+            response = self.client.get('/api/events/stream/')
+        finally:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, previous)
+        self.assertEqual(response.status_code, 204)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_calendar_page_disables_stream_under_wsgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['realtime'])
+        self.assertContains(response, 'id="calendar-realtime"')
+
+    def test_stream_enabled_only_for_asgi_requests(self):
+        self.assertTrue(realtime_enabled(AsyncRequestFactory().get('/api/events/stream/')))
+        self.assertFalse(realtime_enabled(RequestFactory().get('/api/events/stream/')))
+        with self.settings(NCALENDAR_REALTIME_ENABLED=False):
+            self.assertFalse(realtime_enabled(AsyncRequestFactory().get('/api/events/stream/')))
+
+
+class IntervalSweepTests(CompanyFixtureMixin, TestCase):
+    def working_hours(self, start_time, end_time):
+        # 01/01/2030 é terça-feira (weekday 1)
+        WorkingHours.objects.create(
+            professional=self.professional, weekday=1, start_time=start_time, end_time=end_time
+        )
+
+    def test_merge_touching_and_overlapping(self):
+        at = self.at
+        merged = availability.merge_intervals([
+            (at(1, 11), at(1, 12)), (at(1, 8), at(1, 9)), (at(1, 9), at(1, 10)),
+            (at(1, 11, 30), at(1, 13)), (at(1, 11, 45), at(1, 12, 15)), (at(1, 14), at(1, 14)),
+        ])
+        self.assertEqual(merged, [(at(1, 8), at(1, 10)), (at(1, 11), at(1, 13))])
+
+    def test_subtract(self):
+        at = self.at
+        base = [(at(1, 8), at(1, 12)), (at(1, 13), at(1, 18))]
+        busy = [
+            (at(1, 7), at(1, 8, 30)), (at(1, 10), at(1, 10, 30)),
+            (at(1, 11, 30), at(1, 13, 15)), (at(1, 18), at(1, 19)),
+        ]
+        self.assertEqual(availability.subtract_intervals(base, busy), [
+            (at(1, 8, 30), at(1, 10)), (at(1, 10, 30), at(1, 11, 30)), (at(1, 13, 15), at(1, 18)),
+        ])
+        self.assertEqual(availability.subtract_intervals(base, [(at(1, 7), at(1, 19))]), [])
+        self.assertEqual(availability.subtract_intervals(base, []), base)
+
+    def test_free_intervals_subtract_breaks_and_events(self):
+        self.working_hours(dt_time(9), dt_time(18))
+        Break.objects.create(
+            professional=self.professional, weekday=1, start_time=dt_time(12), end_time=dt_time(13)
+        )
+        self.make_event(self.at(1, 10), duration=timedelta(minutes=30))
+        self.make_event(self.at(1, 14), status=Event.NON_BLOCKING_STATUSES[0])
+        free = availability.free_intervals([self.professional.pk], self.at(1, 0), self.at(2, 0), TZ)
+        self.assertEqual(free[self.professional.pk], [
+            (self.at(1, 9), self.at(1, 10)), (self.at(1, 10, 30), self.at(1, 12)), (self.at(1, 13), self.at(1, 18)),
+        ])
+
+    def test_slots_at_closing_time_and_right_after_an_event(self):
+        self.working_hours(dt_time(9), dt_time(18))
+        self.make_event(self.at(1, 9, 15), duration=timedelta(hours=8))
+        slots = availability.available_slots(
+            self.professional, self.at(1, 0), self.at(2, 0), timedelta(minutes=30), step=timedelta(minutes=15)
+        )
+        # Começa exatamente no fim do agendamento e termina exatamente no fechamento
+        self.assertEqual(slots, [
+            (self.at(1, 17, 15), self.at(1, 17, 45)), (self.at(1, 17, 30), self.at(1, 18)),
+        ])
+
+    def test_first_available_slot(self):
+        self.working_hours(dt_time(9), dt_time(18))
+        self.make_event(self.at(1, 9), duration=timedelta(minutes=30))
+        service, start, end = availability.first_available_slot([self.service], self.at(1, 0), self.at(2, 0))
+        self.assertEqual((service, start, end), (self.service, self.at(1, 9, 30), self.at(1, 10)))
+
+
+class SeriesOccurrenceTests(CompanyFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.series = RecurringSeries.objects.create(
+            company=self.company, professional=self.professional, client=self.client_obj,
+            service=self.service, start=self.at(7, 10), duration=timedelta(minutes=30),
+            frequency='weekly', count=4, created_by=self.user,
+        )
+
+    def list_window(self):
+        response = self.api.get('/api/events/', {'start': '2030-01-14', 'end': '2030-01-15'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_deleted_materialized_occurrence_stays_gone(self):
+        occurrence = self.at(14, 10).isoformat()
+        # Cache do feed é invalidado no on_commit
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(
+                f'/api/series/{self.series.pk}/materialize/', {'original_start': occurrence}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.list_window()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.delete(f"/api/events/{response.json()['id']}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.list_window(), [])
+        self.assertTrue(SeriesException.objects.filter(
+            series=self.series, original_start=self.at(14, 10)
+        ).exists())
+
+    def test_cascade_delete_does_not_create_exceptions(self):
+        event = self.series.as_event(self.at(14, 10))
+        event.created_by = event.updated_by = self.user
+        event.save()
+        self.client_obj.delete()
+        self.assertFalse(SeriesException.objects.exists())
+
+
+class SyncChangesTests(CompanyFixtureMixin, TestCase):
+    def changes(self, cursor=None):
+        response = self.api.get('/api/events/changes/', {'since': cursor} if cursor else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_round_trip(self):
+        moment = timezone.now()
+        with mock.patch('ncalendar.sync.timezone.now', return_value=moment + timedelta(seconds=1)):
+            cursor = sync.encode_cursor(moment, 42, 7, moment - timedelta(seconds=5))
+        self.assertEqual(
+            sync.decode_cursor(cursor), (moment, 42, 7, moment - timedelta(seconds=5), moment + timedelta(seconds=1))
+        )
+        with self.assertRaises(sync.InvalidCursor):
+            sync.decode_cursor('lixo')
+
+    def test_cursor_older_than_retention_returns_410(self):
+        past = timezone.now() - timedelta(days=31)
+        with mock.patch('ncalendar.sync.timezone.now', return_value=past):
+            cursor = self.changes()['cursor']
+        response = self.api.get('/api/events/changes/', {'since': cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertIn('sincronização completa', response.json()['detail'])
+        with self.settings(NCALENDAR_SYNC_TOMBSTONE_RETENTION_DAYS=60):
+            self.assertEqual(self.api.get('/api/events/changes/', {'since': cursor}).status_code, 200)
+
+    def test_prune_tombstones(self):
+        old = EventTombstone.objects.create(company=self.company, event_id=1, professional_id=1)
+        recent = EventTombstone.objects.create(company=self.company, event_id=2, professional_id=1)
+        EventTombstone.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=31))
+        out = io.StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertEqual(list(EventTombstone.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertIn('1 registros', out.getvalue())
+
+    def test_created_updated_and_deleted_since_cursor(self):
+        kept = self.make_event(self.at(7, 9))
+        removed = self.make_event(self.at(7, 10))
+        start = self.changes()['cursor']
+
+        created = self.make_event(self.at(7, 11))
+        kept.status = 2
+        kept.save()
+        removed_id = removed.pk
+        removed.delete()
+
+        page = self.changes(start)
+        self.assertEqual([e['id'] for e in page['created']], [created.pk])
+        self.assertEqual([e['id'] for e in page['updated']], [kept.pk])
+        self.assertEqual(page['deleted'], [removed_id])
+        self.assertFalse(page['has_more'])
+
+    def test_pagination_delivers_every_change_once_in_order(self):
+        start = self.changes()['cursor']
+        events = [self.make_event(self.at(8, 8 + hour)) for hour in range(5)]
+        seen, cursor, pages = [], start, 0
+        with self.settings(NCALENDAR_SYNC_LAG_SECONDS=0):
+            while True:
+                changed, _, cursor, has_more = sync.changes_since(
+                    Event.objects.filter(company=self.company), self.company, cursor, limit=2
+                )
+                seen.extend(event.pk for event in changed)
+                pages += 1
+                if not has_more:
+                    break
+        self.assertEqual(seen, [event.pk for event in events])
+        self.assertEqual(pages, 3)
+
+    def test_late_commit_behind_cursor_is_delivered(self):
+        start = self.changes()['cursor']
+        self.make_event(self.at(9, 9))
+        cursor = self.changes(start)['cursor']
+        # Transação que começou antes (updated_at menor) e só confirmou agora
+        late = self.make_event(self.at(9, 10))
+        Event.objects.filter(pk=late.pk).update(updated_at=sync.decode_cursor(cursor)[0] - timedelta(seconds=5))
+        tombstone = EventTombstone.objects.create(company=self.company, event_id=999, professional_id=1)
+        cursor = self.changes(cursor)['cursor']
+        EventTombstone.objects.filter(pk=tombstone.pk).update(id=0)
+
+        page = self.changes(cursor)
+        ids = [e['id'] for e in page['created'] + page['updated']]
+        self.assertIn(late.pk, ids)
+        self.assertIn(999, page['deleted'])
+        self.assertEqual(len(ids), len(set(ids)))
+
+
+class RollupConsistencyTests(CompanyFixtureMixin, TestCase):
+    def snapshot(self):
+        return sorted(DailyRollup.objects.filter(company=self.company).values_list(
+            'professional_id', 'day', 'status', 'count', 'revenue', 'booked_seconds'
+        ))
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rollups.rebuild(self.company)
+        self.assertEqual(incremental, self.snapshot())
+
+    def bulk_items(self, day, hours):
+        return [{
+            'professional': self.professional.pk, 'client': self.client_obj.pk,
+            'service': self.service.pk, 'start': self.at(day, hour).isoformat(), 'value': '50.00',
+        } for hour in hours]
+
+    def test_bulk_patch_and_delete_keep_rollups_in_sync(self):
+        response = self.api.post('/api/events/bulk/', self.bulk_items(10, [9, 10, 11]), format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(self.snapshot())
+        self.assertMatchesRebuild()
+
+        first, second, _ = response.json()['ids']
+        response = self.api.patch(f'/api/events/{first}/', {'status': 3}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertMatchesRebuild()
+
+        response = self.api.delete(f'/api/events/{second}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertMatchesRebuild()
+
+    def test_rollup_failure_rolls_back_bulk_insert(self):
+        with mock.patch.object(rollups, 'apply_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                bulk.create_events(self.company, self.user, [
+                    {**item, 'start': self.at(11, 9), 'duration': timedelta(minutes=30), 'status': 1}
+                    for item in self.bulk_items(11, [9])
+                ])
+        self.assertFalse(Event.objects.exists())
+
+
+class BulkCreateTests(CompanyFixtureMixin, TestCase):
+    def item(self, day, hour, minute=0, **fields):
+        return {
+            'professional': self.professional.pk, 'client': self.client_obj.pk, 'service': self.service.pk,
+            'start': self.at(day, hour, minute).isoformat(), 'duration_minutes': 30, **fields,
+        }
+
+    def post(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.api.post('/api/events/bulk/', items, format='json')
+
+    def errors(self, response):
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertFalse(Event.objects.exists())
+        return {error['index']: error['errors'] for error in response.json()['errors']}
+
+    def test_creates_back_to_back_items(self):
+        response = self.post([self.item(10, 9), self.item(10, 9, 30), self.item(10, 10)])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Event.objects.count(), 3)
+
+    def test_items_overlapping_each_other(self):
+        errors = self.errors(self.post([self.item(10, 9), self.item(10, 8, 45), self.item(10, 11)]))
+        # Ordenados por início: o item 1 vem antes e o item 0 conflita com ele
+        self.assertEqual(errors, {0: {'start': ['Conflita com o item 1 do lote.']}})
+
+    def test_non_blocking_items_may_overlap(self):
+        response = self.post([self.item(10, 9), self.item(10, 9, status=Event.NON_BLOCKING_STATUSES[0])])
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_item_overlapping_existing_schedule_rolls_back_the_batch(self):
+        existing = self.make_event(self.at(10, 10), duration=timedelta(minutes=30))
+        response = self.post([self.item(10, 9), self.item(10, 10, 15)])
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(list(Event.objects.values_list('pk', flat=True)), [existing.pk])
+        self.assertEqual(response.json()['errors'], [
+            {'index': 1, 'errors': {'start': ['O profissional já possui agendamento neste horário.']}},
+        ])
+
+    def test_ids_from_another_company(self):
+        other = Company.objects.create(name='Outro', slug='outro')
+        other_professional = Professional.objects.create(company=other, name='Zé')
+        other_client = Client.objects.create(company=other, name='Rui')
+        other_service = Service.objects.create(
+            company=other, professional=other_professional, name='Barba', duration=timedelta(minutes=30), value=30,
+        )
+        errors = self.errors(self.post([
+            self.item(10, 9, professional=other_professional.pk),
+            self.item(10, 10, client=other_client.pk),
+            self.item(10, 11, service=other_service.pk),
+        ]))
+        self.assertEqual(errors, {
+            0: {'professional': ['Profissional não encontrado.']},
+            1: {'client': ['Cliente não encontrado.']},
+            2: {'service': ['Serviço não encontrado.']},
+        })
+
+    def test_service_of_another_professional(self):
+        carla = Professional.objects.create(company=self.company, name='Carla')
+        errors = self.errors(self.post([self.item(10, 9, professional=carla.pk)]))
+        self.assertEqual(errors, {0: {'service': ['O serviço não pertence ao profissional.']}})
+
+
+class CalendarFeedCacheTests(CompanyFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = self.make_event(self.at(10, 9))
+        self.range = {'start': '2030-01-10', 'end': '2030-01-11'}
+
+    def feed(self, **headers):
+        return self.api.get('/api/events/', self.range, **headers)
+
+    def feed_ids(self):
+        response = self.feed()
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()]
+
+    def test_version_bump_after_commit_invalidates_cached_feed(self):
+        self.assertEqual(self.feed_ids(), [self.event.pk])
+        version = company_version(self.company.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            other = self.make_event(self.at(10, 11))
+        # Antes do commit a versão não muda: leitores não cacheiam dados pré-commit nela
+        self.assertEqual(company_version(self.company.pk), version)
+        self.assertEqual(self.feed_ids(), [self.event.pk])
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(company_version(self.company.pk), version)
+        self.assertEqual(sorted(self.feed_ids()), [self.event.pk, other.pk])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.feed()['ETag']
+        response = self.feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_any_write_changes_the_etag(self):
+        writes = [
+            lambda: self.api.patch(f'/api/events/{self.event.pk}/', {'description': 'retoque'}, format='json'),
+            lambda: self.api.patch(f'/api/clients/{self.client_obj.pk}/', {'name': 'Joana Silva'}, format='json'),
+            lambda: self.api.delete(f'/api/events/{self.event.pk}/'),
+        ]
+        etag = self.feed()['ETag']
+        for write in writes:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertLess(write().status_code, 300)
+            response = self.feed(HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+    def test_fast_rows_match_serializer_output(self):
+        no_phone = Client.objects.create(company=self.company, name='Zoë Ação \u2028')
+        for status in (2, 3, 4):
+            self.make_event(self.at(10, 9 + status), status=status, client=no_phone)
+        self.make_event(datetime(2030, 1, 10, 23, 30, tzinfo=ZoneInfo('UTC')), duration=timedelta(minutes=45))
+        queryset = Event.objects.filter(company=self.company).select_related(
+            'client', 'service', 'professional'
+        ).order_by('start', 'pk')
+        expected = JSONRenderer().render(EventCalendarSerializer(queryset, many=True).data)
+        self.assertEqual(render_json(EventCalendarSerializer.fast_rows(queryset)), expected)
+
+
+class EventConflictTests(CompanyFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.existing = self.make_event(self.at(14, 10), duration=timedelta(minutes=30))
+
+    def test_back_to_back_events_do_not_conflict(self):
+        self.make_event(self.at(14, 10, 30), duration=timedelta(minutes=30))
+        self.make_event(self.at(14, 9, 30), duration=timedelta(minutes=30))
+        self.assertEqual(Event.objects.count(), 3)
+
+    def test_overlap_raises_with_conflicting_events(self):
+        for start, minutes in [(self.at(14, 10, 15), 30), (self.at(14, 9, 45), 30), (self.at(14, 9), 120)]:
+            with self.subTest(start=start, minutes=minutes), self.assertRaises(EventConflictError) as raised:
+                self.make_event(start, duration=timedelta(minutes=minutes))
+            self.assertEqual([event.pk for event in raised.exception.conflicts], [self.existing.pk])
+
+    def test_other_professional_is_free(self):
+        other = Professional.objects.create(company=self.company, name='Carla')
+        service = Service.objects.create(
+            company=self.company, professional=other, name='Corte', duration=timedelta(minutes=30), value=50,
+        )
+        self.make_event(self.at(14, 10), professional=other, service=service)
+
+    def test_non_blocking_statuses(self):
+        for status in Event.NON_BLOCKING_STATUSES:
+            with self.subTest(status=status):
+                # Cancelado/faltou não bloqueia e também pode ocupar um horário já tomado
+                self.make_event(self.at(14, 10), status=status, duration=timedelta(minutes=30))
+        self.existing.status = Event.NON_BLOCKING_STATUSES[0]
+        self.existing.save()
+        self.make_event(self.at(14, 10), duration=timedelta(minutes=30))
+
+    def test_update_does_not_conflict_with_itself(self):
+        self.existing.duration = timedelta(minutes=45)
+        self.existing.save()
+
+    def test_virtual_series_occurrence_blocks(self):
+        series = RecurringSeries.objects.create(
+            company=self.company, professional=self.professional, client=self.client_obj,
+            service=self.service, start=self.at(7, 15), duration=timedelta(minutes=30),
+            frequency='weekly', count=3, created_by=self.user,
+        )
+        with self.assertRaises(EventConflictError) as raised:
+            self.make_event(self.at(14, 15, 15), duration=timedelta(minutes=30))
+        [conflict] = raised.exception.conflicts
+        self.assertIsNone(conflict.pk)
+        self.assertEqual((conflict.series_id, conflict.start), (series.pk, self.at(14, 15)))
+
+        # A própria ocorrência materializada não conflita com a versão virtual
+        event = series.as_event(self.at(14, 15))
+        event.created_by = event.updated_by = self.user
+        event.save()
+
+    def test_max_duration(self):
+        with self.assertRaises(ValidationError):
+            self.make_event(self.at(20, 0), duration=Event.MAX_DURATION + timedelta(minutes=1))
+        # Um agendamento longo ainda é achado pela janela de MAX_DURATION antes do início
+        self.make_event(self.at(20, 0), duration=Event.MAX_DURATION)
+        with self.assertRaises(EventConflictError):
+            self.make_event(self.at(20, 23, 30), duration=timedelta(minutes=30))
+
+    def test_api_returns_409_with_conflicts(self):
+        response = self.api.post('/api/events/', {
+            'professional': self.professional.pk, 'client': self.client_obj.pk,
+            'service': self.service.pk, 'start': self.at(14, 10, 15).isoformat(), 'duration_minutes': 30,
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+        body = response.json()
+        self.assertEqual(body['code'], 'conflict')
+        self.assertEqual(body['conflicts'], [{
+            'id': self.existing.pk, 'series': None,
+            'start': self.at(14, 10).isoformat(), 'end': self.at(14, 10, 30).isoformat(), 'status': 1,
+        }])
+        self.assertEqual(Event.objects.count(), 1)
+
+
+class ServerTimingTests(CompanyFixtureMixin, TestCase):
+    def endpoint_count(self, endpoint):
+        return metrics.registry.snapshot()['endpoints'].get(endpoint, {}).get('count', 0)
+
+    def test_header_hidden_from_regular_and_anonymous_users(self):
+        before = self.endpoint_count('GET bootstrap-list')
+        self.client.force_login(self.user)
+        self.assertNotIn('Server-Timing', self.client.get('/api/bootstrap/'))
+        self.client.logout()
+        self.assertNotIn('Server-Timing', self.client.get('/api/bootstrap/'))
+        # O histograma continua registrando todas as requisições
+        self.assertEqual(self.endpoint_count('GET bootstrap-list'), before + 2)
+
+    def test_header_for_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        timing = self.client.get('/api/bootstrap/')['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        durations = dict(
+            (part.split(';')[0].strip(), float(part.split('dur=')[1].split(';')[0]))
+            for part in timing.split(',')
+        )
+        self.assertEqual(set(durations), {'db', 'serializer', 'view', 'total'})
+        self.assertGreater(durations['view'], 0)
+        self.assertLessEqual(durations['view'], durations['total'])
+
+
+class ClientSearchFieldsTests(CompanyFixtureMixin, TestCase):
+    def test_normalized_name_fits_column_when_nfkd_expands(self):
+        # Cada 'ﬃ' vira 'ffi': o nome normalizado fica maior que o original
+        client = Client.objects.create(company=self.company, name='ﬃ' * 100)
+        max_length = Client._meta.get_field('name_normalized').max_length
+        self.assertEqual(client.name_normalized, ('ffi' * 100)[:max_length])
+
+
+class ClientListTests(CompanyFixtureMixin, TestCase):
+    def test_search_and_list_share_the_paginated_envelope(self):
+        Client.objects.create(company=self.company, name='João Pedro')
+        listing = self.api.get('/api/clients/').json()
+        search = self.api.get('/api/clients/', {'q': 'joao'}).json()
+        self.assertEqual(set(listing), {'next', 'previous', 'results'})
+        self.assertEqual(set(search), set(listing))
+        self.assertEqual([row['name'] for row in search['results']], ['João Pedro'])
+        self.assertIsNone(search['next'])
+
+
+class ClientImportTests(CompanyFixtureMixin, TestCase):
+    def run_import(self, text):
+        return imports.import_clients(self.company, io.StringIO(text))
+
+    def test_counts_created_updated_and_unchanged(self):
+        result = self.run_import('nome;telefone\nJoana Silva;11999990000\nCarla;11988887777\nDani;\nJoana;\n')
+        self.assertEqual((result.created, result.updated, result.unchanged), (2, 1, 1))
+        self.assertEqual(Client.objects.get(phone='(11) 99999-0000').name, 'Joana Silva')
+        self.assertTrue(Client.objects.filter(company=self.company, name='Carla', phone='+55 (11) 98888-7777').exists())
+
+    def test_phone_of_other_company_is_rejected(self):
+        other = Company.objects.create(name='Outro', slug='outro')
+        Client.objects.create(company=other, name='Maria', phone='+55 (11) 98888-7777')
+        result = self.run_import('nome,telefone\nCarla,11988887777\n')
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.errors[0]['error'], 'Telefone já cadastrado em outra empresa.')
+
+    def test_concurrent_insert_never_renames_other_company_client(self):
+        # Telefone gravado por outra empresa entre a consulta do lote e a inserção
+        other = Company.objects.create(name='Outro', slug='outro')
+        Client.objects.create(company=other, name='Maria', phone='+55 (11) 98888-7777')
+        with mock.patch.object(imports, '_existing_by_phone', return_value={}):
+            result = self.run_import('nome,telefone\nCarla,11988887777\nDani,\n')
+        self.assertEqual(Client.objects.get(phone='+55 (11) 98888-7777').name, 'Maria')
+        self.assertFalse(Client.objects.filter(company=self.company, name='Carla').exists())
+        self.assertEqual(result.created, 1)
+        self.assertEqual([error['line'] for error in result.errors], [2])
+
+    def test_dropped_name_only_rows_are_not_counted(self):
+        # Mesmo nome gravado por outra importação da empresa depois da consulta
+        with mock.patch.object(imports, '_existing_by_name', return_value={}):
+            result = self.run_import('nome\nJoana\n')
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.error_count, 1)
+        self.assertEqual(Client.objects.filter(company=self.company, name='Joana').count(), 1)
+
+
+class ProfessionalFeedTests(CompanyFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = Professional.objects.create(company=self.company, name='Carla')
+        self.url = f'/feeds/professionals/{feeds.ensure_token(self.other)}.ics'
+
+    def test_feed_of_deleted_professional_returns_404(self):
+        # Token e .ics em cache antes da exclusão
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_feed_with_stale_token_cache_returns_404(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        # Exclusão sem sinais: o token continua resolvendo pelo cache
+        Professional.objects.filter(pk=self.other.pk)._raw_delete('default')
+        feeds.bump_feed(self.other.pk)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_feed_of_inactive_professional_returns_404(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.other.active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+REPLICA = 'replica_test'
+
+
+@override_settings(NCALENDAR_READ_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Primário e réplica em dois bancos SQLite; a réplica é copiada do primário
+    com sync_replicas a cada teste (por isso fica fora de `databases`, que o
+    executor de testes criaria e limparia).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        name = os.path.join(cls.replica_dir.name, 'replica.sqlite3')
+        replica = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+        connections.settings[REPLICA] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], REPLICA: replica,
+        })[REPLICA]
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.company = Company.objects.create(name='Salão', slug='salao')
+        self.user = User.objects.create_user('ana', company=self.company)
+        self.professional = Professional.objects.create(company=self.company, name='Bia')
+        call_command('sync_replicas', stdout=io.StringIO())
+        # Só no primário: a réplica fica "atrasada"
+        Professional.objects.filter(pk=self.professional.pk).update(name='Bia Souza')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def professional_names(self):
+        response = self.api.get('/api/professionals/')
+        self.assertEqual(response.status_code, 200)
+        # Recursos do FullCalendar: o nome vem em 'title'
+        return [row['title'] for row in response.json()]
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(self.professional_names(), ['Bia'])
+
+    def test_writes_go_to_the_primary(self):
+        response = self.api.post('/api/clients/', {'name': 'Joana'}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(Client.objects.using(DEFAULT_DB_ALIAS).filter(name='Joana').exists())
+        self.assertFalse(Client.objects.using(REPLICA).filter(name='Joana').exists())
+
+    def test_user_reads_from_primary_after_a_write(self):
+        self.assertFalse(routing.is_pinned(self.user))
+        self.api.post('/api/clients/', {'name': 'Joana'}, format='json')
+        self.assertTrue(routing.is_pinned(self.user))
+        self.assertEqual(self.professional_names(), ['Bia Souza'])
+        # Passada a janela, volta a ler da réplica
+        later = time.time() + routing._sticky_seconds() + 1
+        with mock.patch('ncalendar.routing.time.time', return_value=later):
+            self.assertFalse(routing.is_pinned(self.user))
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import calendar_page
+from .views import calendar_page, professional_feed
 
 urlpatterns = [
     path("", calendar_page, name="calendar"),
+    path("feeds/professionals/<str:token>.ics", professional_feed, name="professional-feed"),
 ]
@@ -1,8 +1,43 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from . import bootstrap, feeds
+from .api.streams import realtime_enabled
+from .tenancy import company_for
 
 
 @login_required
 def calendar_page(request):
     # Render the calendar-specific template which imports FullCalendar and minicalendar assets
-    return render(request, "calendar.html")
+    # O script só abre o EventSource quando o stream pode ser servido
+    context = {'realtime': realtime_enabled(request)}
+    company = company_for(request)
+    if company is not None and getattr(settings, 'NCALENDAR_INLINE_BOOTSTRAP', True):
+        # Mesmo payload de /api/bootstrap/, sem ida ao servidor antes do primeiro desenho
+        context['bootstrap'] = bootstrap.get_payload(company)
+    return render(request, "calendar.html", context)
+
+
+@require_safe
+def professional_feed(request, token):
+    """Assinatura .ics da agenda do profissional; o token na URL é a credencial"""
+    found = feeds.professional_for_token(token)
+    if found is None:
+        raise Http404
+    entry = feeds.get_feed(*found)
+    if entry is None:
+        raise Http404
+    etag, last_modified, content = entry
+    response = HttpResponse(content, content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'private, no-cache'
+    response['Content-Disposition'] = 'inline; filename="agenda.ics"'
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()), response=response
+    )